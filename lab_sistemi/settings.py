@@ -114,9 +114,41 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Yazma işlemleri BEGIN IMMEDIATE ile başlar: eşzamanlı randevu
+            # kayıtları sıraya girer, kontrol ile kayıt arasına başka yazıcı giremez.
+            "transaction_mode": "IMMEDIATE",
+            # Kayıt yoğunluğunda kilidi beklemek için (saniye)
+            "timeout": 20,
+        },
+        # Test veritabanı dosyada tutulur: bellek içi paylaşımlı SQLite,
+        # eşzamanlılık testlerinde kilit beklemek yerine hemen hata verir.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
+# Önbellek: takvim akışları ve sayaçlar için süreç içi (locmem) önbellek.
+# Birden fazla worker varsa dosya tabanlı önbellek paylaşılabilir:
+#   "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+#   "LOCATION": BASE_DIR / "cache",
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "lab-sistemi",
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    }
+}
+
+# Koşullu yanıtlar (ETag / Last-Modified, 304 Not Modified) ve rozet sayaçlarının
+# önbelleği bu varsayılan ayarlarla KAPALIDIR: locmem süreç başınadır, bir
+# worker'daki değişiklik diğerlerinin sürümünü yenilemez (bkz. onbellek,
+# rezervasyon.W001 uyarısı). Açmak için:
+#   - birden çok worker: CACHES'i paylaşılan bir arka uca (dosya, Redis, Memcached)
+#     alın; paylaşılan arka uç kendiliğinden tanınır, bu ayara gerek kalmaz;
+#   - tek süreçli kurulum (runserver, tek worker'lı gunicorn): True yapın.
+# None: CACHES arka ucuna göre karar verilir.
+SURUM_ONBELLEGI_PAYLASIMLI = None
+
 
 # ========================================================
 # 4. ŞİFRE DOĞRULAMA
@@ -201,7 +233,27 @@ SESSION_COOKIE_SAMESITE = "Lax"
 
 MAX_RANDEVU_SAATI = 3
 IPTAL_MIN_SURE_SAAT = 1
+LAB_ACILIS_SAATI = "08:00"   # Boş saat hesaplaması için çalışma saatleri
+LAB_KAPANIS_SAATI = "18:00"
 OKUL_MAIL_UZANTISI = "@ogr.btu.edu.tr"
+TAKVIM_ONBELLEK_SURESI = 300  # saniye; randevu değişince zaten geçersiz kılınır
+# Canlı güncellemeler (SSE, /api/canli/) süreç içi yayınla çalışır: yalnızca tek
+# süreçli (iş parçacıklı) ya da asenkron sunucuda tüm olaylar iletilir. Birden çok
+# worker'da başka süreçteki değişikliğin olayı gelmez. Her açık akış bir iş
+# parçacığını tutar; sınır dolunca uç nokta 204 döner ve sayfalar yoklamaya geçer.
+# Senkron, tek iş parçacıklı worker'larda (gunicorn sync) CANLI_AKIS_SINIRI = 0 yapın.
+CANLI_AKIS_SURESI = 55  # sn; SSE bağlantısı bu süre sonra kapanır, tarayıcı kaldığı yerden yeniden bağlanır
+CANLI_NABIZ_ARALIGI = 15  # sn; boşta kalan SSE bağlantısına gönderilen yorum satırı aralığı
+CANLI_AKIS_SINIRI = 4  # süreç başına aynı anda açık SSE akışı
+EPOSTA_KUYRUGU_OTOMATIK = True  # kuyruğa eklenen mailleri süreç içi işçi hemen göndersin
+EPOSTA_MAKS_DENEME = 5  # başarısız mail en fazla bu kadar denenir
+EPOSTA_TEKRAR_BEKLEME = 60  # sn; her denemede iki katına çıkar (en fazla 1 saat)
+EPOSTA_KAMPANYA_HIZI = 60  # toplu mail kampanyalarında varsayılan dakikada mesaj (Gmail kısıtlamasına karşı)
+EPOSTA_KAMPANYA_KOVA = 5  # jeton kovası kapasitesi: art arda beklemeden gidebilecek mesaj sayısı
+PDF_KUYRUK_ISCI_SAYISI = 2  # arka planda aynı anda üretilebilecek PDF sayısı
+PDF_ONBELLEK_MAKS_BAYT = 200 * 1024 * 1024  # pdf_onbellek klasörü üst sınırı
+TOPLU_RAPOR_ISCI_SAYISI = None  # toplu PDF raporu süreç sayısı (None: CPU sayısı)
+PDF_MOTORU = "xhtml2pdf"  # "reportlab": randevu raporu HTML olmadan doğrudan çizilir
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
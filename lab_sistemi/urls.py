@@ -19,8 +19,13 @@ urlpatterns = [
     
     # --- API ENDPOINTS ---
     path("api/onay-bekleyen-sayisi/", views.onay_bekleyen_sayisi, name="onay_bekleyen_sayisi"),
+    path("api/canli/", views.canli_akis, name="canli_akis"),
+    path("api/randevu/toplu-durum/", views.toplu_durum_api, name="toplu_durum_api"),
     path("api/tum-randevular/", views.tum_events_api, name="tum_events_api"),
     path('api/lab/<int:lab_id>/events/', views.lab_events_api, name='lab_events_api'),
+    path("api/cihaz/<int:cihaz_id>/bos-saatler/", views.cihaz_bos_saatler_api, name="cihaz_bos_saatler_api"),
+    path("api/lab/<int:lab_id>/musait-ara/", views.musait_cihaz_ara_api, name="musait_cihaz_ara_api"),
+    path("api/pdf/<int:is_id>/", views.pdf_durum_api, name="pdf_durum_api"),
 
     # ========================================================
     # 2. ANA SAYFA VE GENEL
@@ -89,12 +94,15 @@ urlpatterns = [
     path("ariza-bildir/<int:cihaz_id>/", views.ariza_bildir, name="ariza_bildir"),
     path("sorun-bildir/", views.ariza_bildir_genel, name="ariza_bildir_genel"),
     path('lab/<int:lab_id>/takvim/', views.lab_takvim, name='lab_takvim'),
+    path("lab/<int:lab_id>/musait-ara/", views.musait_cihaz_ara, name="musait_cihaz_ara"),
 
     # ========================================================
     # 6. KULLANICI PROFİLİ VE YÖNETİM
     # ========================================================
     path("randevularim/", views.randevularim, name="randevularim"),
     path("randevularim/pdf-indir/", views.randevu_pdf_indir, name="randevu_pdf_indir"),
+    path("randevularim/pdf/<int:is_id>/", views.pdf_durum, name="pdf_durum"),
+    path("randevularim/pdf/<int:is_id>/indir/", views.pdf_dosya, name="pdf_dosya"),
     path("iptal/<int:randevu_id>/", views.randevu_iptal, name="randevu_iptal"),
     path("profil-duzenle/", views.profil_duzenle, name="profil_duzenle"),
 
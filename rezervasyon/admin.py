@@ -8,29 +8,37 @@ admin.site.site_title = "BTÜ Randevu Paneli"
 admin.site.index_title = "Yönetim Merkezine Hoş Geldiniz"
 
 from django.contrib import admin, messages
+from django.contrib.admin import helpers
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse, FileResponse, JsonResponse
 from django.shortcuts import redirect, get_object_or_404
 from django.urls import path
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.core.mail import send_mail
-from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
 from django.urls import reverse
 from django.shortcuts import render
-from django.core.validators import validate_email
-from django.core.exceptions import ValidationError
 
 from .forms import AdminMassEmailForm
+from .onbellek import surumleri_yenile
+from . import canli, sayaclar
+from .disa_aktar import RANDEVU_SUTUNLARI, ARIZA_SUTUNLARI, KULLANICI_SUTUNLARI, xlsx_yaniti
+from .toplu_rapor import BIRLESIK, ZIP, toplu_rapor_yaz
+from .toplu_durum import durum_degistir
+from .eposta_kuyrugu import kuyruga_ekle, isciyi_uyandir
+from .kampanya import (
+    alici_baglamlari, alici_epostalari, kampanya_olustur, taslaklari_temizle,
+    baslat as kampanya_baslat, duraklat as kampanya_duraklat,
+)
 import csv
+import tempfile
 
 from .models import (
     Laboratuvar, Cihaz, Randevu, Profil, Ariza, Duyuru,
-    OnayBekleyenler, AktifOgrenciler
+    OnayBekleyenler, AktifOgrenciler, GidenEposta, EpostaKampanyasi, KampanyaAlicisi
 )
 
 # ============================================================
@@ -61,14 +69,22 @@ def safe_redirect(request, fallback=".."):
 # ORTAK ACTIONLAR
 # ============================================================
 
-@admin.action(description="📥 Excel (CSV) indir")
-def excel_indir(modeladmin, request, queryset):
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="liste.csv"'
-    response.write(u'\ufeff'.encode('utf8'))
-    writer = csv.writer(response, delimiter=';')
-    writer.writerow(["Kullanıcı", "Cihaz", "Tarih", "Saat", "Durum"])
-    for obj in queryset:
+class _Yanki:
+    """csv.writer için sahte dosya: yazılan satırı saklamadan geri döndürür."""
+    def write(self, value):
+        return value
+
+def csv_satirlari(queryset):
+    """CSV satırlarını tek tek üretir (StreamingHttpResponse için).
+
+    İlişkiler tek JOIN ile gelir ve kayıtlar `iterator()` ile parça parça
+    okunur; böylece bellek kullanımı satır sayısından bağımsız kalır.
+    """
+    writer = csv.writer(_Yanki(), delimiter=';')
+    yield u'\ufeff'
+    yield writer.writerow(["Kullanıcı", "Cihaz", "Tarih", "Saat", "Durum"])
+    queryset = queryset.select_related("kullanici", "cihaz__lab")
+    for obj in queryset.iterator(chunk_size=2000):
         user = getattr(obj, "kullanici", None)
         if user:
             full_name = f"{getattr(user, 'first_name', '')} {getattr(user, 'last_name', '')}".strip()
@@ -77,42 +93,86 @@ def excel_indir(modeladmin, request, queryset):
         else:
             full_name = "-"
 
-        writer.writerow([
+        yield writer.writerow([
             full_name,
             getattr(obj, "cihaz", "-"),
             getattr(obj, "tarih", "-"),
             f"{getattr(obj,'baslangic_saati','')}-{getattr(obj,'bitis_saati','')}",
             obj.get_durum_display() if hasattr(obj, "get_durum_display") else "-"
         ])
+
+@admin.action(description="📥 Excel (CSV) indir")
+def excel_indir(modeladmin, request, queryset):
+    response = StreamingHttpResponse(csv_satirlari(queryset), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = 'attachment; filename="liste.csv"'
     return response
 
+@admin.action(description="📊 Excel (XLSX) indir")
+def xlsx_indir(modeladmin, request, queryset):
+    # Aksiyon iki adımlıdır: önce sütun seçim sayfası, onaydan sonra dosya.
+    # Seçim sayfası aynı aksiyona geri POST eder (Django'nun silme onayı gibi).
+    sutunlar = modeladmin.xlsx_sutunlari
+    if request.POST.get("xlsx_onay"):
+        secilen = set(request.POST.getlist("sutunlar"))
+        secili_sutunlar = [s for s in sutunlar if s.anahtar in secilen]
+        if not secili_sutunlar:
+            modeladmin.message_user(request, "En az bir sütun seçmelisiniz.", messages.WARNING)
+            return None
+        dosya_adi = f"{modeladmin.model._meta.model_name}_listesi.xlsx"
+        return xlsx_yaniti(queryset, secili_sutunlar, dosya_adi)
+
+    return render(request, "admin/rezervasyon/xlsx_sutun_secimi.html", {
+        **modeladmin.admin_site.each_context(request),
+        "title": "Excel sütunlarını seçin",
+        "opts": modeladmin.model._meta,
+        "sutunlar": sutunlar,
+        "kayit_sayisi": queryset.count(),
+        "secili_idler": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+        "tumunu_sec": request.POST.get("select_across"),
+        "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+    })
+
+def _toplu_pdf_yaniti(queryset, bicim):
+    dosya = tempfile.TemporaryFile()
+    toplu_rapor_yaz(queryset, dosya, bicim)
+    dosya.seek(0)
+    if bicim == BIRLESIK:
+        return FileResponse(dosya, as_attachment=True, filename="randevu_raporlari.pdf", content_type="application/pdf")
+    return FileResponse(dosya, as_attachment=True, filename="randevu_raporlari.zip", content_type="application/zip")
+
+@admin.action(description="🗂️ Kullanıcı başına PDF raporu (ZIP)")
+def toplu_pdf_zip(modeladmin, request, queryset):
+    return _toplu_pdf_yaniti(queryset, ZIP)
+
+@admin.action(description="📑 Birleşik PDF raporu")
+def toplu_pdf_birlesik(modeladmin, request, queryset):
+    return _toplu_pdf_yaniti(queryset, BIRLESIK)
+
 @admin.action(description="📧 Bilgilendirme maili gönder")
 def mail_gonder(modeladmin, request, queryset):
-    sayac = 0
-    for obj in queryset:
-        user = obj.kullanici if hasattr(obj, "kullanici") else obj
-        if user.email:
-            send_mail(
-                "BTÜ Lab Bilgilendirme",
-                "Hesabınızla ilgili bir bilgilendirme bulunmaktadır.",
-                settings.DEFAULT_FROM_EMAIL, [user.email], fail_silently=True
-            )
-            sayac += 1
-    modeladmin.message_user(request, f"{sayac} kullanıcıya mail gönderildi.", messages.SUCCESS)
+    alicilar, _eksik = alici_epostalari(queryset)
+    # Gönderim istek içinde yapılmaz: mesajlar kuyruğa yazılır (bkz. eposta_kuyrugu)
+    sayac = kuyruga_ekle(
+        alicilar, "BTÜ Lab Bilgilendirme", "Hesabınızla ilgili bir bilgilendirme bulunmaktadır."
+    )
+    modeladmin.message_user(request, f"{sayac} kullanıcıya mail gönderim kuyruğuna alındı.", messages.SUCCESS)
 
 
 @admin.action(description="📧 Özel Mail Gönder")
 def ozel_mail_action(modeladmin, request, queryset):
-    # Store selected IDs and model info in session then redirect to the admin view
-    ids = list(queryset.values_list('pk', flat=True))
-    request.session['ozel_mail_data'] = {
-        'app_label': modeladmin.model._meta.app_label,
-        'model': modeladmin.model._meta.model_name,
-        'pks': ids,
-        'repr': str(modeladmin.model._meta.verbose_name_plural)
-    }
-    # Redirect back to the changelist and then to the custom view
-    return redirect('admin:rezervasyon_ozel_mail')
+    # Alıcılar (ve şablon değişkenleri) tek sorguda çözülüp taslak kampanyaya yazılır
+    alicilar, eksik = alici_baglamlari(queryset)
+    if not alicilar:
+        modeladmin.message_user(request, "Seçilen kayıtlarda geçerli e-posta adresi bulunamadı.", messages.ERROR)
+        return None
+    taslaklari_temizle()
+    kampanya = kampanya_olustur(alicilar, olusturan=request.user, kaynak=queryset.model._meta.label_lower)
+    if eksik:
+        modeladmin.message_user(
+            request, f"E-posta adresi eksik ya da geçersiz {eksik} kayıt atlandı.", messages.WARNING
+        )
+    opts = modeladmin.opts
+    return redirect(f'admin:{opts.app_label}_{opts.model_name}_ozel_mail', kampanya.pk)
 
 @admin.action(description="🌟 Seçilenleri Süper Kullanıcı Yap")
 def super_kullanici_yap(modeladmin, request, queryset):
@@ -152,129 +212,49 @@ class AdminMassMailMixin:
     """Mixin to add an admin view for sending custom emails to selected objects."""
     def get_urls(self):
         urls = super().get_urls()
+        # URL adı modele özgü: mixin'i kullanan her admin kendi görünümüne çözülür
+        ad = f'{self.opts.app_label}_{self.opts.model_name}_ozel_mail'
         custom_urls = [
-            path('ozel-mail/', self.admin_site.admin_view(self.ozel_mail_view), name='rezervasyon_ozel_mail'),
+            path('ozel-mail/<int:pk>/', self.admin_site.admin_view(self.ozel_mail_view), name=ad),
         ]
         return custom_urls + urls
 
-    def ozel_mail_view(self, request):
-        data = request.session.get('ozel_mail_data')
-        if not data:
-            messages.error(request, "Seçilmiş kullanıcı verisi bulunamadı.")
-            return redirect('..')
-
-        # Load queryset for given model and PKs
-        app_label = data.get('app_label')
-        model_name = data.get('model')
-        pks = data.get('pks', [])
-
-        Model = self.model.__class__ if False else None
-        # Resolve model using apps
-        from django.apps import apps
-        Model = apps.get_model(app_label, model_name)
-        queryset = Model.objects.filter(pk__in=pks)
-
-        # Collect recipient emails with robust attribute probing
-        recipients = []
-        missing_emails = []
-
-        def find_email(o):
-            # Direct email field
-            for attr in ('email',):
-                if hasattr(o, attr):
-                    val = getattr(o, attr)
-                    if val:
-                        return val
-
-            # Common relation to User
-            for rel in ('user', 'kullanici', 'owner'):
-                if hasattr(o, rel):
-                    try:
-                        u = getattr(o, rel)
-                        if u and hasattr(u, 'email') and u.email:
-                            return u.email
-                    except Exception:
-                        pass
-
-            # If object has profil relation
-            if hasattr(o, 'profil'):
-                try:
-                    p = getattr(o, 'profil')
-                    if p and hasattr(p, 'user') and p.user.email:
-                        return p.user.email
-                except Exception:
-                    pass
-
-            # Try __str__ or other fallbacks (no email)
-            return None
-
-        seen = set()
-        for obj in queryset:
-            email = find_email(obj)
-            if email:
-                try:
-                    validate_email(email)
-                except ValidationError:
-                    missing_emails.append(obj)
-                    continue
-
-                if email.lower() in seen:
-                    continue
-                seen.add(email.lower())
-                recipients.append((obj, email))
-            else:
-                missing_emails.append(obj)
+    def ozel_mail_view(self, request, pk):
+        # Alıcılar action'da taslak kampanyaya yazıldı; burada yalnızca içerik alınır
+        kampanya = get_object_or_404(
+            EpostaKampanyasi, pk=pk, durum=EpostaKampanyasi.TASLAK, olusturan=request.user
+        )
 
         if request.method == 'POST':
             form = AdminMassEmailForm(request.POST)
             if form.is_valid():
-                subject = form.cleaned_data['subject']
-                message = form.cleaned_data['message']
-                is_html = form.cleaned_data['is_html']
-
-                sent = 0
-                failed = 0
-                errors = []
-
-                for _obj, email in recipients:
-                    try:
-                        if is_html:
-                            text_content = message
-                            html_content = message
-                            msg = EmailMultiAlternatives(subject, text_content, settings.DEFAULT_FROM_EMAIL, [email])
-                            msg.attach_alternative(html_content, "text/html")
-                            msg.send()
-                        else:
-                            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email], fail_silently=False)
-                        sent += 1
-                    except Exception as e:
-                        failed += 1
-                        errors.append(f"{email}: {e}")
-
-                # Clear session for safety
-                try:
-                    del request.session['ozel_mail_data']
-                except Exception:
-                    pass
-
-                return render(request, 'admin/rezervasyon/ozel_mail_result.html', {
-                    'total': len(recipients), 'sent': sent, 'failed': failed,
-                    'missing': missing_emails, 'errors': errors
-                })
+                # Gönderim kampanya işçisine devredilir: hız sınırlı, alıcı bazında durum tutulur
+                kampanya.konu = form.cleaned_data['subject']
+                kampanya.metin = form.cleaned_data['message']
+                kampanya.html = form.cleaned_data['is_html']
+                kampanya.dakikada_mesaj = form.cleaned_data['dakikada_mesaj']
+                kampanya.save(update_fields=['konu', 'metin', 'html', 'dakikada_mesaj'])
+                kampanya_baslat(kampanya)
+                return redirect('admin:rezervasyon_epostakampanyasi_ilerleme', kampanya.pk)
         else:
-            form = AdminMassEmailForm()
+            form = AdminMassEmailForm(initial={'dakikada_mesaj': kampanya.dakikada_mesaj})
 
         return render(request, 'admin/rezervasyon/ozel_mail_form.html', {
-            'form': form, 'recipient_count': len(recipients), 'missing_count': len(missing_emails), 'repr': data.get('repr')
+            'form': form, 'recipient_count': kampanya.alicilar.count(),
+            'repr': kampanya.kaynak_adi() or self.model._meta.verbose_name_plural,
         })
 
 @admin.action(description="🟢 Aktif yap")
 def aktif_yap(modeladmin, request, queryset):
     queryset.update(is_active=True)
+    surumleri_yenile("kullanici")  # update() sinyal üretmez
+    transaction.on_commit(lambda: canli.yayinla(canli.KULLANICI, olay="guncellendi"))
 
 @admin.action(description="🔴 Pasif yap")
 def pasif_yap(modeladmin, request, queryset):
     queryset.update(is_active=False)
+    surumleri_yenile("kullanici")  # update() sinyal üretmez
+    transaction.on_commit(lambda: canli.yayinla(canli.KULLANICI, olay="guncellendi"))
 
 # ============================================================
 # LABORATUVAR & CİHAZ (GELİŞTİRİLMİŞ)
@@ -286,9 +266,14 @@ def pasif_yap(modeladmin, request, queryset):
 @admin.register(Laboratuvar)
 class LaboratuvarAdmin(admin.ModelAdmin):
     list_display = ("isim", "cihaz_durumu")
-    
+
+    def get_queryset(self, request):
+        # Cihaz sayısı satır başına COUNT yerine liste sorgusunda hesaplanır
+        return super().get_queryset(request).annotate(cihaz_sayisi=models.Count("cihaz"))
+
+    @admin.display(description="Cihaz durumu", ordering="cihaz_sayisi")
     def cihaz_durumu(self, obj):
-        sayi = obj.cihaz_set.count()
+        sayi = obj.cihaz_sayisi
         # success (yeşil) veya danger (kırmızı) badge gösterimi
         return format_html('<span class="badge badge-{}">{} cihaz</span>', "success" if sayi else "danger", sayi)
 
@@ -298,11 +283,15 @@ class CihazAdmin(admin.ModelAdmin):
     list_display = ("isim", "lab", "durum")
     list_filter = ("lab",) # Sadece laboratuvara göre filtreleme yapar
 
+    def get_queryset(self, request):
+        # Lab adı (Cihaz.__str__ ve "lab" sütunu) ve açık arıza durumu tek sorguda gelir
+        acik_ariza = Ariza.objects.filter(cihaz=models.OuterRef("pk"), cozuldu_mu=False)
+        return super().get_queryset(request).select_related("lab").annotate(ariza_var=models.Exists(acik_ariza))
+
+    @admin.display(description="Durum", ordering="ariza_var")
     def durum(self, obj):
-        # Arıza modelindeki aktif (çözülmemiş) kayıtları kontrol eder
-        ariza_var = Ariza.objects.filter(cihaz=obj, cozuldu_mu=False).exists()
-        
-        if ariza_var:
+        # Arıza modelindeki aktif (çözülmemiş) kayıtlar get_queryset'te Exists ile işaretlenir
+        if obj.ariza_var:
             return mark_safe('''
                 <span style="color:red; font-weight:bold; cursor:help;" class="animate-pulse">⚠️ ARIZALI</span>
                 <style>@keyframes pulse { 0% { opacity:1; } 50% { opacity:0.5; } 100% { opacity:1; } } .animate-pulse { animation: pulse 1.5s infinite; }</style>
@@ -312,11 +301,42 @@ class CihazAdmin(admin.ModelAdmin):
     
     def get_model_perms(self, request):
         perms = super().get_model_perms(request)
-        # Eğer çözülmemiş arıza varsa admin sayfasında uyarı gösterir
-        if Ariza.objects.filter(cozuldu_mu=False).exists(): 
+        # Eğer çözülmemiş arıza varsa admin sayfasında uyarı gösterir.
+        # Uygulama listesi her admin sayfasında kurulur: sayı sorgu yerine
+        # "ariza" sürümüne bağlı önbellekten ve istek içi hafızadan okunur.
+        if sayaclar.istek_sayilari(request)["acik_ariza"]:
             perms["has_warning"] = True
         return perms
 # ============================================================
+# RANDEVU – TOPLU DURUM GEÇİŞLERİ
+# ============================================================
+
+def _toplu_durum(modeladmin, request, queryset, islem):
+    # Seçim tek UPDATE ile güncellenir; bildirimler tek seferde kuyruğa yazılır
+    sonuc = durum_degistir(queryset, islem, request.user)
+    seviye = messages.SUCCESS if sonuc["guncellenen"] else messages.WARNING
+    mesaj = f"{sonuc['guncellenen']} randevu güncellendi"
+    if sonuc["atlanan"]:
+        mesaj += f", {sonuc['atlanan']} randevu bu işleme uygun olmadığı için atlandı"
+    modeladmin.message_user(request, mesaj + ".", seviye)
+
+@admin.action(description="✅ Seçilenleri onayla")
+def toplu_onayla(modeladmin, request, queryset):
+    _toplu_durum(modeladmin, request, queryset, "onayla")
+
+@admin.action(description="⛔ Seçilenleri reddet")
+def toplu_reddet(modeladmin, request, queryset):
+    _toplu_durum(modeladmin, request, queryset, "reddet")
+
+@admin.action(description="🟦 Seçilenler geldi")
+def toplu_geldi(modeladmin, request, queryset):
+    _toplu_durum(modeladmin, request, queryset, "geldi")
+
+@admin.action(description="⬜ Seçilenler gelmedi")
+def toplu_gelmedi(modeladmin, request, queryset):
+    _toplu_durum(modeladmin, request, queryset, "gelmedi")
+
+# ============================================================
 # RANDEVU – HAREKETLİ ETİKETLER
 # ============================================================
 
@@ -324,7 +344,12 @@ class CihazAdmin(admin.ModelAdmin):
 class RandevuAdmin(AdminMassMailMixin, admin.ModelAdmin):
     list_display = ("kullanici", "cihaz", "tarih", "durum_renkli", "butonlar")
     list_filter = ("durum", "tarih", "cihaz__lab")
-    actions = [excel_indir, mail_gonder, ozel_mail_action]
+    list_select_related = ("kullanici", "cihaz__lab")  # __str__ lab adını da kullanır
+    actions = [
+        toplu_onayla, toplu_reddet, toplu_geldi, toplu_gelmedi,
+        excel_indir, xlsx_indir, toplu_pdf_zip, toplu_pdf_birlesik, mail_gonder, ozel_mail_action,
+    ]
+    xlsx_sutunlari = RANDEVU_SUTUNLARI
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
@@ -359,20 +384,24 @@ class RandevuAdmin(AdminMassMailMixin, admin.ModelAdmin):
             path("gelmedi/<int:pk>/", self.admin_site.admin_view(self.gelmedi)),
         ] + urls
 
+    def _durum_kaydet(self, r):
+        # save() post_save sinyalini tetikler; takvim önbelleği orada geçersiz kılınır
+        r.save(update_fields=["durum", "onaylayan_admin"])
+
     def onayla(self, request, pk):
-        r = get_object_or_404(Randevu, pk=pk); r.onayla(request.user); r.save()
+        r = get_object_or_404(Randevu, pk=pk); r.onayla(request.user); self._durum_kaydet(r)
         messages.success(request, "Randevu onaylandı."); return safe_redirect(request)
 
     def iptal(self, request, pk):
-        r = get_object_or_404(Randevu, pk=pk); r.sonradan_iptal(); r.save()
+        r = get_object_or_404(Randevu, pk=pk); r.sonradan_iptal(); self._durum_kaydet(r)
         return safe_redirect(request)
 
     def geldi(self, request, pk):
-        r = get_object_or_404(Randevu, pk=pk); r.geldi_isaretle(); r.save()
+        r = get_object_or_404(Randevu, pk=pk); r.geldi_isaretle(); self._durum_kaydet(r)
         return safe_redirect(request)
 
     def gelmedi(self, request, pk):
-        r = get_object_or_404(Randevu, pk=pk); r.gelmedi_isaretle(); r.save()
+        r = get_object_or_404(Randevu, pk=pk); r.gelmedi_isaretle(); self._durum_kaydet(r)
         return safe_redirect(request)
 
 # ============================================================
@@ -382,6 +411,10 @@ class RandevuAdmin(AdminMassMailMixin, admin.ModelAdmin):
 @admin.register(Ariza)
 class ArizaAdmin(admin.ModelAdmin):
     list_display = ("cihaz", "kullanici", "tarih", "buton")
+    list_select_related = ("cihaz__lab", "kullanici")
+    actions = [xlsx_indir]
+    xlsx_sutunlari = ARIZA_SUTUNLARI
+
     def buton(self, obj):
         if obj.cozuldu_mu:
             return format_html('<a class="button" href="geri/{}/">Geri Al</a>', obj.id)
@@ -407,11 +440,13 @@ admin.site.unregister(User)
 
 @admin.register(User)
 class CustomUserAdmin(AdminMassMailMixin, UserAdmin):
-    actions = [aktif_yap, pasif_yap, mail_gonder, ozel_mail_action,super_kullanici_yap]
+    actions = [aktif_yap, pasif_yap, mail_gonder, ozel_mail_action,super_kullanici_yap, xlsx_indir]
+    xlsx_sutunlari = KULLANICI_SUTUNLARI
 
 @admin.register(OnayBekleyenler)
 class OnayBekleyenlerAdmin(AdminMassMailMixin, UserAdmin):
-    actions = [aktif_yap, mail_gonder, ozel_mail_action]
+    actions = [aktif_yap, mail_gonder, ozel_mail_action, xlsx_indir]
+    xlsx_sutunlari = KULLANICI_SUTUNLARI
     list_display = ("username", "email", "aktiflik_durumu", "tek_tik_aktif_et")
     
     def get_queryset(self, request):
@@ -434,7 +469,8 @@ class OnayBekleyenlerAdmin(AdminMassMailMixin, UserAdmin):
 
 @admin.register(AktifOgrenciler)
 class AktifOgrencilerAdmin(AdminMassMailMixin, UserAdmin):
-    actions = [pasif_yap, mail_gonder, ozel_mail_action]
+    actions = [pasif_yap, mail_gonder, ozel_mail_action, xlsx_indir]
+    xlsx_sutunlari = KULLANICI_SUTUNLARI
     list_display = ("username", "email", "aktiflik_durumu", "tek_tik_pasif_et")
 
     def get_queryset(self, request):
@@ -461,10 +497,127 @@ class AktifOgrencilerAdmin(AdminMassMailMixin, UserAdmin):
 @admin.register(Profil)
 class ProfilAdmin(AdminMassMailMixin, admin.ModelAdmin):
     list_display = ("user", "okul_numarasi", "telefon")
+    list_select_related = ("user",)
     actions = [ozel_mail_action]
 
 @admin.register(Duyuru)
 class DuyuruAdmin(admin.ModelAdmin):
     list_display = ('baslik', 'tarih', 'aktif_mi') # Listede tarihi ve durumunu gör
     list_filter = ('aktif_mi', 'tarih') # Tarihe göre filtreleme yap
-    search_fields = ('baslik', 'icerik')
\ No newline at end of file
+    search_fields = ('baslik', 'icerik')
+
+# ============================================================
+# E-POSTA KUYRUĞU
+# ============================================================
+@admin.action(description="🔁 Yeniden dene")
+def yeniden_dene(modeladmin, request, queryset):
+    sayi = queryset.exclude(durum=GidenEposta.GONDERILDI).update(
+        durum=GidenEposta.BEKLIYOR, deneme_sayisi=0, sonraki_deneme=timezone.now(), son_hata=""
+    )
+    if sayi:
+        transaction.on_commit(isciyi_uyandir)
+    modeladmin.message_user(request, f"{sayi} mesaj yeniden kuyruğa alındı.", messages.SUCCESS)
+
+@admin.register(GidenEposta)
+class GidenEpostaAdmin(admin.ModelAdmin):
+    list_display = ("alici", "konu", "durum", "deneme_sayisi", "sonraki_deneme", "gonderilme_zamani")
+    list_filter = ("durum",)
+    search_fields = ("alici", "konu")
+    readonly_fields = ("deneme_sayisi", "son_hata", "olusturulma_zamani", "gonderilme_zamani")
+    actions = [yeniden_dene]
+
+
+# ============================================================
+# E-POSTA KAMPANYALARI
+# ============================================================
+@admin.action(description="▶️ Gönderimi başlat / devam ettir")
+def kampanyayi_baslat(modeladmin, request, queryset):
+    # Taslaklar yalnızca içerik formundan başlatılır: konusu/mesajı boş mail gitmesin
+    kampanyalar = queryset.exclude(durum__in=[EpostaKampanyasi.TAMAMLANDI, EpostaKampanyasi.TASLAK])
+    sayi = sum(kampanya_baslat(k) for k in kampanyalar)
+    modeladmin.message_user(request, f"{sayi} kampanya gönderime alındı.", messages.SUCCESS)
+
+@admin.action(description="⏸️ Duraklat")
+def kampanyayi_duraklat(modeladmin, request, queryset):
+    sayi = sum(kampanya_duraklat(k) for k in queryset)
+    modeladmin.message_user(request, f"{sayi} kampanya duraklatıldı.", messages.SUCCESS)
+
+@admin.action(description="🔁 Başarısız alıcıları yeniden dene")
+def kampanya_hatalarini_dene(modeladmin, request, queryset):
+    # Yalnızca başarısız alıcısı olan kampanyalar yeniden başlar: bilerek duraklatılmış
+    # ya da taslak kampanya "yeniden dene" ile sürdürülmez
+    hatalilar = list(
+        queryset.exclude(durum=EpostaKampanyasi.TASLAK)
+        .filter(alicilar__durum=KampanyaAlicisi.HATA).distinct()
+    )
+    sayi = KampanyaAlicisi.objects.filter(kampanya__in=hatalilar, durum=KampanyaAlicisi.HATA).update(
+        durum=KampanyaAlicisi.BEKLIYOR, son_hata=""
+    )
+    EpostaKampanyasi.objects.filter(pk__in=[k.pk for k in hatalilar], durum=EpostaKampanyasi.TAMAMLANDI).update(
+        durum=EpostaKampanyasi.DURAKLATILDI
+    )
+    for kampanya in hatalilar:
+        kampanya_baslat(kampanya)
+    mesaj = f"{sayi} alıcı yeniden sıraya alındı."
+    atlanan = queryset.count() - len(hatalilar)
+    if atlanan:
+        mesaj += f" Başarısız alıcısı olmayan {atlanan} kampanya atlandı."
+    modeladmin.message_user(request, mesaj, messages.SUCCESS if sayi else messages.WARNING)
+
+class KampanyaAlicisiInline(admin.TabularInline):
+    model = KampanyaAlicisi
+    fields = ("eposta", "durum", "gonderilme_zamani", "son_hata")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+@admin.register(EpostaKampanyasi)
+class EpostaKampanyasiAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "durum", "dakikada_mesaj", "ilerleme_linki", "olusturan", "olusturulma_zamani")
+    list_filter = ("durum",)
+    list_select_related = ("olusturan",)
+    search_fields = ("konu",)
+    readonly_fields = ("durum", "son_hata", "olusturan", "olusturulma_zamani", "baslama_zamani", "tamamlanma_zamani")
+    exclude = ("isci_zamani",)
+    actions = [kampanyayi_baslat, kampanyayi_duraklat, kampanya_hatalarini_dene]
+    inlines = [KampanyaAlicisiInline]
+
+    @admin.display(description="İlerleme")
+    def ilerleme_linki(self, obj):
+        url = reverse("admin:rezervasyon_epostakampanyasi_ilerleme", args=[obj.pk])
+        return format_html('<a href="{}" class="button">📊 İlerleme</a>', url)
+
+    def get_urls(self):
+        urls = super().get_urls()
+        return [
+            path("<int:pk>/ilerleme/", self.admin_site.admin_view(self.ilerleme),
+                 name="rezervasyon_epostakampanyasi_ilerleme"),
+            path("<int:pk>/durum/", self.admin_site.admin_view(self.durum_api),
+                 name="rezervasyon_epostakampanyasi_durum"),
+        ] + urls
+
+    def _durum_verisi(self, kampanya):
+        veri = kampanya.ilerleme()
+        islenen = veri["gonderilen"] + veri["hatali"]
+        veri.update(
+            durum=kampanya.durum,
+            etiket=kampanya.get_durum_display(),
+            yuzde=round(100 * islenen / veri["toplam"]) if veri["toplam"] else 100,
+            son_hata=kampanya.son_hata,
+        )
+        return veri
+
+    def ilerleme(self, request, pk):
+        kampanya = get_object_or_404(EpostaKampanyasi, pk=pk)
+        return render(request, "admin/rezervasyon/kampanya_ilerleme.html", {
+            **self.admin_site.each_context(request),
+            "kampanya": kampanya, "veri": self._durum_verisi(kampanya), "opts": self.model._meta,
+        })
+
+    def durum_api(self, request, pk):
+        # İlerleme sayfası bunu yoklar: iki küçük sorgu (kampanya + sayım)
+        return JsonResponse(self._durum_verisi(get_object_or_404(EpostaKampanyasi, pk=pk)))
@@ -1,11 +1,24 @@
 """App konfigürasyonu: `rezervasyon` uygulaması için AppConfig.
 
-Bu dosya Django'ya uygulamanın var olduğunu bildirir ve gelecekte sinyaller
-ve uygulama başlatma (ready) kodu koymak için kullanılabilir.
+Bu dosya Django'ya uygulamanın var olduğunu bildirir; `ready()` içinde model
+sinyalleri (önbellek geçersiz kılma) ve önbellek sistem kontrolü bağlanır, PDF
+motoru (fontlar) bir kez hazırlanır.
 """
 
 from django.apps import AppConfig
+from django.core import checks
+from django.test.signals import setting_changed
 
 
 class RezervasyonConfig(AppConfig):
     name = "rezervasyon"
+
+    def ready(self):
+        from . import signals  # noqa: F401 (sinyal alıcılarını bağlar)
+        from .onbellek import onbellek_kontrolu
+        from .utils import pdf_motorunu_hazirla, statik_hafizayi_temizle
+
+        checks.register(onbellek_kontrolu, checks.Tags.caches)
+        pdf_motorunu_hazirla()
+        # Testlerde STATIC_ROOT/STATIC_URL değişirse çözümlenmiş yollar geçersizdir
+        setting_changed.connect(statik_hafizayi_temizle, dispatch_uid="pdf_statik_hafiza")
@@ -0,0 +1,51 @@
+"""Randevu çakışma motoru: bellekte aralık indeksi.
+
+Veritabanına bağımlı değildir; `(baslangic, bitis)` çiftleriyle çalışır.
+Sorgular `Randevu.objects` (RandevuQuerySet) tarafından yapılır, bu modül
+yalnızca tek sorguda gelen dolu aralıkları indeksler.
+Aralıklar yarı açıktır: [baslangic, bitis). Bitişik randevular çakışmaz.
+"""
+
+from bisect import bisect_left
+
+
+class AralikIndeksi:
+    """Başlangıca göre sıralı aralıklar + önek maksimum bitiş indeksi.
+
+    Bir aday aralığın [b, e) çakışması için, başlangıcı e'den küçük olan
+    aralıklardan herhangi birinin bitişi b'den büyük olmalıdır. Önek
+    maksimumu sayesinde bu kontrol O(log n) sürer.
+    """
+
+    def __init__(self, araliklar):
+        sirali = sorted(araliklar)
+        self.baslangiclar = [a[0] for a in sirali]
+        self.onek_maks_bitis = []
+        en_gec = None
+        for _, bitis in sirali:
+            en_gec = bitis if en_gec is None or bitis > en_gec else en_gec
+            self.onek_maks_bitis.append(en_gec)
+
+    def cakisiyor_mu(self, baslangic, bitis):
+        i = bisect_left(self.baslangiclar, bitis)
+        return i > 0 and self.onek_maks_bitis[i - 1] > baslangic
+
+
+def bos_araliklar(dolu, acilis, kapanis):
+    """[acilis, kapanis) penceresinde dolu aralıkların arasında kalan boşluklar.
+
+    `dolu` başlangıca göre sıralı olmalıdır; tek geçişli (sweep) hesaplanır.
+    Üst üste binen dolu aralıklar doğal olarak birleştirilmiş olur.
+    """
+    bos = []
+    imlec = acilis
+    for baslangic, bitis in dolu:
+        if baslangic >= kapanis:
+            break
+        if baslangic > imlec:
+            bos.append((imlec, baslangic))
+        if bitis > imlec:
+            imlec = bitis
+    if imlec < kapanis:
+        bos.append((imlec, kapanis))
+    return bos
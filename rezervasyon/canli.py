@@ -0,0 +1,172 @@
+"""Canlı güncellemeler: süreç içi yayın/abonelik ve Server-Sent Events akışı.
+
+Model sinyalleri değişikliği commit'ten sonra `yayinla()` ile duyurur; açık
+olan her SSE bağlantısı (`akis()`) olayı hemen istemciye iletir. Admin menü
+rozetleri ve takvim sayfaları artık yeniden yüklenmez ya da yoklama yapmaz,
+yalnızca olay geldiğinde ilgili veriyi (ETag'li uç noktalardan) yeniden çeker.
+
+Olaylar son `TAMPON_BOYUTU` kadarı bellekte tutulur. Bağlantısı kopan
+tarayıcı `Last-Event-ID` ile yeniden bağlandığında kaçırdığı olaylar tekrar
+gönderilir; tampondan düşmüşse tek bir `yenile` olayı gönderilir.
+
+Dış bir aracı (Redis vb.) kullanılmaz; yayın yalnızca aynı süreçteki
+bağlantılara ulaşır. Bu yüzden canlı güncellemeler tek süreçli (çok iş
+parçacıklı) ya da asenkron bir sunucu gerektirir; birden çok worker'da başka
+süreçte yapılan değişikliğin olayı gelmez. Her akış bir iş parçacığını meşgul
+ettiği için bağlantı `CANLI_AKIS_SURESI` saniye sonra kapatılır; EventSource
+kendiliğinden yeniden bağlanır ve kaldığı yerden devam eder.
+
+Açık sekmeler normal istekleri aç bırakmasın diye süreç başına en fazla
+`CANLI_AKIS_SINIRI` akış açılır (bkz. `AkisSiniri`); sınır doluysa uç nokta 204
+döner ve sayfa periyodik yoklamaya geçer.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+TAMPON_BOYUTU = 256
+
+# Olay türleri
+RANDEVU = "randevu"
+ARIZA = "ariza"
+KULLANICI = "kullanici"
+YENILE = "yenile"
+
+
+class Yayinci:
+    """Bellek içi olay kanalı; abonelerin her biri kendi son olay kimliğini izler."""
+
+    def __init__(self, tampon_boyutu=TAMPON_BOYUTU):
+        self._kosul = threading.Condition()
+        self._olaylar = deque(maxlen=tampon_boyutu)
+        # Süreç yeniden başlasa da kimlikler geriye gitmesin: başlangıç değeri zamandan
+        self._son_id = time.time_ns() // 1_000_000
+
+    @property
+    def son_id(self):
+        return self._son_id
+
+    def yayinla(self, tur, veri):
+        with self._kosul:
+            self._son_id += 1
+            self._olaylar.append((self._son_id, tur, veri))
+            self._kosul.notify_all()
+            return self._son_id
+
+    def bekle(self, son_id, zaman_asimi):
+        """`son_id`'den sonraki olayları döndürür; yoksa en fazla `zaman_asimi` sn bekler.
+
+        İstenen olaylar tampondan düşmüşse (ya da tampon boşsa: süreç yeniden
+        başlamış / bağlantı başka işçiye düşmüş) yerine tek bir `yenile` olayı
+        döner; böylece istemcinin son kimliği her durumda ilerler.
+        """
+        with self._kosul:
+            self._kosul.wait_for(lambda: self._son_id > son_id, zaman_asimi)
+            if self._son_id <= son_id:
+                return []
+            if not self._olaylar or self._olaylar[0][0] > son_id + 1:
+                return [(self._son_id, YENILE, {})]
+            return [olay for olay in self._olaylar if olay[0] > son_id]
+
+
+class AkisSiniri:
+    """Süreç içinde aynı anda açık akış sayısını `CANLI_AKIS_SINIRI` ile sınırlar."""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self.acik = 0
+
+    def al(self):
+        """Yer varsa bir akış yuvası ayırır ve True döner."""
+        with self._kilit:
+            if self.acik >= getattr(settings, "CANLI_AKIS_SINIRI", 4):
+                return False
+            self.acik += 1
+            return True
+
+    def birak(self):
+        with self._kilit:
+            self.acik -= 1
+
+
+class _SinirliAkis:
+    """Akış bitince ya da bağlantı kapanınca (`close()`) yuvayı bir kez bırakır.
+
+    Jeneratörün kendi `finally`si hiç başlamamış akışta çalışmaz; sunucu
+    yanıtı kapatınca çağrılan `close()` her durumda çalışır.
+    """
+
+    def __init__(self, satirlar):
+        self._satirlar = satirlar
+        self._acik = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._satirlar)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        if self._acik:
+            self._acik = False
+            self._satirlar.close()
+            sinir.birak()
+
+
+yayinci = Yayinci()
+sinir = AkisSiniri()
+
+
+def yayinla(tur, **veri):
+    return yayinci.yayinla(tur, veri)
+
+
+def _sse(olay_id, tur, veri):
+    return f"id: {olay_id}\nevent: {tur}\ndata: {json.dumps(veri)}\n\n"
+
+
+def akis(son_id=None, turler=None, sure=None, nabiz=None):
+    """SSE satırları üreten jeneratör.
+
+    son_id: istemcinin aldığı son olay (Last-Event-ID); yoksa yalnızca yeni olaylar
+    turler:  iletilecek olay türleri (None: hepsi; `yenile` her zaman iletilir)
+    """
+    sure = getattr(settings, "CANLI_AKIS_SURESI", 55) if sure is None else sure
+    nabiz = getattr(settings, "CANLI_NABIZ_ARALIGI", 15) if nabiz is None else nabiz
+    if son_id is None or son_id > yayinci.son_id:
+        # İlk bağlantı ya da süreç yeniden başlamış: geçmişi değil yeni olayları izle
+        son_id = yayinci.son_id
+    bitis = time.monotonic() + sure
+
+    yield f"retry: 3000\nid: {son_id}\n\n"
+    while True:
+        kalan = bitis - time.monotonic()
+        if kalan <= 0:
+            return
+        olaylar = yayinci.bekle(son_id, min(nabiz, kalan))
+        if not olaylar:
+            # Vekil sunucular boşta kalan bağlantıyı kesmesin
+            yield ": nabiz\n\n"
+            continue
+        iletilen = [o for o in olaylar if turler is None or o[1] in turler or o[1] == YENILE]
+        for olay_id, tur, veri in iletilen:
+            yield _sse(olay_id, tur, veri)
+        son_id = olaylar[-1][0]
+        if not iletilen or iletilen[-1][0] != son_id:
+            # Süzülen olayları da "alındı" say: yeniden bağlanınca tekrar taranmasın
+            yield f"id: {son_id}\n\n"
+
+
+def sinirli_akis(*args, **kwargs):
+    """`akis()`ı bir yuva ayırarak açar; sınır doluysa None döner."""
+    if not sinir.al():
+        return None
+    return _SinirliAkis(akis(*args, **kwargs))
@@ -0,0 +1,124 @@
+"""Admin dışa aktarma: sütun tanımları ve sabit bellekli XLSX yazıcı.
+
+openpyxl'in write-only modu satırları diske akıtır; çalışma kitabı bellekte
+tutulmaz. Veri `values_list()` + `iterator()` ile tek sorguda okunur, tarih ve
+saat değerleri Excel'e metin değil gerçek tarih/saat hücresi olarak yazılır.
+"""
+
+import tempfile
+from collections import namedtuple
+from datetime import datetime
+
+from django.http import FileResponse
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from .models import Randevu
+
+# anahtar: form değeri, baslik: Excel başlığı, alan: values_list yolu,
+# bicim: Excel sayı biçimi, donustur: hücreye yazmadan önce uygulanacak fonksiyon
+Sutun = namedtuple("Sutun", "anahtar baslik alan bicim donustur", defaults=(None, None))
+
+TARIH = "dd.mm.yyyy"
+SAAT = "hh:mm"
+TARIH_SAAT = "dd.mm.yyyy hh:mm"
+
+_DURUMLAR = dict(Randevu.DURUM_SECENEKLERI)
+
+
+def _evet_hayir(deger):
+    return "Evet" if deger else "Hayır"
+
+
+def _yerel(deger):
+    # Excel saat dilimi desteklemez: yerel saate çevirip tz bilgisini at
+    if isinstance(deger, datetime) and timezone.is_aware(deger):
+        return timezone.make_naive(deger)
+    return deger
+
+
+RANDEVU_SUTUNLARI = [
+    Sutun("kullanici", "Kullanıcı", "kullanici__username"),
+    Sutun("ad", "Ad", "kullanici__first_name"),
+    Sutun("soyad", "Soyad", "kullanici__last_name"),
+    Sutun("email", "E-Posta", "kullanici__email"),
+    Sutun("lab", "Laboratuvar", "cihaz__lab__isim"),
+    Sutun("cihaz", "Cihaz", "cihaz__isim"),
+    Sutun("tarih", "Tarih", "tarih", TARIH),
+    Sutun("baslangic", "Başlangıç", "baslangic_saati", SAAT),
+    Sutun("bitis", "Bitiş", "bitis_saati", SAAT),
+    Sutun("durum", "Durum", "durum", None, lambda d: _DURUMLAR.get(d, d)),
+    Sutun("onaylayan", "İşlemi Yapan", "onaylayan_admin__username"),
+    Sutun("olusturulma", "Oluşturulma", "olusturulma_zamani", TARIH_SAAT, _yerel),
+]
+
+ARIZA_SUTUNLARI = [
+    Sutun("lab", "Laboratuvar", "cihaz__lab__isim"),
+    Sutun("cihaz", "Cihaz", "cihaz__isim"),
+    Sutun("kullanici", "Bildiren", "kullanici__username"),
+    Sutun("email", "E-Posta", "kullanici__email"),
+    Sutun("aciklama", "Açıklama", "aciklama"),
+    Sutun("cozuldu", "Çözüldü mü?", "cozuldu_mu", None, _evet_hayir),
+    Sutun("tarih", "Bildirim Tarihi", "tarih", TARIH_SAAT, _yerel),
+]
+
+KULLANICI_SUTUNLARI = [
+    Sutun("username", "Kullanıcı Adı", "username"),
+    Sutun("ad", "Ad", "first_name"),
+    Sutun("soyad", "Soyad", "last_name"),
+    Sutun("email", "E-Posta", "email"),
+    Sutun("okul_no", "Okul Numarası", "profil__okul_numarasi"),
+    Sutun("telefon", "Telefon", "profil__telefon"),
+    Sutun("aktif", "Aktif mi?", "is_active", None, _evet_hayir),
+    Sutun("personel", "Personel mi?", "is_staff", None, _evet_hayir),
+    Sutun("kayit", "Kayıt Tarihi", "date_joined", TARIH_SAAT, _yerel),
+    Sutun("son_giris", "Son Giriş", "last_login", TARIH_SAAT, _yerel),
+]
+
+
+def xlsx_yaz(dosya, sutunlar, satirlar, sayfa_adi="Liste"):
+    """`satirlar` (tuple akışı) verisini write-only çalışma kitabı olarak `dosya`ya yazar."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sayfa_adi)
+
+    kalin = Font(bold=True)
+    baslik = []
+    for s in sutunlar:
+        hucre = WriteOnlyCell(ws, value=s.baslik)
+        hucre.font = kalin
+        baslik.append(hucre)
+    ws.append(baslik)
+
+    # Biçimli hücre nesneleri her satırda yeniden kullanılır (satır başına nesne üretmez)
+    bicimli = {}
+    for i, s in enumerate(sutunlar):
+        if s.bicim:
+            bicimli[i] = WriteOnlyCell(ws)
+            bicimli[i].number_format = s.bicim
+    donusumler = [(i, s.donustur) for i, s in enumerate(sutunlar) if s.donustur]
+
+    for satir in satirlar:
+        satir = list(satir)
+        for i, fn in donusumler:
+            satir[i] = fn(satir[i])
+        for i, hucre in bicimli.items():
+            hucre.value = satir[i]
+            satir[i] = hucre
+        ws.append(satir)
+
+    wb.save(dosya)
+
+
+def xlsx_yaniti(queryset, sutunlar, dosya_adi):
+    """Seçili sütunları geçici dosyaya yazar ve FileResponse ile akıtır."""
+    satirlar = queryset.values_list(*(s.alan for s in sutunlar)).iterator(chunk_size=2000)
+    dosya = tempfile.TemporaryFile(suffix=".xlsx")
+    xlsx_yaz(dosya, sutunlar, satirlar)
+    dosya.seek(0)
+    # FileResponse dosyayı parça parça gönderir ve iş bitince kapatır (geçici dosya silinir)
+    return FileResponse(
+        dosya, as_attachment=True, filename=dosya_adi,
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
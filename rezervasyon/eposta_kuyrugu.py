@@ -0,0 +1,184 @@
+"""Giden e-posta kuyruğu (outbox).
+
+Admin istekleri e-postayı göndermez, yalnızca `GidenEposta` satırı olarak
+kuyruğa yazar (tek `bulk_create`). Kuyruk `kuyrugu_isle()` ile boşaltılır:
+mesajlar partiler hâlinde üstlenilir ve her parti tek bir SMTP bağlantısı
+(`get_connection()` + `send_messages`) üzerinden gönderilir; her mesaj için
+TLS el sıkışması yeniden yapılmaz. Gönderilemeyen mesaj üstel bekleme ile
+yeniden denenir, `EPOSTA_MAKS_DENEME` aşılınca "Başarısız" olarak kalır.
+
+Kuyruğu boşaltan işçi iki şekilde çalışır:
+    - Kuyruğa ekleme sonrası (commit'ten sonra) süreç içindeki tek iş
+      parçacıklı havuzda (EPOSTA_KUYRUGU_OTOMATIK = True ise)
+    - `python manage.py eposta_gonder` komutuyla (cron / ayrı süreç)
+"""
+
+import logging
+import smtplib
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import GidenEposta
+
+logger = logging.getLogger(__name__)
+
+PARTI_BOYUTU = 100
+# Üstlenilen parti bu süre içinde bitmezse (süreç öldüyse) yeniden kuyruğa döner
+USTLENME_SURESI = timedelta(minutes=10)
+
+_havuz = None
+_havuz_kilidi = threading.Lock()
+
+
+def maks_deneme():
+    return getattr(settings, "EPOSTA_MAKS_DENEME", 5)
+
+
+def bekleme_suresi(deneme_sayisi):
+    """Üstel geri çekilme: 1, 2, 4, 8 ... dakika (en fazla 1 saat)."""
+    taban = getattr(settings, "EPOSTA_TEKRAR_BEKLEME", 60)
+    return timedelta(seconds=min(taban * 2 ** (deneme_sayisi - 1), 3600))
+
+
+def kuyruga_ekle(alicilar, konu, metin, html=""):
+    """Her alıcı için bir mesaj kuyruğa yazar; eklenen mesaj sayısını döndürür."""
+    return toplu_kuyruga_ekle((a, konu, metin, html) for a in alicilar)
+
+
+def toplu_kuyruga_ekle(mesajlar):
+    """Kişiselleştirilmiş `(alici, konu, metin, html)` mesajlarını tek `bulk_create` ile yazar."""
+    simdi = timezone.now()
+    kayitlar = GidenEposta.objects.bulk_create(
+        [GidenEposta(alici=a, konu=k, metin=m, html=h, sonraki_deneme=simdi) for a, k, m, h in mesajlar],
+        batch_size=500,
+    )
+    if kayitlar and getattr(settings, "EPOSTA_KUYRUGU_OTOMATIK", True):
+        transaction.on_commit(isciyi_uyandir)
+    return len(kayitlar)
+
+
+def isciyi_uyandir():
+    """Kuyruğu süreç içindeki tek iş parçacıklı havuzda boşaltır."""
+    global _havuz
+    with _havuz_kilidi:
+        if _havuz is None:
+            # Tek işçi: aynı süreçte iki parti aynı SMTP kotasını paylaşmasın
+            _havuz = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eposta-kuyrugu")
+    _havuz.submit(_isci)
+
+
+def _isci():
+    try:
+        kuyrugu_isle()
+    except Exception:
+        logger.exception("E-posta kuyruğu işlenemedi")
+    finally:
+        close_old_connections()
+
+
+def _mesaj(kayit, baglanti):
+    mesaj = EmailMultiAlternatives(
+        kayit.konu, kayit.metin, settings.DEFAULT_FROM_EMAIL, [kayit.alici], connection=baglanti,
+    )
+    if kayit.html:
+        mesaj.attach_alternative(kayit.html, "text/html")
+    return mesaj
+
+
+def parti_ustlen(boyut=PARTI_BOYUTU):
+    """Zamanı gelmiş mesajlardan bir parti üstlenir (başka işçi aynısını alamaz)."""
+    simdi = timezone.now()
+    # Yarıda kalmış (süreci ölmüş) partiler yeniden kuyruğa döner
+    GidenEposta.objects.filter(durum=GidenEposta.GONDERILIYOR, sonraki_deneme__lte=simdi).update(
+        durum=GidenEposta.BEKLIYOR
+    )
+
+    idler = list(
+        GidenEposta.objects.filter(durum=GidenEposta.BEKLIYOR, sonraki_deneme__lte=simdi)
+        .order_by("sonraki_deneme", "id")
+        .values_list("id", flat=True)[:boyut]
+    )
+    if not idler:
+        return []
+    # Aynı idleri okuyan iki işçiden yalnızca UPDATE'i satırı değiştiren onu alır;
+    # geri okuma durumla değil bu üstlenmeye özgü anahtarla yapılır
+    anahtar = uuid.uuid4().hex
+    GidenEposta.objects.filter(id__in=idler, durum=GidenEposta.BEKLIYOR).update(
+        durum=GidenEposta.GONDERILIYOR, sonraki_deneme=simdi + USTLENME_SURESI, ustlenme_anahtari=anahtar
+    )
+    return list(GidenEposta.objects.filter(ustlenme_anahtari=anahtar, durum=GidenEposta.GONDERILIYOR).order_by("id"))
+
+
+def parti_gonder(kayitlar):
+    """Partiyi tek bağlantı üzerinden gönderir ve her mesajın durumunu yazar."""
+    baglanti = get_connection(fail_silently=False)
+    try:
+        baglanti.open()
+    except Exception as e:
+        # Sunucuya hiç bağlanılamadı: tüm parti yeniden denenecek
+        for kayit in kayitlar:
+            _basarisiz(kayit, e)
+        GidenEposta.objects.bulk_update(kayitlar, ["durum", "deneme_sayisi", "sonraki_deneme", "son_hata"])
+        return 0
+
+    gonderilen = 0
+    try:
+        for sira, kayit in enumerate(kayitlar):
+            try:
+                baglanti.send_messages([_mesaj(kayit, baglanti)])
+            except smtplib.SMTPServerDisconnected as e:
+                # Sunucu bağlantıyı kapattı: mesajı yeniden dene, bağlantıyı tazele
+                _basarisiz(kayit, e)
+                baglanti.close()
+                try:
+                    baglanti.open()
+                except Exception as e:
+                    # Yeniden bağlanılamadı: kalanlar da sonraki denemeye bırakılır
+                    for kalan in kayitlar[sira + 1:]:
+                        _basarisiz(kalan, e)
+                    break
+            except Exception as e:
+                _basarisiz(kayit, e)
+            else:
+                kayit.durum = GidenEposta.GONDERILDI
+                kayit.deneme_sayisi += 1
+                kayit.gonderilme_zamani = timezone.now()
+                kayit.son_hata = ""
+                gonderilen += 1
+    finally:
+        baglanti.close()
+        GidenEposta.objects.bulk_update(
+            kayitlar, ["durum", "deneme_sayisi", "sonraki_deneme", "son_hata", "gonderilme_zamani"]
+        )
+    return gonderilen
+
+
+def _basarisiz(kayit, hata):
+    kayit.deneme_sayisi += 1
+    kayit.son_hata = str(hata)[:1000]
+    if kayit.deneme_sayisi >= maks_deneme():
+        kayit.durum = GidenEposta.HATA
+    else:
+        kayit.durum = GidenEposta.BEKLIYOR
+        kayit.sonraki_deneme = timezone.now() + bekleme_suresi(kayit.deneme_sayisi)
+    logger.warning(f"E-posta gönderilemedi ({kayit.alici}, deneme {kayit.deneme_sayisi}): {hata}")
+
+
+def kuyrugu_isle(parti_boyutu=PARTI_BOYUTU, maks_parti=None):
+    """Zamanı gelmiş mesajları partiler hâlinde gönderir; gönderilen sayısını döndürür."""
+    toplam = 0
+    parti = 0
+    while maks_parti is None or parti < maks_parti:
+        kayitlar = parti_ustlen(parti_boyutu)
+        if not kayitlar:
+            break
+        toplam += parti_gonder(kayitlar)
+        parti += 1
+    return toplam
@@ -0,0 +1,92 @@
+"""E-posta şablon katmanı.
+
+Kampanya ve sistem mailleri Django şablonu olarak yazılır ve her kaynak
+metin süreç başına bir kez derlenir (`_derle` önbelleği). Alıcı başına yalnızca
+derlenmiş şablonun `render` edilmesi kalır; binlerce kişiselleştirilmiş mesaj
+milisaniyeler içinde hazırlanır.
+
+HTML gövdenin düz metin karşılığı işlenmiş HTML'den türetilir (bağlantılar
+`metin: adres` biçiminde korunur, satır sonları ve HTML varlıkları çözülür).
+Şablon kaynağı üzerinde çalışmak `{% if %}` blokları etiketleri sardığında
+bozulduğu için kaynaktan türetme yapılmaz. İşlenmiş gövdeler (ör. şifre
+sıfırlama bağlantıları) önbellekte tutulmaz.
+"""
+
+import html as html_modulu
+import os
+import re
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError
+from django.template import TemplateSyntaxError, engines
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+_BAGLANTI = re.compile(r'<a\s[^>]*?href\s*=\s*"([^"]*)"[^>]*>(.*?)</a>', re.S | re.I)
+_SATIR_SONU = re.compile(r"<br\s*/?>|</(?:p|div|h[1-6]|li|tr)>", re.I)
+
+# Şablon adı -> (mtime, EpostaSablonu): dosya değişmedikçe yeniden türetilmez
+_dosya_sablonlari = {}
+
+
+def duz_metin(kaynak):
+    """İşlenmiş HTML'yi okunur düz metne çevirir."""
+    kaynak = _BAGLANTI.sub(lambda m: f"{' '.join(strip_tags(m.group(2)).split())}: {m.group(1)}", kaynak)
+    kaynak = _SATIR_SONU.sub("\n", kaynak)
+    satirlar = [" ".join(s.split()) for s in html_modulu.unescape(strip_tags(kaynak)).splitlines()]
+
+    # Art arda boş satırlar tek boş satıra iner
+    temiz = []
+    for satir in satirlar:
+        if satir or (temiz and temiz[-1]):
+            temiz.append(satir)
+    return "\n".join(temiz).strip()
+
+
+@lru_cache(maxsize=64)
+def _derle(kaynak, kacis=True):
+    if not kacis:
+        kaynak = "{% autoescape off %}" + kaynak + "{% endautoescape %}"
+    return engines["django"].from_string(kaynak)
+
+
+def sablonu_dogrula(kaynak):
+    """Form doğrulaması için: şablon derlenemiyorsa ValidationError."""
+    try:
+        _derle(kaynak)
+    except TemplateSyntaxError as e:
+        raise ValidationError(f"Şablon hatası: {e}")
+    return kaynak
+
+
+class EpostaSablonu:
+    """Bir kez derlenen konu + gövde; alıcı bağlamlarını tek tek ya da toplu işler.
+
+    `html=True` ise gövde HTML'dir (otomatik kaçışlı) ve düz metin sürümü
+    işlenmiş HTML'den türetilir; aksi hâlde gövde düz metindir, HTML sürümü olmaz.
+    """
+
+    def __init__(self, govde, konu="", html=True):
+        self.konu = _derle(konu, kacis=False)
+        if html:
+            self.html, self.metin = _derle(govde), None
+        else:
+            self.html, self.metin = None, _derle(govde, kacis=False)
+
+    @classmethod
+    def dosyadan(cls, sablon_adi, konu=""):
+        """Şablon dosyasından (ör. password_reset_email.html) HTML e-posta şablonu."""
+        kaynak = get_template(sablon_adi).template
+        mtime = os.stat(kaynak.origin.name).st_mtime_ns
+        kayit = _dosya_sablonlari.get((sablon_adi, konu))
+        if kayit is None or kayit[0] != mtime:
+            kayit = (mtime, cls(kaynak.source, konu, html=True))
+            _dosya_sablonlari[(sablon_adi, konu)] = kayit
+        return kayit[1]
+
+    def isle(self, baglam):
+        """`(konu, metin, html)`; düz metin mailde html boş dizedir."""
+        konu = " ".join(self.konu.render(baglam).split())
+        html = self.html.render(baglam) if self.html else ""
+        metin = self.metin.render(baglam).strip() if self.metin else duz_metin(html)
+        return konu, metin, html
@@ -3,6 +3,7 @@ from django.contrib.auth.models import User
 from django.contrib.auth.forms import AuthenticationForm
 from django.core.validators import RegexValidator
 from .models import Profil, Ariza
+from .eposta_sablonu import sablonu_dogrula
 
 # --- CUSTOM LOGIN FORMU (EMAIL + USERNAME DESTEĞİ) ---
 class EmailOrUsernameAuthenticationForm(AuthenticationForm):
@@ -145,9 +146,18 @@ class KullaniciGuncellemeFormu(forms.ModelForm):
         }
 
 class AdminMassEmailForm(forms.Form):
-    subject = forms.CharField(max_length=200, label="Konu", widget=forms.TextInput(attrs={'class': 'vTextField'}))
-    message = forms.CharField(label="Mesaj", widget=forms.Textarea(attrs={'rows': 8, 'class': 'vLargeTextField'}))
+    subject = forms.CharField(max_length=200, label="Konu", widget=forms.TextInput(attrs={'class': 'vTextField'}),
+                              validators=[sablonu_dogrula])
+    message = forms.CharField(
+        label="Mesaj", widget=forms.Textarea(attrs={'rows': 8, 'class': 'vLargeTextField'}), validators=[sablonu_dogrula],
+        help_text="Kişiselleştirme: {{ ad }}, {{ soyad }}, {{ kullanici_adi }}, {{ eposta }}; "
+                  "randevu seçiminde ayrıca {{ cihaz }}, {{ lab }}, {{ tarih }}, {{ saat }}.",
+    )
     is_html = forms.BooleanField(required=False, initial=False, label="HTML olarak gönder")
+    dakikada_mesaj = forms.IntegerField(
+        min_value=1, max_value=600, initial=60, label="Dakikada mesaj",
+        help_text="SMTP sunucusunun kısıtlamasına takılmamak için gönderim hızı.",
+    )
 
 class ProfilGuncellemeFormu(forms.ModelForm):
     class Meta:
@@ -0,0 +1,339 @@
+"""Hız sınırlı, kaldığı yerden devam eden toplu e-posta kampanyaları.
+
+Gmail SMTP toplu gönderimi kısar; bu yüzden kampanya mesajları jeton kovası
+(`JetonKovasi`) ile `dakikada_mesaj` hızında, tek SMTP bağlantısı üzerinden
+gönderilir. Her alıcının durumu (`KampanyaAlicisi`) mesaj gönderilir
+gönderilmez yazılır; süreç yarıda ölürse kampanya yeniden başlatıldığında
+yalnızca "Sırada" olan alıcılar gönderilir, kimseye ikinci kez mail gitmez.
+
+Aynı kampanyayı iki işçinin göndermemesi için işçi kampanyayı koşullu bir
+UPDATE ile üstlenir (`isci_zamani`) ve her partide bu zamanı tazeler.
+Mesaj gönderirken ölen işçiden kalan "Gönderiliyor" alıcının mesajının
+gidip gitmediği bilinemez; tekrar göndermek yerine "Başarısız" işaretlenir
+ve yönetici isterse yeniden dener.
+
+Kesilen kampanyalar (ör. sunucu yeniden başlatıldıysa)
+`python manage.py kampanya_gonder` ile sürdürülür.
+"""
+
+import logging
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dt_time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.validators import validate_email
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .eposta_sablonu import EpostaSablonu
+from .models import Ariza, EpostaKampanyasi, KampanyaAlicisi, Profil, Randevu
+
+logger = logging.getLogger(__name__)
+
+PARTI_BOYUTU = 50
+# Bu süre boyunca canlılık bildirmeyen işçinin kampanyası başka işçiye geçer
+KILIT_SURESI = timedelta(minutes=5)
+# İçeriği hiç yazılmamış (formu terk edilmiş) taslaklar bu süreden sonra silinir
+TASLAK_OMRU = timedelta(days=1)
+
+_havuz = None
+_havuz_kilidi = threading.Lock()
+
+
+class JetonKovasi:
+    """Jeton kovası hız sınırlayıcı.
+
+    Kovada en fazla `kapasite` jeton birikir ve saniyede `hiz` jeton eklenir;
+    her mesaj bir jeton harcar. Kova boşsa `al()` yeni jeton gelene kadar bekler.
+    """
+
+    def __init__(self, hiz, kapasite=1, saat=time.monotonic, uyu=time.sleep):
+        self.hiz = hiz
+        self.kapasite = max(1, kapasite)
+        self.jeton = float(self.kapasite)
+        self._saat = saat
+        self._uyu = uyu
+        self._son = saat()
+
+    def _doldur(self):
+        simdi = self._saat()
+        self.jeton = min(self.kapasite, self.jeton + (simdi - self._son) * self.hiz)
+        self._son = simdi
+
+    def al(self):
+        self._doldur()
+        if self.jeton < 1:
+            self._uyu((1 - self.jeton) / self.hiz)
+            self._doldur()
+        self.jeton -= 1
+
+
+# Modelden alıcının e-posta adresine giden yol (values_list ile tek JOIN).
+# User ve proxy'leri (OnayBekleyenler, AktifOgrenciler) doğrudan `email` kullanır.
+EPOSTA_YOLLARI = {
+    Randevu: "kullanici__email",
+    Ariza: "kullanici__email",
+    Profil: "user__email",
+}
+
+
+# Kişiselleştirme değişkenleri: şablonda {{ ad }}, {{ cihaz }}, {{ tarih }} ...
+# Adreslerle aynı sorguda okunur, alıcı satırına (baglam) yazılır.
+KULLANICI_BAGLAMI = {"ad": "first_name", "soyad": "last_name", "kullanici_adi": "username"}
+BAGLAM_YOLLARI = {
+    User: KULLANICI_BAGLAMI,
+    Randevu: {
+        **{ad: f"kullanici__{alan}" for ad, alan in KULLANICI_BAGLAMI.items()},
+        "cihaz": "cihaz__isim", "lab": "cihaz__lab__isim", "tarih": "tarih", "saat": "baslangic_saati",
+    },
+    Ariza: {
+        **{ad: f"kullanici__{alan}" for ad, alan in KULLANICI_BAGLAMI.items()},
+        "cihaz": "cihaz__isim", "lab": "cihaz__lab__isim",
+    },
+    Profil: {ad: f"user__{alan}" for ad, alan in KULLANICI_BAGLAMI.items()},
+}
+
+
+def eposta_yolu(model):
+    if issubclass(model, User):
+        return "email"
+    try:
+        return EPOSTA_YOLLARI[model]
+    except KeyError:
+        raise ValueError(f"{model.__name__} için e-posta yolu tanımlı değil.")
+
+
+def _baglam_degeri(deger):
+    # Bağlam JSON alanında saklanır: tarih/saat gösterim biçiminde yazılır
+    if isinstance(deger, date):
+        return deger.strftime("%d.%m.%Y")
+    if isinstance(deger, dt_time):
+        return deger.strftime("%H:%M")
+    return deger if deger is not None else ""
+
+
+def alici_baglamlari(queryset, baglamli=True):
+    """Seçimin alıcılarını ve kişiselleştirme bağlamlarını tek sorguda çözer.
+
+    `({eposta: baglam}, eksik_sayisi)` döndürür. Adresler büyük/küçük harf
+    duyarsız tekilleştirilir (ilk kaydın bağlamı kalır) ve seçim sırasını
+    korur; adresi olmayan ya da geçersiz adresli kayıtlar eksik sayılır.
+    """
+    model = User if issubclass(queryset.model, User) else queryset.model
+    alanlar = BAGLAM_YOLLARI.get(model, {}) if baglamli else {}
+    adresler = {}
+    eksik = 0
+    for eposta, *degerler in queryset.values_list(eposta_yolu(model), *alanlar.values()).iterator():
+        eposta = (eposta or "").strip()
+        if not eposta:
+            eksik += 1
+            continue
+        anahtar = eposta.lower()
+        if anahtar in adresler:
+            continue
+        try:
+            validate_email(eposta)
+        except ValidationError:
+            eksik += 1
+            continue
+        adresler[anahtar] = (eposta, {ad: _baglam_degeri(d) for ad, d in zip(alanlar, degerler)})
+    return dict(adresler.values()), eksik
+
+
+def alici_epostalari(queryset):
+    """Yalnızca adresler: `(adresler, eksik_sayisi)`."""
+    adresler, eksik = alici_baglamlari(queryset, baglamli=False)
+    return list(adresler), eksik
+
+
+def kampanya_olustur(alicilar, konu="", metin="", html=False, dakikada_mesaj=None, olusturan=None, kaynak=""):
+    """Kampanyayı ve alıcılarını (tekrarlar atılarak) taslak olarak kaydeder.
+
+    `alicilar` adres listesi ya da `alici_baglamlari` çıktısı gibi
+    `{eposta: baglam}` sözlüğü olabilir. Konu ve mesaj boş bırakılabilir;
+    admin seçimi önce taslak kampanyaya dönüştürür, içerik form gönderilince
+    yazılır. `kaynak` alıcıların seçildiği modelin etiketidir (ör. "auth.user").
+    """
+    baglamlar = alicilar if isinstance(alicilar, dict) else {}
+    kampanya = EpostaKampanyasi.objects.create(
+        konu=konu, metin=metin, html=html, olusturan=olusturan, kaynak=kaynak,
+        dakikada_mesaj=dakikada_mesaj or getattr(settings, "EPOSTA_KAMPANYA_HIZI", 60),
+    )
+    KampanyaAlicisi.objects.bulk_create(
+        [KampanyaAlicisi(kampanya=kampanya, eposta=e, baglam=baglamlar.get(e, {})) for e in alicilar],
+        batch_size=500, ignore_conflicts=True,
+    )
+    return kampanya
+
+
+def baslat(kampanya):
+    """Kampanyayı gönderime alır; commit'ten sonra arka plan işçisi başlar.
+
+    Konusu ya da mesajı boş kampanya (içeriği yazılmamış taslak) başlatılmaz;
+    başlatılan kampanya sayısını (0/1) döndürür.
+    """
+    baslatilan = (
+        EpostaKampanyasi.objects.filter(pk=kampanya.pk)
+        .exclude(durum=EpostaKampanyasi.TAMAMLANDI)
+        .exclude(konu="").exclude(metin="")
+        .update(
+            durum=EpostaKampanyasi.GONDERILIYOR, son_hata="",
+            baslama_zamani=kampanya.baslama_zamani or timezone.now(),
+        )
+    )
+    if baslatilan:
+        transaction.on_commit(lambda: isciyi_uyandir(kampanya.pk))
+    return baslatilan
+
+
+def taslaklari_temizle():
+    """Formu terk edilmiş eski taslakları (alıcılarıyla) siler; silinen kampanya sayısını döndürür."""
+    eskiler = EpostaKampanyasi.objects.filter(
+        durum=EpostaKampanyasi.TASLAK, olusturulma_zamani__lt=timezone.now() - TASLAK_OMRU
+    )
+    return eskiler.delete()[1].get(EpostaKampanyasi._meta.label, 0)
+
+
+def duraklat(kampanya):
+    """İşçi bir sonraki partide durur; gönderilmiş alıcılar korunur."""
+    return EpostaKampanyasi.objects.filter(pk=kampanya.pk, durum=EpostaKampanyasi.GONDERILIYOR).update(
+        durum=EpostaKampanyasi.DURAKLATILDI
+    )
+
+
+def isciyi_uyandir(kampanya_id):
+    global _havuz
+    with _havuz_kilidi:
+        if _havuz is None:
+            # Tek işçi: kampanyalar aynı SMTP hesabının kotasını paylaşır
+            _havuz = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eposta-kampanya")
+    _havuz.submit(_isci, kampanya_id)
+
+
+def _isci(kampanya_id):
+    try:
+        kampanyayi_gonder(kampanya_id)
+    except Exception:
+        logger.exception(f"Kampanya gönderilemedi: #{kampanya_id}")
+    finally:
+        close_old_connections()
+
+
+def ustlen(kampanya_id):
+    """Kampanyayı bu işçi adına kilitler.
+
+    Kilit zamanı sahiplik damgası olarak döner (başka canlı işçi varsa None);
+    işçi canlılığını yalnızca damgası hâlâ kendisininse yenileyebilir.
+    """
+    simdi = timezone.now()
+    alindi = EpostaKampanyasi.objects.filter(
+        Q(isci_zamani__isnull=True) | Q(isci_zamani__lt=simdi - KILIT_SURESI),
+        pk=kampanya_id, durum=EpostaKampanyasi.GONDERILIYOR,
+    ).update(isci_zamani=simdi)
+    if not alindi:
+        return None
+    # Önceki işçi mesaj gönderirken öldüyse o mesajın akıbeti bilinmez
+    KampanyaAlicisi.objects.filter(kampanya_id=kampanya_id, durum=KampanyaAlicisi.GONDERILIYOR).update(
+        durum=KampanyaAlicisi.HATA, son_hata="Gönderim yarıda kesildi; teslim edilip edilmediği bilinmiyor."
+    )
+    return simdi
+
+
+def _mesaj(sablon, eposta, baglam, baglanti):
+    konu, metin, html = sablon.isle({**baglam, "eposta": eposta})
+    mesaj = EmailMultiAlternatives(konu, metin, settings.DEFAULT_FROM_EMAIL, [eposta], connection=baglanti)
+    if html:
+        mesaj.attach_alternative(html, "text/html")
+    return mesaj
+
+
+def _gonder(baglanti, mesaj):
+    try:
+        baglanti.send_messages([mesaj])
+    except smtplib.SMTPServerDisconnected:
+        # Sunucu boşta kalan bağlantıyı kapattı: bir kez yeniden bağlanıp dene
+        baglanti.close()
+        baglanti.open()
+        baglanti.send_messages([mesaj])
+
+
+def kampanyayi_gonder(kampanya_id, kova=None):
+    """Kampanyanın bekleyen alıcılarını hız sınırıyla gönderir; gönderilen sayısını döndürür."""
+    damga = ustlen(kampanya_id)
+    if damga is None:
+        return 0
+    kampanya = EpostaKampanyasi.objects.get(pk=kampanya_id)
+    if kova is None:
+        kova = JetonKovasi(
+            kampanya.dakikada_mesaj / 60, getattr(settings, "EPOSTA_KAMPANYA_KOVA", 5)
+        )
+    kampanyalar = EpostaKampanyasi.objects.filter(pk=kampanya_id)
+    # Konu ve gövde kampanya başına bir kez derlenir; alıcı başına yalnızca render
+    sablon = EpostaSablonu(kampanya.metin, kampanya.konu, html=kampanya.html)
+
+    baglanti = get_connection(fail_silently=False)
+    try:
+        baglanti.open()
+    except Exception as e:
+        kampanyalar.filter(isci_zamani=damga).update(
+            durum=EpostaKampanyasi.DURAKLATILDI, isci_zamani=None, son_hata=str(e)[:1000]
+        )
+        logger.warning(f"Kampanya #{kampanya_id} SMTP bağlantısı kurulamadı: {e}")
+        return 0
+
+    gonderilen = 0
+    try:
+        while True:
+            parti = list(
+                kampanya.alicilar.filter(durum=KampanyaAlicisi.BEKLIYOR)
+                .order_by("id").values_list("id", "eposta", "baglam")[:PARTI_BOYUTU]
+            )
+            if not parti:
+                kampanyalar.filter(durum=EpostaKampanyasi.GONDERILIYOR, isci_zamani=damga).update(
+                    durum=EpostaKampanyasi.TAMAMLANDI, tamamlanma_zamani=timezone.now()
+                )
+                return gonderilen
+
+            for alici_id, eposta, baglam in parti:
+                kova.al()
+                # Canlılık her mesajdan önce bildirilir: düşük hızda bir parti KILIT_SURESI'ni
+                # aşabilir. Duraklatıldıysa ya da kampanya başka işçiye geçtiyse (0 satır) dur
+                onceki, damga = damga, timezone.now()
+                if not kampanyalar.filter(durum=EpostaKampanyasi.GONDERILIYOR, isci_zamani=onceki).update(
+                    isci_zamani=damga
+                ):
+                    damga = onceki  # duraklatıldıysa kilit aşağıda bırakılabilsin
+                    return gonderilen
+                alici = KampanyaAlicisi.objects.filter(pk=alici_id)
+                # Alıcı koşullu üstlenilir: başka işçinin aldığı alıcıya ikinci mesaj gitmez
+                if not alici.filter(durum=KampanyaAlicisi.BEKLIYOR).update(durum=KampanyaAlicisi.GONDERILIYOR):
+                    continue
+                try:
+                    _gonder(baglanti, _mesaj(sablon, eposta, baglam, baglanti))
+                except Exception as e:
+                    alici.update(durum=KampanyaAlicisi.HATA, son_hata=str(e)[:1000])
+                    logger.warning(f"Kampanya #{kampanya_id}: {eposta} gönderilemedi ({e})")
+                else:
+                    # Her mesajın hemen ardından yazılır: kesintide tekrar gönderim olmaz
+                    alici.update(durum=KampanyaAlicisi.GONDERILDI, gonderilme_zamani=timezone.now())
+                    gonderilen += 1
+    finally:
+        baglanti.close()
+        # Kilit yalnızca hâlâ bu işçideyse bırakılır
+        kampanyalar.filter(isci_zamani=damga).update(isci_zamani=None)
+
+
+def kesilenleri_surdur():
+    """İşçisi ölmüş "Gönderiliyor" kampanyaları sırayla gönderir."""
+    sinir = timezone.now() - KILIT_SURESI
+    idler = EpostaKampanyasi.objects.filter(
+        Q(isci_zamani__isnull=True) | Q(isci_zamani__lt=sinir), durum=EpostaKampanyasi.GONDERILIYOR,
+    ).values_list("id", flat=True)
+    return sum(kampanyayi_gonder(kampanya_id) for kampanya_id in list(idler))
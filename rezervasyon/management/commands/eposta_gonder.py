@@ -0,0 +1,33 @@
+"""Giden e-posta kuyruğunu boşaltır.
+
+Kullanım:
+    python manage.py eposta_gonder                 # zamanı gelenleri gönder ve çık (cron)
+    python manage.py eposta_gonder --surekli       # kuyruğu sürekli izle
+    python manage.py eposta_gonder --parti 50 --aralik 30
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from rezervasyon.eposta_kuyrugu import PARTI_BOYUTU, kuyrugu_isle
+from rezervasyon.models import GidenEposta
+
+
+class Command(BaseCommand):
+    help = "Kuyruktaki e-postaları tek SMTP bağlantısı üzerinden partiler hâlinde gönderir."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--parti", type=int, default=PARTI_BOYUTU, help="Bir bağlantıda gönderilecek mesaj sayısı")
+        parser.add_argument("--surekli", action="store_true", help="Kuyruk boşalınca beklemeye devam et")
+        parser.add_argument("--aralik", type=int, default=15, help="--surekli modunda bekleme süresi (sn)")
+
+    def handle(self, *args, **options):
+        while True:
+            gonderilen = kuyrugu_isle(options["parti"])
+            if gonderilen or options["verbosity"] > 1:
+                bekleyen = GidenEposta.objects.filter(durum=GidenEposta.BEKLIYOR).count()
+                self.stdout.write(f"{gonderilen} e-posta gönderildi, {bekleyen} mesaj sırada.")
+            if not options["surekli"]:
+                break
+            time.sleep(options["aralik"])
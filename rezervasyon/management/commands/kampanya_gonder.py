@@ -0,0 +1,28 @@
+"""Yarıda kalmış e-posta kampanyalarını sürdürür.
+
+Kullanım:
+    python manage.py kampanya_gonder               # işçisi ölmüş tüm kampanyalar
+    python manage.py kampanya_gonder --kampanya 12 # tek kampanya
+
+Gönderilmiş alıcılar atlanır; yalnızca "Sırada" olanlara mail gider. Formu terk
+edilmiş eski taslak kampanyalar da silinir.
+"""
+
+from django.core.management.base import BaseCommand
+
+from rezervasyon.kampanya import kampanyayi_gonder, kesilenleri_surdur, taslaklari_temizle
+
+
+class Command(BaseCommand):
+    help = "Gönderimi kesilen e-posta kampanyalarını kaldığı yerden, hız sınırıyla sürdürür."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kampanya", type=int, help="Kampanya id")
+
+    def handle(self, *args, **options):
+        if options["kampanya"]:
+            gonderilen = kampanyayi_gonder(options["kampanya"])
+        else:
+            taslaklari_temizle()
+            gonderilen = kesilenleri_surdur()
+        self.stdout.write(self.style.SUCCESS(f"{gonderilen} e-posta gönderildi."))
@@ -0,0 +1,73 @@
+"""PDF motorlarının performans karşılaştırması.
+
+Kullanım:
+    python manage.py pdf_benchmark
+    python manage.py pdf_benchmark --satir 10 1000 --motor reportlab --bellek
+
+Veritabanına dokunmaz: `randevu_pdf.html` bağlamıyla aynı yapıda sentetik
+randevular üretir ve her satır sayısı için iki motoru (xhtml2pdf ve doğrudan
+reportlab) ölçer. `--bellek` ile en yüksek Python bellek kullanımı da
+(tracemalloc) raporlanır; bu modda süreler yavaşlar, karşılaştırma için
+bellek ve süre ayrı çalıştırmalarda okunmalıdır.
+"""
+
+import io
+import time as zaman
+import tracemalloc
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand
+
+from rezervasyon.utils import PDF_MOTORLARI, pdf_yaz
+
+DURUMLAR = ["onaylandi", "geldi", "onay_bekleniyor", "reddedildi"]
+
+
+def sentetik_baglam(adet):
+    gun = date(2026, 9, 1)
+    return {
+        "user": {"id": 1, "username": "ogr1", "first_name": "Ad", "last_name": "Soyad",
+                 "email": "ogr1@ogr.btu.edu.tr"},
+        "randevular": [
+            {
+                "tarih": gun + timedelta(days=i % 300),
+                "baslangic_saati": time(8 + i % 8),
+                "bitis_saati": time(9 + i % 8),
+                "durum": DURUMLAR[i % len(DURUMLAR)],
+                "cihaz": {"isim": f"Cihaz {i % 40}", "lab": {"isim": "Fizik Lab"}},
+            }
+            for i in range(adet)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "xhtml2pdf ve doğrudan reportlab PDF motorlarını 10 / 1.000 / 10.000 satırda karşılaştırır."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--satir", type=int, nargs="+", default=[10, 1000, 10000])
+        parser.add_argument("--motor", choices=dict(PDF_MOTORLARI), nargs="+", default=list(dict(PDF_MOTORLARI)))
+        parser.add_argument("--bellek", action="store_true", help="tracemalloc ile tepe belleği ölç")
+
+    def handle(self, *args, **options):
+        for adet in options["satir"]:
+            baglam = sentetik_baglam(adet)
+            for motor in options["motor"]:
+                if options["bellek"]:
+                    tracemalloc.start()
+                tampon = io.BytesIO()
+                baslangic = zaman.perf_counter()
+                basarili = pdf_yaz("randevu_pdf.html", baglam, tampon, motor)
+                sure = zaman.perf_counter() - baslangic
+
+                satir = (
+                    f"{adet:>6} satır | {motor:<9}: {sure:7.2f} sn | "
+                    f"dosya {len(tampon.getvalue()) / 1024:8.1f} KB"
+                )
+                if options["bellek"]:
+                    _, tepe = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    satir += f" | tepe bellek {tepe / 1024 / 1024:7.1f} MB"
+                if not basarili:
+                    satir += " | HATA"
+                self.stdout.write(satir)
@@ -0,0 +1,20 @@
+"""PDF kuyruğunda yarım kalmış işleri temizler.
+
+Süreç yeniden başladığında havuzdaki işler kaybolur. Bu komut zaman aşımını
+geçmiş bitmemiş işleri hataya çeker ve sırada bekleyen işleri çalıştırır.
+
+Kullanım:
+    python manage.py pdf_kuyrugu     # dağıtım sonrası ya da cron ile
+"""
+
+from django.core.management.base import BaseCommand
+
+from rezervasyon.pdf_kuyrugu import kuyrugu_temizle
+
+
+class Command(BaseCommand):
+    help = "Yarım kalmış PDF işlerini kapatır ve sıradaki işleri çalıştırır."
+
+    def handle(self, *args, **options):
+        kapatilan, calistirilan = kuyrugu_temizle()
+        self.stdout.write(f"{kapatilan} yarım iş kapatıldı, {calistirilan} iş çalıştırıldı.")
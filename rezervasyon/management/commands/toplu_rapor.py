@@ -0,0 +1,58 @@
+"""Toplu randevu raporu üretimi.
+
+Kullanım:
+    python manage.py toplu_rapor --lab 2 --baslangic 2026-09-01 --bitis 2026-09-30
+    python manage.py toplu_rapor --cihaz 7 --birlesik --cikti eylul.pdf --isci 4
+    python manage.py toplu_rapor --lab 2 --motor reportlab
+
+Filtreler birlikte kullanılabilir; hiçbiri verilmezse tüm randevular alınır.
+Varsayılan çıktı kullanıcı başına bir PDF içeren ZIP arşividir.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rezervasyon.models import Randevu
+from rezervasyon.toplu_rapor import BIRLESIK, ZIP, toplu_rapor_yaz
+from rezervasyon.utils import PDF_MOTORLARI
+
+
+def _tarih(deger):
+    try:
+        return date.fromisoformat(deger)
+    except ValueError:
+        raise CommandError(f"Geçersiz tarih: {deger} (YYYY-AA-GG bekleniyor)")
+
+
+class Command(BaseCommand):
+    help = "Lab / cihaz / tarih aralığı için kullanıcı başına PDF raporlarını üretir (ZIP ya da tek PDF)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lab", type=int, help="Laboratuvar id")
+        parser.add_argument("--cihaz", type=int, help="Cihaz id")
+        parser.add_argument("--baslangic", type=_tarih, help="İlk tarih (dahil)")
+        parser.add_argument("--bitis", type=_tarih, help="Son tarih (dahil)")
+        parser.add_argument("--birlesik", action="store_true", help="ZIP yerine tek birleşik PDF üret")
+        parser.add_argument("--cikti", help="Çıktı dosyası (varsayılan randevu_raporlari.zip/.pdf)")
+        parser.add_argument("--isci", type=int, help="Süreç sayısı (varsayılan: CPU sayısı)")
+        parser.add_argument("--motor", choices=dict(PDF_MOTORLARI), default="",
+                            help="PDF motoru (varsayılan: settings.PDF_MOTORU)")
+
+    def handle(self, *args, **options):
+        queryset = Randevu.objects.all()
+        if options["lab"]:
+            queryset = queryset.filter(cihaz__lab_id=options["lab"])
+        if options["cihaz"]:
+            queryset = queryset.filter(cihaz_id=options["cihaz"])
+        if options["baslangic"]:
+            queryset = queryset.filter(tarih__gte=options["baslangic"])
+        if options["bitis"]:
+            queryset = queryset.filter(tarih__lte=options["bitis"])
+
+        bicim = BIRLESIK if options["birlesik"] else ZIP
+        cikti = options["cikti"] or ("randevu_raporlari.pdf" if bicim == BIRLESIK else "randevu_raporlari.zip")
+
+        with open(cikti, "wb") as dosya:
+            adet = toplu_rapor_yaz(queryset, dosya, bicim, options["isci"], options["motor"])
+        self.stdout.write(self.style.SUCCESS(f"{adet} kullanıcı raporu yazıldı: {cikti}"))
@@ -0,0 +1,56 @@
+"""XLSX dışa aktarma performans ölçümü.
+
+Kullanım:
+    python manage.py xlsx_benchmark --satir 1000 100000
+    python manage.py xlsx_benchmark --satir 100000 --bellek
+
+Veritabanına dokunmaz: Randevu sütunlarıyla aynı tipte sentetik satırlar
+üretip write-only yazıcıdan geçirir ve süreyi raporlar. `--bellek` ile en
+yüksek Python bellek kullanımı da (tracemalloc) ölçülür; tracemalloc yazımı
+belirgin şekilde yavaşlattığı için bu modda süre değerleri karşılaştırılmamalıdır.
+Bellek satır sayısından bağımsız kalmalıdır.
+"""
+
+import tempfile
+import time as zaman
+import tracemalloc
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand
+
+from rezervasyon.disa_aktar import RANDEVU_SUTUNLARI, xlsx_yaz
+
+
+def sentetik_randevular(adet):
+    gun = date(2026, 9, 1)
+    for i in range(adet):
+        yield (
+            f"ogr{i}", "Ad", "Soyad", f"ogr{i}@ogr.btu.edu.tr", "Fizik Lab", f"Cihaz {i % 40}",
+            gun + timedelta(days=i % 300), time(8 + i % 8), time(9 + i % 8), "onaylandi",
+            "yonetici", datetime(2026, 8, 1, 12, 0),
+        )
+
+
+class Command(BaseCommand):
+    help = "XLSX yazıcısını sentetik Randevu satırlarıyla ölçer (varsayılan 100.000 satır)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--satir", type=int, nargs="+", default=[1000, 100000])
+        parser.add_argument("--bellek", action="store_true", help="tracemalloc ile tepe belleği ölç")
+
+    def handle(self, *args, **options):
+        for adet in options["satir"]:
+            if options["bellek"]:
+                tracemalloc.start()
+            baslangic = zaman.perf_counter()
+            with tempfile.TemporaryFile(suffix=".xlsx") as dosya:
+                xlsx_yaz(dosya, RANDEVU_SUTUNLARI, sentetik_randevular(adet))
+                boyut = dosya.tell()
+            sure = zaman.perf_counter() - baslangic
+
+            satir = f"{adet:>8} satır: {sure:7.2f} sn | dosya {boyut / 1024 / 1024:6.1f} MB"
+            if options["bellek"]:
+                _, tepe = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                satir += f" | tepe bellek {tepe / 1024 / 1024:6.1f} MB"
+            self.stdout.write(satir)
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rezervasyon", "0011_alter_cihaz_isim_alter_duyuru_icerik_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="randevu",
+            index=models.Index(
+                fields=["cihaz", "tarih", "durum", "baslangic_saati", "bitis_saati"],
+                name="randevu_cakisma_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rezervasyon", "0012_randevu_cakisma_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CihazGunKilidi",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("tarih", models.DateField(verbose_name="Tarih")),
+                (
+                    "cihaz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="rezervasyon.cihaz",
+                        verbose_name="Cihaz",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Cihaz Gün Kilidi",
+                "verbose_name_plural": "Cihaz Gün Kilitleri",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("cihaz", "tarih"), name="cihaz_gun_kilidi_tekil"
+                    )
+                ],
+            },
+        ),
+    ]
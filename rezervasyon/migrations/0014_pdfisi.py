@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rezervasyon", "0013_cihazgunkilidi"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PdfIsi",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sablon",
+                    models.CharField(
+                        default="randevu_pdf.html",
+                        max_length=100,
+                        verbose_name="Şablon",
+                    ),
+                ),
+                (
+                    "dosya_adi",
+                    models.CharField(max_length=150, verbose_name="İndirme Adı"),
+                ),
+                (
+                    "durum",
+                    models.CharField(
+                        choices=[
+                            ("bekliyor", "Sırada"),
+                            ("calisiyor", "Hazırlanıyor"),
+                            ("hazir", "Hazır"),
+                            ("hata", "Hata"),
+                        ],
+                        default="bekliyor",
+                        max_length=20,
+                        verbose_name="Durum",
+                    ),
+                ),
+                (
+                    "dosya",
+                    models.FileField(
+                        blank=True,
+                        upload_to="pdf_raporlari/",
+                        verbose_name="PDF Dosyası",
+                    ),
+                ),
+                ("hata", models.TextField(blank=True, verbose_name="Hata Mesajı")),
+                (
+                    "olusturulma_zamani",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma"),
+                ),
+                (
+                    "tamamlanma_zamani",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Tamamlanma"
+                    ),
+                ),
+                (
+                    "kullanici",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Kullanıcı",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "PDF İşi",
+                "verbose_name_plural": "PDF İşleri",
+                "ordering": ["-olusturulma_zamani"],
+            },
+        ),
+    ]
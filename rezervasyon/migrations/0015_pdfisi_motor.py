@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rezervasyon", "0014_pdfisi"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pdfisi",
+            name="motor",
+            field=models.CharField(
+                blank=True, max_length=20, verbose_name="PDF Motoru"
+            ),
+        ),
+    ]
@@ -0,0 +1,154 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rezervasyon", "0016_gideneposta"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EpostaKampanyasi",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "konu",
+                    models.CharField(blank=True, max_length=255, verbose_name="Konu"),
+                ),
+                ("metin", models.TextField(blank=True, verbose_name="Mesaj")),
+                (
+                    "html",
+                    models.BooleanField(default=False, verbose_name="HTML Gönder"),
+                ),
+                (
+                    "dakikada_mesaj",
+                    models.PositiveIntegerField(
+                        default=60, verbose_name="Dakikada Mesaj"
+                    ),
+                ),
+                (
+                    "durum",
+                    models.CharField(
+                        choices=[
+                            ("taslak", "Taslak"),
+                            ("gonderiliyor", "Gönderiliyor"),
+                            ("duraklatildi", "Duraklatıldı"),
+                            ("tamamlandi", "Tamamlandı"),
+                        ],
+                        default="taslak",
+                        max_length=20,
+                        verbose_name="Durum",
+                    ),
+                ),
+                (
+                    "isci_zamani",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="İşçi Canlılık"
+                    ),
+                ),
+                ("son_hata", models.TextField(blank=True, verbose_name="Son Hata")),
+                (
+                    "olusturulma_zamani",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma"),
+                ),
+                (
+                    "baslama_zamani",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Başlama"),
+                ),
+                (
+                    "tamamlanma_zamani",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Tamamlanma"
+                    ),
+                ),
+                (
+                    "olusturan",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Oluşturan",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "E-Posta Kampanyası",
+                "verbose_name_plural": "E-Posta Kampanyaları",
+                "ordering": ["-olusturulma_zamani"],
+            },
+        ),
+        migrations.CreateModel(
+            name="KampanyaAlicisi",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("eposta", models.EmailField(max_length=254, verbose_name="E-Posta")),
+                (
+                    "durum",
+                    models.CharField(
+                        choices=[
+                            ("bekliyor", "Sırada"),
+                            ("gonderiliyor", "Gönderiliyor"),
+                            ("gonderildi", "Gönderildi"),
+                            ("hata", "Başarısız"),
+                        ],
+                        default="bekliyor",
+                        max_length=20,
+                        verbose_name="Durum",
+                    ),
+                ),
+                ("son_hata", models.TextField(blank=True, verbose_name="Son Hata")),
+                (
+                    "gonderilme_zamani",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Gönderilme"
+                    ),
+                ),
+                (
+                    "kampanya",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alicilar",
+                        to="rezervasyon.epostakampanyasi",
+                        verbose_name="Kampanya",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Kampanya Alıcısı",
+                "verbose_name_plural": "Kampanya Alıcıları",
+                "indexes": [
+                    models.Index(
+                        fields=["kampanya", "durum"], name="kampanya_alici_durum_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kampanya", "eposta"), name="kampanya_alici_tekil"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rezervasyon", "0017_eposta_kampanyasi"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="kampanyaalicisi",
+            name="baglam",
+            field=models.JSONField(
+                blank=True, default=dict, verbose_name="Kişiselleştirme"
+            ),
+        ),
+    ]
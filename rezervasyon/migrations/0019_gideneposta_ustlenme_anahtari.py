@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rezervasyon", "0018_kampanyaalicisi_baglam"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gideneposta",
+            name="ustlenme_anahtari",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=32,
+                verbose_name="Üstlenme Anahtarı",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rezervasyon", "0019_gideneposta_ustlenme_anahtari"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="epostakampanyasi",
+            name="kaynak",
+            field=models.CharField(
+                blank=True, editable=False, max_length=100, verbose_name="Alıcı Kaynağı"
+            ),
+        ),
+    ]
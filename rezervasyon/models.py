@@ -1,8 +1,13 @@
+from django.apps import apps
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+
+from .cakisma import AralikIndeksi, bos_araliklar
 
 # 1. Kapsayıcı: Laboratuvar
 class Laboratuvar(models.Model):
@@ -34,6 +39,102 @@ class Cihaz(models.Model):
 
 
 # 3. İşlem: Randevu
+class RandevuQuerySet(models.QuerySet):
+    """Çakışma kontrolünün tek adresi (views.check_overlap ve Randevu.clean bunu kullanır)."""
+
+    def slot_tutan(self):
+        """Cihazın o saatini meşgul eden randevular (iptal/red/gelmedi hariç)."""
+        return self.filter(durum__in=Randevu.SLOT_TUTAN_DURUMLAR)
+
+    def cakisanlar(self, cihaz, tarih, baslangic, bitis, haric_id=None):
+        qs = self.slot_tutan().filter(
+            cihaz=cihaz, tarih=tarih,
+            baslangic_saati__lt=bitis, bitis_saati__gt=baslangic,
+        )
+        if haric_id:
+            qs = qs.exclude(pk=haric_id)
+        return qs
+
+    def guvenli_olustur(self, kullanici, cihaz, tarih, baslangic, bitis, **ekstra):
+        """Çakışma kontrolü + kayıt işlemini cihaz-gün kilidi altında yapar.
+
+        Aynı cihazın aynı gününe gelen eşzamanlı istekler `CihazGunKilidi`
+        satırında sıraya girer (PostgreSQL/MySQL: SELECT ... FOR UPDATE;
+        SQLite: settings'teki IMMEDIATE işlem modu yazıcıları sıraya sokar).
+        Böylece iki istek aynı anda kontrolü geçip çift kayıt oluşturamaz.
+        Çakışma varsa ValidationError fırlatır.
+        """
+        with transaction.atomic():
+            kilit, _ = CihazGunKilidi.objects.get_or_create(cihaz=cihaz, tarih=tarih)
+            CihazGunKilidi.objects.select_for_update().filter(pk=kilit.pk).exists()
+
+            if self.cakisanlar(cihaz, tarih, baslangic, bitis).exists():
+                raise ValidationError("Bu saat aralığında bu cihaz için başka bir randevu zaten mevcut!")
+            return self.create(
+                kullanici=kullanici, cihaz=cihaz, tarih=tarih,
+                baslangic_saati=baslangic, bitis_saati=bitis, **ekstra,
+            )
+
+    def bos_araliklar(self, cihaz, tarih, acilis, kapanis):
+        """Cihazın o gündeki boş saat aralıkları (tek sorgu + sıralı tarama)."""
+        dolu = (
+            self.slot_tutan()
+            .filter(cihaz=cihaz, tarih=tarih, baslangic_saati__lt=kapanis, bitis_saati__gt=acilis)
+            .order_by("baslangic_saati")
+            .values_list("baslangic_saati", "bitis_saati")
+        )
+        return bos_araliklar(dolu, acilis, kapanis)
+
+    def gunluk_dolu_araliklar(self, cihaz_idler, bas_tarih, bit_tarih, acilis, kapanis):
+        """Birden çok cihaz ve gün için dolu aralıklar, tek sorguda.
+
+        `{(cihaz_id, tarih): [(baslangic, bitis), ...]}` döner; listeler
+        başlangıca göre sıralıdır (doğrudan `bos_araliklar` ile taranabilir).
+        `bit_tarih` dahildir.
+        """
+        satirlar = (
+            self.slot_tutan()
+            .filter(
+                cihaz_id__in=cihaz_idler, tarih__range=(bas_tarih, bit_tarih),
+                baslangic_saati__lt=kapanis, bitis_saati__gt=acilis,
+            )
+            .order_by("cihaz_id", "tarih", "baslangic_saati")
+            .values_list("cihaz_id", "tarih", "baslangic_saati", "bitis_saati")
+        )
+        gunluk = {}
+        for cihaz_id, tarih, bas, bit in satirlar:
+            gunluk.setdefault((cihaz_id, tarih), []).append((bas, bit))
+        return gunluk
+
+    def musait_slotlar(self, cihaz, slotlar, haric_id=None):
+        """Aday `(tarih, baslangic, bitis)` slotlarından boş olanları döndürür.
+
+        Slot sayısından bağımsız olarak tek sorgu atılır: adayların kapsadığı
+        günlerdeki dolu aralıklar çekilir, gün başına bir AralikIndeksi kurulur.
+        """
+        slotlar = list(slotlar)
+        if not slotlar:
+            return []
+        qs = self.slot_tutan().filter(
+            cihaz=cihaz,
+            tarih__in={s[0] for s in slotlar},
+            baslangic_saati__lt=max(s[2] for s in slotlar),
+            bitis_saati__gt=min(s[1] for s in slotlar),
+        )
+        if haric_id:
+            qs = qs.exclude(pk=haric_id)
+
+        gunluk = {}
+        for tarih, bas, bit in qs.values_list("tarih", "baslangic_saati", "bitis_saati"):
+            gunluk.setdefault(tarih, []).append((bas, bit))
+        indeksler = {tarih: AralikIndeksi(araliklar) for tarih, araliklar in gunluk.items()}
+
+        return [
+            (tarih, bas, bit) for tarih, bas, bit in slotlar
+            if tarih not in indeksler or not indeksler[tarih].cakisiyor_mu(bas, bit)
+        ]
+
+
 class Randevu(models.Model):
     # DURUM SABİTLERİ (En güvenli yöntem)
     ONAY_BEKLENIYOR = "onay_bekleniyor"
@@ -52,6 +153,9 @@ class Randevu(models.Model):
         (IPTAL, "İptal Edildi"),
     ]
 
+    # Cihazın saatini meşgul eden durumlar (çakışma kontrolünde dikkate alınır)
+    SLOT_TUTAN_DURUMLAR = [ONAY_BEKLENIYOR, ONAYLANDI, GELDI]
+
     kullanici = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Randevuyu Alan")
     cihaz = models.ForeignKey(Cihaz, on_delete=models.PROTECT, verbose_name="Seçilen Cihaz")
     tarih = models.DateField(verbose_name="Randevu Tarihi")
@@ -75,9 +179,18 @@ class Randevu(models.Model):
         related_name="onaylanan_randevular",
     )
 
+    objects = RandevuQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Randevu"
         verbose_name_plural = "Randevular"
+        indexes = [
+            # Çakışma sorgusu: cihaz + gün + durum eşitliği, saatlerde aralık taraması
+            models.Index(
+                fields=["cihaz", "tarih", "durum", "baslangic_saati", "bitis_saati"],
+                name="randevu_cakisma_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.kullanici.username} - {self.cihaz.isim} - {self.tarih}"
@@ -85,15 +198,8 @@ class Randevu(models.Model):
     def clean(self):
         if self.durum != self.IPTAL:
             # Çakışma kontrolü
-            cakisma_var_mi = Randevu.objects.filter(
-                cihaz=self.cihaz, 
-                tarih=self.tarih, 
-                durum__in=[self.ONAY_BEKLENIYOR, self.ONAYLANDI, self.GELDI]
-            ).exclude(pk=self.pk)
-
-            cakisma = cakisma_var_mi.filter(
-                baslangic_saati__lt=self.bitis_saati,
-                bitis_saati__gt=self.baslangic_saati,
+            cakisma = Randevu.objects.cakisanlar(
+                self.cihaz_id, self.tarih, self.baslangic_saati, self.bitis_saati, haric_id=self.pk,
             )
 
             if cakisma.exists():
@@ -118,6 +224,23 @@ class Randevu(models.Model):
         """Herhangi bir aşamada randevuyu iptal/red durumuna çeker"""
         self.durum = self.REDDEDILDI  # Veya self.IPTAL, hangisini tercih edersen
 
+# 3.1 Eşzamanlılık: Cihaz-gün kilidi
+class CihazGunKilidi(models.Model):
+    """Bir cihazın bir gününe yapılan rezervasyonları sıraya sokan kilit satırı."""
+    cihaz = models.ForeignKey(Cihaz, on_delete=models.CASCADE, verbose_name="Cihaz")
+    tarih = models.DateField(verbose_name="Tarih")
+
+    class Meta:
+        verbose_name = "Cihaz Gün Kilidi"
+        verbose_name_plural = "Cihaz Gün Kilitleri"
+        constraints = [
+            models.UniqueConstraint(fields=["cihaz", "tarih"], name="cihaz_gun_kilidi_tekil"),
+        ]
+
+    def __str__(self):
+        return f"{self.cihaz_id} - {self.tarih}"
+
+
 # 4. Profil
 class Profil(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, verbose_name="Kullanıcı")
@@ -194,4 +317,178 @@ class AktifOgrenciler(User):
     class Meta:
         proxy = True
         verbose_name = "Aktif Öğrenci"
-        verbose_name_plural = "🟢 Aktif Öğrenciler"
\ No newline at end of file
+        verbose_name_plural = "🟢 Aktif Öğrenciler"
+
+# 8. Arka Plan PDF İşleri
+class PdfIsi(models.Model):
+    """Kuyruğa alınmış PDF raporu; dosya hazır olunca `dosya` alanına yazılır."""
+    BEKLIYOR = "bekliyor"
+    CALISIYOR = "calisiyor"
+    HAZIR = "hazir"
+    HATA = "hata"
+
+    DURUM_SECENEKLERI = [
+        (BEKLIYOR, "Sırada"),
+        (CALISIYOR, "Hazırlanıyor"),
+        (HAZIR, "Hazır"),
+        (HATA, "Hata"),
+    ]
+
+    kullanici = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Kullanıcı")
+    sablon = models.CharField(max_length=100, default="randevu_pdf.html", verbose_name="Şablon")
+    motor = models.CharField(max_length=20, blank=True, verbose_name="PDF Motoru")
+    dosya_adi = models.CharField(max_length=150, verbose_name="İndirme Adı")
+    durum = models.CharField(max_length=20, choices=DURUM_SECENEKLERI, default=BEKLIYOR, verbose_name="Durum")
+    dosya = models.FileField(upload_to="pdf_raporlari/", blank=True, verbose_name="PDF Dosyası")
+    hata = models.TextField(blank=True, verbose_name="Hata Mesajı")
+    olusturulma_zamani = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma")
+    tamamlanma_zamani = models.DateTimeField(null=True, blank=True, verbose_name="Tamamlanma")
+
+    class Meta:
+        verbose_name = "PDF İşi"
+        verbose_name_plural = "PDF İşleri"
+        ordering = ["-olusturulma_zamani"]
+
+    def __str__(self):
+        return f"{self.kullanici.username} - {self.get_durum_display()}"
+
+    @property
+    def bitti_mi(self):
+        return self.durum in (self.HAZIR, self.HATA)
+
+
+# 9. Giden E-Posta Kuyruğu (Outbox)
+class GidenEposta(models.Model):
+    """Gönderilmeyi bekleyen tek bir e-posta; durumu mesaj bazında izlenir."""
+    BEKLIYOR = "bekliyor"
+    GONDERILIYOR = "gonderiliyor"
+    GONDERILDI = "gonderildi"
+    HATA = "hata"
+
+    DURUM_SECENEKLERI = [
+        (BEKLIYOR, "Sırada"),
+        (GONDERILIYOR, "Gönderiliyor"),
+        (GONDERILDI, "Gönderildi"),
+        (HATA, "Başarısız"),
+    ]
+
+    alici = models.EmailField(verbose_name="Alıcı")
+    konu = models.CharField(max_length=255, verbose_name="Konu")
+    metin = models.TextField(verbose_name="Düz Metin")
+    html = models.TextField(blank=True, verbose_name="HTML İçerik")
+    durum = models.CharField(max_length=20, choices=DURUM_SECENEKLERI, default=BEKLIYOR, verbose_name="Durum")
+    deneme_sayisi = models.PositiveSmallIntegerField(default=0, verbose_name="Deneme Sayısı")
+    sonraki_deneme = models.DateTimeField(default=timezone.now, verbose_name="Sonraki Deneme")
+    son_hata = models.TextField(blank=True, verbose_name="Son Hata")
+    olusturulma_zamani = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma")
+    gonderilme_zamani = models.DateTimeField(null=True, blank=True, verbose_name="Gönderilme")
+    # Partiyi üstlenen işçinin anahtarı: parti yalnızca bu anahtarla geri okunur
+    ustlenme_anahtari = models.CharField(max_length=32, blank=True, editable=False, verbose_name="Üstlenme Anahtarı")
+
+    class Meta:
+        verbose_name = "Giden E-Posta"
+        verbose_name_plural = "Giden E-Postalar"
+        ordering = ["-olusturulma_zamani"]
+        indexes = [
+            models.Index(fields=["durum", "sonraki_deneme"], name="giden_eposta_kuyruk_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.alici} - {self.konu}"
+
+
+# 10. Toplu E-Posta Kampanyaları
+class EpostaKampanyasi(models.Model):
+    """Hız sınırlı, kaldığı yerden devam edebilen toplu e-posta gönderimi."""
+    TASLAK = "taslak"
+    GONDERILIYOR = "gonderiliyor"
+    DURAKLATILDI = "duraklatildi"
+    TAMAMLANDI = "tamamlandi"
+
+    DURUM_SECENEKLERI = [
+        (TASLAK, "Taslak"),
+        (GONDERILIYOR, "Gönderiliyor"),
+        (DURAKLATILDI, "Duraklatıldı"),
+        (TAMAMLANDI, "Tamamlandı"),
+    ]
+
+    konu = models.CharField(max_length=255, blank=True, verbose_name="Konu")
+    metin = models.TextField(blank=True, verbose_name="Mesaj")
+    html = models.BooleanField(default=False, verbose_name="HTML Gönder")
+    dakikada_mesaj = models.PositiveIntegerField(default=60, verbose_name="Dakikada Mesaj")
+    durum = models.CharField(max_length=20, choices=DURUM_SECENEKLERI, default=TASLAK, verbose_name="Durum")
+    olusturan = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Oluşturan"
+    )
+    # Alıcıların seçildiği model ("app_label.model_name"); form başlığında gösterilir
+    kaynak = models.CharField(max_length=100, blank=True, editable=False, verbose_name="Alıcı Kaynağı")
+    # Gönderen işçinin son canlılık zamanı; aynı kampanyayı iki işçi gönderemez
+    isci_zamani = models.DateTimeField(null=True, blank=True, verbose_name="İşçi Canlılık")
+    son_hata = models.TextField(blank=True, verbose_name="Son Hata")
+    olusturulma_zamani = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma")
+    baslama_zamani = models.DateTimeField(null=True, blank=True, verbose_name="Başlama")
+    tamamlanma_zamani = models.DateTimeField(null=True, blank=True, verbose_name="Tamamlanma")
+
+    class Meta:
+        verbose_name = "E-Posta Kampanyası"
+        verbose_name_plural = "E-Posta Kampanyaları"
+        ordering = ["-olusturulma_zamani"]
+
+    def __str__(self):
+        return self.konu or f"Kampanya #{self.pk}"
+
+    def kaynak_adi(self):
+        """Alıcıların seçildiği modelin çoğul adı (ör. "Randevular"); bilinmiyorsa boş."""
+        try:
+            return apps.get_model(self.kaynak)._meta.verbose_name_plural
+        except (LookupError, ValueError):
+            return ""
+
+    def ilerleme(self):
+        """Alıcı durumlarının tek sorguda sayımı."""
+        A = KampanyaAlicisi
+        sayimlar = self.alicilar.aggregate(
+            toplam=models.Count("id"),
+            gonderilen=models.Count("id", filter=models.Q(durum=A.GONDERILDI)),
+            hatali=models.Count("id", filter=models.Q(durum=A.HATA)),
+        )
+        sayimlar["bekleyen"] = sayimlar["toplam"] - sayimlar["gonderilen"] - sayimlar["hatali"]
+        return sayimlar
+
+
+class KampanyaAlicisi(models.Model):
+    """Kampanyanın tek alıcısı ve teslim durumu."""
+    BEKLIYOR = "bekliyor"
+    GONDERILIYOR = "gonderiliyor"
+    GONDERILDI = "gonderildi"
+    HATA = "hata"
+
+    DURUM_SECENEKLERI = [
+        (BEKLIYOR, "Sırada"),
+        (GONDERILIYOR, "Gönderiliyor"),
+        (GONDERILDI, "Gönderildi"),
+        (HATA, "Başarısız"),
+    ]
+
+    kampanya = models.ForeignKey(
+        EpostaKampanyasi, on_delete=models.CASCADE, related_name="alicilar", verbose_name="Kampanya"
+    )
+    eposta = models.EmailField(verbose_name="E-Posta")
+    # Şablon değişkenleri ({{ ad }}, {{ cihaz }}, {{ tarih }} ...); seçimden bir kez çözülür
+    baglam = models.JSONField(default=dict, blank=True, verbose_name="Kişiselleştirme")
+    durum = models.CharField(max_length=20, choices=DURUM_SECENEKLERI, default=BEKLIYOR, verbose_name="Durum")
+    son_hata = models.TextField(blank=True, verbose_name="Son Hata")
+    gonderilme_zamani = models.DateTimeField(null=True, blank=True, verbose_name="Gönderilme")
+
+    class Meta:
+        verbose_name = "Kampanya Alıcısı"
+        verbose_name_plural = "Kampanya Alıcıları"
+        constraints = [
+            models.UniqueConstraint(fields=["kampanya", "eposta"], name="kampanya_alici_tekil"),
+        ]
+        indexes = [
+            models.Index(fields=["kampanya", "durum"], name="kampanya_alici_durum_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.eposta} - {self.get_durum_display()}"
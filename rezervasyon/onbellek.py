@@ -0,0 +1,135 @@
+"""Kapsam (scope) bazlı önbellek sürümleri.
+
+Her kapsamın (ör. `takvim:tum`, `takvim:lab:3`) önbellekte tutulan bir sürüm
+değeri vardır. Önbellek anahtarları bu sürümü içerir; veri değiştiğinde
+sürüm yenilenir ve eski anahtarlar kendiliğinden geçersiz kalır. Böylece
+anahtarları tek tek silmeye ya da taramaya gerek kalmaz ve aynı yapı hem
+locmem hem de dosya tabanlı önbellek ile çalışır.
+
+Sürüm değerleri zaman damgası olduğu için aynı zamanda HTTP koşullu yanıtları
+(ETag / Last-Modified) için de kullanılır.
+
+Sürümlerin koşullu yanıtlarda güvenle kullanılabilmesi için önbelleğin tüm
+süreçlerce paylaşılması gerekir: locmem süreç başınadır ve değişikliği hiç
+görmeyen bir worker aynı ETag'le sonsuza dek 304 döndürür. Bu yüzden
+`dogrulayicilar_acik()` paylaşılmayan önbellekte False döner (bkz.
+SURUM_ONBELLEGI_PAYLASIMLI) ve `onbellek_kontrolu` sistem kontrolü uyarır.
+Aynı nedenle sürüme bağlı sayaçlar da yalnızca `paylasimli()` iken önbelleğe
+alınır.
+
+Değişiklik bir işlem (transaction) içindeyse sürüm commit'ten sonra bir kez
+daha yenilenir: commit'ten önce yeni sürümü okuyup henüz commit edilmemiş
+eski satırları önbelleğe yazan eşzamanlı istek, eskiyi yeni anahtarda
+bırakamaz.
+
+Kapsamlar:
+    randevu       -> herhangi bir Randevu değişikliği
+    ariza         -> herhangi bir Ariza değişikliği
+    kullanici     -> User.is_active değişikliği (onay bekleyen öğrenciler)
+    takvim:tum    -> genel takvim akışı
+    takvim:lab:N  -> N numaralı lab'ın takvim akışı
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import connection, transaction
+
+
+# Süreç başına tutulan (worker'lar arasında paylaşılmayan) önbellek arka uçları
+YEREL_ONBELLEKLER = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def paylasimli():
+    """Sürümler tüm süreçlerce görülüyor mu? (bir worker'daki yenileme diğerlerine ulaşır mı)
+
+    Tek süreçle çalışan kurulumda locmem de tutarlıdır; bu durumda
+    `SURUM_ONBELLEGI_PAYLASIMLI = True` ile açılabilir.
+    """
+    ayar = getattr(settings, "SURUM_ONBELLEGI_PAYLASIMLI", None)
+    if ayar is not None:
+        return ayar
+    return settings.CACHES["default"]["BACKEND"] not in YEREL_ONBELLEKLER
+
+
+def dogrulayicilar_acik():
+    """ETag / Last-Modified üretilebilir mi? Yalnızca sürümler paylaşılıyorsa."""
+    return paylasimli()
+
+
+def onbellek_kontrolu(app_configs, **kwargs):
+    """Sistem kontrolü: paylaşılmayan önbellekte koşullu yanıtların kapalı olduğunu bildirir."""
+    if paylasimli() or settings.DEBUG:
+        return []
+    return [checks.Warning(
+        "Varsayılan önbellek süreçler arasında paylaşılmıyor; takvim ve sayaç "
+        "uç noktaları ETag / Last-Modified üretmeyecek, rozet sayaçları önbelleğe alınmayacak.",
+        hint="Birden çok worker için paylaşılan bir önbellek (Redis, Memcached, dosya) "
+             "kullanın; tek süreçli kurulumda SURUM_ONBELLEGI_PAYLASIMLI = True yapılabilir.",
+        id="rezervasyon.W001",
+    )]
+
+
+def _anahtar(kapsam):
+    return f"surum:{kapsam}"
+
+
+def _yeni_surum():
+    # Zaman tabanlı değer: önbellek silinse bile eski bir sürümle çakışmaz
+    return format(time.time_ns(), "x")
+
+
+def surum(kapsam):
+    """Kapsamın güncel sürümünü döndürür; yoksa yeni bir sürüm başlatır."""
+    deger = cache.get(_anahtar(kapsam))
+    if deger is None:
+        deger = _yeni_surum()
+        if not cache.add(_anahtar(kapsam), deger, None):
+            # Başka bir istek aynı anda başlatmış olabilir; onunkini kullan
+            deger = cache.get(_anahtar(kapsam), deger)
+    return deger
+
+
+def surumler(*kapsamlar):
+    """Birden çok kapsamın sürümü tek önbellek çağrısıyla: `{kapsam: surum}`."""
+    degerler = cache.get_many([_anahtar(k) for k in kapsamlar])
+    return {k: degerler.get(_anahtar(k)) or surum(k) for k in kapsamlar}
+
+
+def _yenile(kapsamlar):
+    yeni = _yeni_surum()
+    cache.set_many({_anahtar(k): yeni for k in kapsamlar}, None)
+
+
+def surumleri_yenile(*kapsamlar):
+    """Verilen kapsamların sürümünü yeniler (bağlı önbellekleri geçersiz kılar).
+
+    İşlem içinde çağrılırsa commit'ten sonra bir kez daha yenilenir; aradaki
+    sürede eski veriyle doldurulmuş girdiler böylece kullanılmaz.
+    """
+    _yenile(kapsamlar)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _yenile(kapsamlar))
+
+
+def surum_zamani(*degerler):
+    """Sürüm değerlerinden en yenisinin zamanı."""
+    en_yeni = max(int(d, 16) for d in degerler)
+    return datetime.fromtimestamp(en_yeni / 1e9, tz=timezone.utc)
+
+
+def son_degisiklik(*kapsamlar):
+    """Kapsamlardan en son değişenin zamanı (Last-Modified için)."""
+    return surum_zamani(*(surum(k) for k in kapsamlar))
+
+
+def surum_etiketi(*parcalar):
+    """Sürümlerden ve istek parametrelerinden türetilmiş ETag değeri."""
+    return hashlib.md5("|".join(map(str, parcalar)).encode("utf-8")).hexdigest()
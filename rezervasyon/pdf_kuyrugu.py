@@ -0,0 +1,150 @@
+"""Arka plan PDF kuyruğu.
+
+İstek yalnızca bir `PdfIsi` satırı oluşturur ve hemen döner; PDF yerleşimi
+süreç içindeki küçük bir iş parçacığı havuzunda yapılır ve sonuç
+`pdf_onbellek` (MEDIA_ROOT altındaki içerik adresli önbellek) içine
+yazılır. Kuyruk durumu veritabanında tutulduğu için istemci durum sayfasını
+yoklar, iş bitince dosyaya yönlendirilir. Havuz küçük tutulur ki yavaş raporlar etkileşimli
+istekleri aç bırakmasın.
+
+Süreç yeniden başlarsa havuzdaki işler kaybolur. `PDF_IS_ZAMAN_ASIMI`
+süresini aşan yarım işler hata sayılır (`bayat_isleri_kapat`), kullanıcının
+sonraki isteği yeni bir iş açar. Yarım kalan işler `python manage.py
+pdf_kuyrugu` ile de kapatılıp sıradakiler çalıştırılabilir.
+
+Testlerde havuz kullanılmadan `pdf_isini_calistir(is_id)` doğrudan çağrılabilir.
+"""
+
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import pdf_onbellek
+from .models import PdfIsi, Randevu
+from .utils import pdf_yaz
+
+logger = logging.getLogger(__name__)
+
+# Bu süreden eski, bitmemiş iş sahipsiz kabul edilir (süreç ölmüş / yeniden başlamış)
+ZAMAN_ASIMI = timedelta(minutes=10)
+
+_havuz = None
+_havuz_kilidi = threading.Lock()
+
+
+def havuz():
+    """Süreç başına tek havuz (ilk işte oluşturulur)."""
+    global _havuz
+    with _havuz_kilidi:
+        if _havuz is None:
+            _havuz = ThreadPoolExecutor(
+                max_workers=getattr(settings, "PDF_KUYRUK_ISCI_SAYISI", 2),
+                thread_name_prefix="pdf-kuyrugu",
+            )
+    return _havuz
+
+
+def randevu_raporu_baglami(kullanici):
+    return {
+        "user": kullanici,
+        "randevular": (
+            Randevu.objects
+            .filter(kullanici=kullanici)
+            .select_related("cihaz__lab")
+            .order_by("tarih", "baslangic_saati")
+        ),
+    }
+
+
+def zaman_asimi():
+    return getattr(settings, "PDF_IS_ZAMAN_ASIMI", ZAMAN_ASIMI)
+
+
+def bayat_isleri_kapat(**filtre):
+    """Zaman aşımını geçmiş bitmemiş işleri hataya çeker; kapatılan sayısını döndürür."""
+    return PdfIsi.objects.filter(
+        durum__in=[PdfIsi.BEKLIYOR, PdfIsi.CALISIYOR],
+        olusturulma_zamani__lt=timezone.now() - zaman_asimi(),
+        **filtre,
+    ).update(
+        durum=PdfIsi.HATA, hata="İş zaman aşımına uğradı; lütfen raporu yeniden isteyin.",
+        tamamlanma_zamani=timezone.now(),
+    )
+
+
+def is_ekle(kullanici, motor=""):
+    """Kullanıcının randevu raporu için iş açar (zaten süren varsa onu döndürür).
+
+    `motor` boşsa settings.PDF_MOTORU kullanılır.
+    """
+    # Sahipsiz kalmış iş "süren" sayılmaz: yerine yeni iş açılır
+    bayat_isleri_kapat(kullanici=kullanici)
+    suren = PdfIsi.objects.filter(
+        kullanici=kullanici, motor=motor, durum__in=[PdfIsi.BEKLIYOR, PdfIsi.CALISIYOR]
+    ).first()
+    if suren:
+        return suren
+
+    # Bu motorun bitmiş eski işleri atılır; diğer motorun süren işine dokunulmaz.
+    # Dosyaların ömrünü pdf_onbellek yönetir
+    PdfIsi.objects.filter(kullanici=kullanici, motor=motor, durum__in=[PdfIsi.HAZIR, PdfIsi.HATA]).delete()
+
+    is_ = PdfIsi.objects.create(
+        kullanici=kullanici,
+        motor=motor,
+        dosya_adi=f"randevular_{kullanici.username}.pdf",
+    )
+    # İş, satır kalıcı olduktan sonra havuza verilir (worker onu görebilsin)
+    transaction.on_commit(lambda: havuz().submit(_isci, is_.pk))
+    return is_
+
+
+def _isci(is_id):
+    try:
+        pdf_isini_calistir(is_id)
+    finally:
+        # Havuz iş parçacığının bağlantısı açık kalmasın
+        close_old_connections()
+
+
+def pdf_isini_calistir(is_id):
+    """Bekleyen bir işi üstlenir, PDF'i üretir ve dosyayı kaydeder."""
+    # Tek UPDATE ile üstlenme: aynı iş iki kez çalışmaz
+    if not PdfIsi.objects.filter(pk=is_id, durum=PdfIsi.BEKLIYOR).update(durum=PdfIsi.CALISIYOR):
+        return
+
+    is_ = PdfIsi.objects.select_related("kullanici").get(pk=is_id)
+    try:
+        anahtar = pdf_onbellek.rapor_anahtari(is_.kullanici, is_.sablon, is_.motor)
+        yol = pdf_onbellek.bul(is_.kullanici_id, anahtar, is_.motor)
+        if yol is None:
+            tampon = io.BytesIO()
+            if not pdf_yaz(is_.sablon, randevu_raporu_baglami(is_.kullanici), tampon, is_.motor):
+                raise RuntimeError("PDF Üretilemedi, teknik bir hata oluştu.")
+            yol = pdf_onbellek.kaydet(is_.kullanici_id, anahtar, tampon.getvalue(), is_.motor)
+        is_.dosya.name = os.path.relpath(yol, settings.MEDIA_ROOT)
+        is_.durum = PdfIsi.HAZIR
+    except Exception as e:
+        logger.exception("PDF işi başarısız: %s", is_id)
+        is_.durum = PdfIsi.HATA
+        is_.hata = str(e)
+    # Koşullu yazım: iş bu arada zaman aşımıyla kapatıldıysa ya da silindiyse dokunulmaz
+    PdfIsi.objects.filter(pk=is_id, durum=PdfIsi.CALISIYOR).update(
+        dosya=is_.dosya.name, durum=is_.durum, hata=is_.hata, tamamlanma_zamani=timezone.now()
+    )
+
+
+def kuyrugu_temizle():
+    """Yarım kalmış işleri kapatır, sıradakileri bu süreçte çalıştırır: `(kapatilan, calistirilan)`."""
+    kapatilan = bayat_isleri_kapat()
+    idler = list(PdfIsi.objects.filter(durum=PdfIsi.BEKLIYOR).order_by("id").values_list("id", flat=True))
+    for is_id in idler:
+        pdf_isini_calistir(is_id)
+    return kapatilan, len(idler)
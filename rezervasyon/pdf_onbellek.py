@@ -0,0 +1,162 @@
+"""Üretilmiş randevu PDF'leri için içerik adresli disk önbelleği.
+
+Dosya adı, kullanıcının rapora giren randevu satırlarının, PDF motorunun ve
+şablon (ya da reportlab çizicisi) sürümünün özetidir:
+`MEDIA_ROOT/pdf_onbellek/<kullanici_id>_<motor>_<ozet>.pdf`. Veri değişmediyse aynı özet çıkar ve dosya yeniden üretilmeden
+`FileResponse` ile gönderilir. Randevusu değişen kullanıcının dosyaları
+sinyal ile silinir; klasör `PDF_ONBELLEK_MAKS_BAYT` sınırını aşarsa en uzun
+süredir kullanılmayan dosyalar (mtime sırası) atılır. İsabet olan dosyanın
+mtime'ı yenilenir, böylece sık indirilen raporlar önbellekte kalır.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.template.loader import get_template
+
+from .models import Randevu
+from .utils import REPORTLAB, XHTML2PDF
+
+logger = logging.getLogger(__name__)
+
+KLASOR_ADI = "pdf_onbellek"
+
+# Raporda görünen randevu alanları; bunlardan biri değişirse özet de değişir
+RAPOR_ALANLARI = (
+    "id", "tarih", "baslangic_saati", "bitis_saati", "durum", "cihaz__isim", "cihaz__lab__isim",
+)
+
+# Dosya yolu -> (mtime, özet): şablon/çizici dosyası değişmedikçe yeniden okunmaz
+_dosya_ozetleri = {}
+
+
+def klasor():
+    return os.path.join(settings.MEDIA_ROOT, KLASOR_ADI)
+
+
+def _dosya_ozeti(yol):
+    mtime = os.stat(yol).st_mtime_ns
+    kayit = _dosya_ozetleri.get(yol)
+    if kayit is None or kayit[0] != mtime:
+        with open(yol, "rb") as f:
+            kayit = (mtime, hashlib.sha256(f.read()).hexdigest())
+        _dosya_ozetleri[yol] = kayit
+    return kayit[1]
+
+
+def motor_adi(motor=""):
+    return motor or getattr(settings, "PDF_MOTORU", XHTML2PDF)
+
+
+def sablon_surumu(sablon, motor=""):
+    motor = motor_adi(motor)
+    if motor == REPORTLAB:
+        from . import pdf_reportlab
+
+        return f"{motor}:{_dosya_ozeti(pdf_reportlab.__file__)}"
+    return f"{motor}:{_dosya_ozeti(get_template(sablon).origin.name)}"
+
+
+def rapor_anahtari(kullanici, sablon="randevu_pdf.html", motor=""):
+    """Kullanıcı bilgileri + randevu satırları + motor/şablon sürümünden türetilen özet."""
+    ozet = hashlib.sha256()
+    ozet.update(sablon_surumu(sablon, motor).encode())
+    kimlik = (kullanici.id, kullanici.username, kullanici.first_name, kullanici.last_name, kullanici.email)
+    ozet.update(repr(kimlik).encode())
+    satirlar = (
+        Randevu.objects
+        .filter(kullanici=kullanici)
+        .order_by("tarih", "baslangic_saati", "id")
+        .values_list(*RAPOR_ALANLARI)
+    )
+    for satir in satirlar.iterator():
+        ozet.update(repr(satir).encode())
+    return ozet.hexdigest()[:32]
+
+
+def dosya_yolu(kullanici_id, anahtar, motor=""):
+    return os.path.join(klasor(), f"{kullanici_id}_{motor_adi(motor)}_{anahtar}.pdf")
+
+
+def bul(kullanici_id, anahtar, motor=""):
+    """Önbellekteki dosyanın yolu (yoksa None). İsabette mtime yenilenir."""
+    yol = dosya_yolu(kullanici_id, anahtar, motor)
+    try:
+        os.utime(yol)
+    except FileNotFoundError:
+        return None
+    return yol
+
+
+def kaydet(kullanici_id, anahtar, icerik, motor=""):
+    """PDF'i atomik olarak yazar, aynı motorla üretilmiş eski sürümleri siler ve budar."""
+    os.makedirs(klasor(), exist_ok=True)
+    yol = dosya_yolu(kullanici_id, anahtar, motor)
+    # Yarım yazılmış dosya hiçbir zaman okunmasın: geçici dosya + os.replace
+    fd, gecici = tempfile.mkstemp(dir=klasor(), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(icerik)
+    os.replace(gecici, yol)
+
+    # Diğer motorun raporu ayrı bir önbellek girdisidir: birbirlerini silmezler
+    _onekleri_sil((f"{kullanici_id}_{motor_adi(motor)}_",), haric=yol)
+    buda()
+    return yol
+
+
+def kullaniciyi_gecersiz_kil(kullanici_id, haric=None):
+    """Kullanıcının önbellekteki tüm PDF'lerini siler."""
+    kullanicilari_gecersiz_kil([kullanici_id], haric=haric)
+
+
+def kullanicilari_gecersiz_kil(kullanici_idler, haric=None):
+    """Birden çok kullanıcının PDF'lerini klasörü bir kez tarayarak siler."""
+    _onekleri_sil(tuple(f"{i}_" for i in set(kullanici_idler)), haric=haric)
+
+
+def _onekleri_sil(onekler, haric=None):
+    if not onekler:
+        return
+    try:
+        girdiler = list(os.scandir(klasor()))
+    except FileNotFoundError:
+        return
+    for girdi in girdiler:
+        if girdi.name.startswith(onekler) and girdi.name.endswith(".pdf") and girdi.path != haric:
+            _sil(girdi.path)
+
+
+def buda(maks_bayt=None):
+    """Klasör boyutu sınırı aşıyorsa en eski erişilen dosyalardan başlayarak siler."""
+    if maks_bayt is None:
+        maks_bayt = getattr(settings, "PDF_ONBELLEK_MAKS_BAYT", 200 * 1024 * 1024)
+    try:
+        girdiler = [g for g in os.scandir(klasor()) if g.name.endswith(".pdf")]
+    except FileNotFoundError:
+        return
+    dosyalar = []
+    for girdi in girdiler:
+        try:
+            bilgi = girdi.stat()
+        except FileNotFoundError:
+            continue
+        dosyalar.append((bilgi.st_mtime_ns, bilgi.st_size, girdi.path))
+
+    toplam = sum(boyut for _, boyut, _ in dosyalar)
+    for _, boyut, yol in sorted(dosyalar):
+        if toplam <= maks_bayt:
+            break
+        _sil(yol)
+        toplam -= boyut
+
+
+def _sil(yol):
+    try:
+        os.remove(yol)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"PDF önbellek dosyası silinemedi: {yol} ({e})")
@@ -0,0 +1,222 @@
+"""Randevu raporu için doğrudan reportlab (platypus) çizicisi.
+
+`randevu_pdf.html` şablonunun aynısını HTML/CSS ayrıştırmadan, tabloyu
+doğrudan platypus akışlarıyla (Table, Paragraph) kurarak üretir. Basit bir
+randevu tablosu için xhtml2pdf yolundan çok daha az işlemci ve bellek harcar;
+süre satır sayısıyla doğrusal artar (`manage.py pdf_benchmark`).
+`pdf_yaz(..., motor="reportlab")` ile seçilir; bağlam olarak şablonla aynı
+`{"user": ..., "randevular": [...]}` yapısını alır (model nesnesi ya da düz
+sözlük olabilir).
+"""
+
+from django.utils import timezone
+from django.utils.dateformat import format as tarih_bicimle
+from django.utils.html import escape
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.lib.utils import simpleSplit
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .utils import KAYITLI_FONTLAR
+
+LACIVERT = colors.HexColor("#003366")
+TURKUAZ = colors.HexColor("#00a8cc")
+KOYU = colors.HexColor("#1a202c")
+GRI = colors.HexColor("#4a5568")
+ACIK_GRI = colors.HexColor("#718096")
+CIZGI = colors.HexColor("#edf2f7")
+
+# Şablondaki rozet eşlemesi: durum -> (etiket, renk)
+ROZETLER = {
+    "geldi": ("ONAYLANDI", colors.HexColor("#27ae60")),
+    "Onaylandı": ("ONAYLANDI", colors.HexColor("#27ae60")),
+    "bekleniyor": ("BEKLEMEDE", colors.HexColor("#d69e2e")),
+    "Bekliyor": ("BEKLEMEDE", colors.HexColor("#d69e2e")),
+}
+KIRMIZI = colors.HexColor("#e53e3e")
+ZEBRA = [colors.white, colors.HexColor("#fcfdfe")]
+
+
+def _deger(nesne, yol):
+    """Şablondaki nokta erişimi gibi: sözlük anahtarı ya da öznitelik."""
+    for parca in yol.split("."):
+        if nesne is None:
+            return None
+        nesne = nesne.get(parca) if isinstance(nesne, dict) else getattr(nesne, parca, None)
+    return nesne
+
+
+def _stiller():
+    font = "DejaVuSans" if KAYITLI_FONTLAR.get("DejaVuSans") else "Helvetica"
+    temel = ParagraphStyle("temel", fontName=font, fontSize=10, leading=16, textColor=colors.HexColor("#2d3748"))
+    return font, {
+        "marka": ParagraphStyle("marka", temel, fontSize=16, leading=20, textColor=LACIVERT),
+        "sistem": ParagraphStyle("sistem", temel, fontSize=10, textColor=TURKUAZ),
+        "rapor": ParagraphStyle("rapor", temel, fontSize=20, leading=24, textColor=KOYU, alignment=TA_RIGHT),
+        "etiket": ParagraphStyle("etiket", temel, textColor=GRI),
+        "etiket_sag": ParagraphStyle("etiket_sag", temel, textColor=GRI, alignment=TA_RIGHT),
+        "deger": ParagraphStyle("deger", temel, textColor=KOYU),
+        "deger_sag": ParagraphStyle("deger_sag", temel, textColor=KOYU, alignment=TA_RIGHT),
+    }
+
+
+BASLIKLAR = ["ISLEM TARIHI", "SAAT", "CIHAZ VE LABORATUVAR DETAYI", "KULLANIM DURUMU"]
+SUTUN_ORANLARI = [0.15, 0.15, 0.50, 0.20]
+SATIR_ARALIGI = 12
+HUCRE_BOSLUGU = 10
+BASLIK_YUKSEKLIGI = SATIR_ARALIGI + 2 * HUCRE_BOSLUGU
+
+
+def _satir(randevu, font, cihaz_genisligi):
+    """Tablo satırı + satır yüksekliği + rozet rengi (hücreler düz metindir)."""
+    durum = _deger(randevu, "durum")
+    etiket, renk = ROZETLER.get(durum, (str(durum or "").upper(), KIRMIZI))
+    # Düz metin hücreler kendiliğinden kaydırılmaz; uzun adlar burada bölünür
+    cihaz = (
+        simpleSplit(str(_deger(randevu, "cihaz.isim") or ""), font, 10, cihaz_genisligi)
+        + simpleSplit(str(_deger(randevu, "cihaz.lab.isim") or ""), font, 10, cihaz_genisligi)
+    )
+    hucreler = [
+        _deger(randevu, "tarih").strftime("%d.%m.%Y"),
+        f"{_deger(randevu, 'baslangic_saati'):%H:%M} - {_deger(randevu, 'bitis_saati'):%H:%M}",
+        "\n".join(cihaz),
+        etiket,
+    ]
+    return hucreler, max(1, len(cihaz)) * SATIR_ARALIGI + 2 * HUCRE_BOSLUGU, renk
+
+
+def _tablo(satirlar, yukseklikler, renkler, zebra_kaydir, font):
+    stil = [
+        ("BACKGROUND", (0, 0), (-1, 0), LACIVERT),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, -1), font),
+        ("FONTSIZE", (0, 0), (-1, 0), 9),
+        ("FONTSIZE", (0, 1), (-1, -1), 10),
+        ("LEADING", (0, 0), (-1, -1), SATIR_ARALIGI),
+        ("TEXTCOLOR", (0, 1), (1, -1), colors.HexColor("#2d3748")),
+        ("TEXTCOLOR", (2, 1), (2, -1), LACIVERT),
+        ("FONTSIZE", (3, 1), (3, -1), 8.5),
+        ("ALIGN", (3, 0), (3, -1), "CENTER"),
+        ("TOPPADDING", (0, 0), (-1, -1), HUCRE_BOSLUGU),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), HUCRE_BOSLUGU),
+        ("LINEBELOW", (0, 1), (-1, -1), 1, CIZGI),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), ZEBRA[1:] + ZEBRA[:1] if zebra_kaydir else ZEBRA),
+    ]
+    stil += [("TEXTCOLOR", (3, i), (3, i), renk) for i, renk in enumerate(renkler, start=1)]
+    return Table(
+        [BASLIKLAR] + satirlar,
+        colWidths=[f"{int(o * 100)}%" for o in SUTUN_ORANLARI],
+        rowHeights=[BASLIK_YUKSEKLIGI] + yukseklikler,
+        repeatRows=1,
+        style=TableStyle(stil),
+    )
+
+
+def ana_tablolar(randevular, font, genislik, sayfa_yukseklikleri):
+    """Randevu tablosunu sayfa başına bir Table olarak kurar.
+
+    Tek büyük tablo her sayfa sonunda kalan tüm satırlarla yeniden bölünür
+    (satır sayısının karesiyle büyür). Satır yükseklikleri burada önceden
+    hesaplandığı için sayfalama elle yapılır; her parça kendi başlık satırını
+    taşır. Hesap az da olsa tutmazsa reportlab parçayı yine doğru böler.
+    """
+    cihaz_genisligi = genislik * SUTUN_ORANLARI[2] - 12
+    tablolar = []
+    satirlar, yukseklikler, renkler = [], [], []
+    kalan = sayfa_yukseklikleri[0] - BASLIK_YUKSEKLIGI
+    zebra_kaydir = False
+    for randevu in randevular:
+        hucreler, yukseklik, renk = _satir(randevu, font, cihaz_genisligi)
+        if satirlar and yukseklik > kalan:
+            tablolar.append(_tablo(satirlar, yukseklikler, renkler, zebra_kaydir, font))
+            zebra_kaydir ^= len(satirlar) % 2 == 1
+            satirlar, yukseklikler, renkler = [], [], []
+            kalan = sayfa_yukseklikleri[1] - BASLIK_YUKSEKLIGI
+        satirlar.append(hucreler)
+        yukseklikler.append(yukseklik)
+        renkler.append(renk)
+        kalan -= yukseklik
+
+    if satirlar:
+        tablolar.append(_tablo(satirlar, yukseklikler, renkler, zebra_kaydir, font))
+    else:
+        bos = _tablo([["Sistemde kayitli herhangi bir randevu verisi bulunamadi.", "", "", ""]],
+                     [SATIR_ARALIGI + 80], [], False, font)
+        bos.setStyle([("SPAN", (0, 1), (-1, 1)), ("ALIGN", (0, 1), (-1, 1), "CENTER"),
+                      ("TEXTCOLOR", (0, 1), (-1, 1), colors.HexColor("#a0aec0"))])
+        tablolar.append(bos)
+    return tablolar
+
+
+def randevu_pdf_yaz(baglam, dest):
+    """Randevu raporunu `dest` içine yazar; başarılıysa True."""
+    kullanici = baglam.get("user")
+    simdi = timezone.localtime()
+    font, s = _stiller()
+
+    ust = Table(
+        [[
+            [Paragraph("BURSA TEKNIK ÜNIVERSITESI", s["marka"]),
+             Paragraph("LABORATUVAR REZERVASYON SISTEMI", s["sistem"])],
+            Paragraph("RANDEVU RAPORU", s["rapor"]),
+        ]],
+        colWidths=["55%", "45%"],
+        style=TableStyle([
+            ("LINEBELOW", (0, 0), (-1, -1), 3, LACIVERT),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 15),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ]),
+    )
+
+    ad_soyad = f"{_deger(kullanici, 'first_name') or ''} {(_deger(kullanici, 'last_name') or '').upper()}"
+    kart = Table(
+        [
+            [Paragraph("KULLANICI ADI :", s["etiket"]), Paragraph(escape(ad_soyad), s["deger"]),
+             Paragraph("Rapor Tarihi:", s["etiket_sag"]),
+             Paragraph(tarih_bicimle(simdi, "d.m.Y H:i"), s["deger_sag"])],
+            [Paragraph("Kurumsal E-Posta:", s["etiket"]),
+             Paragraph(escape(_deger(kullanici, "email") or ""), s["deger"]),
+             Paragraph("Belge No:", s["etiket_sag"]),
+             Paragraph(f"#{_deger(kullanici, 'id')}-{tarih_bicimle(simdi, 'Ymd')}", s["deger_sag"])],
+        ],
+        colWidths=[4.2 * cm, None, 3 * cm, 3.5 * cm],
+        style=TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#f7fafc")),
+            ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#e2e8f0")),
+            ("ROUNDEDCORNERS", [10, 10, 10, 10]),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+            ("LEFTPADDING", (0, 0), (-1, -1), 10),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 10),
+        ]),
+    )
+
+    belge = SimpleDocTemplate(
+        dest, pagesize=A4, leftMargin=1.5 * cm, rightMargin=1.5 * cm, topMargin=1.5 * cm, bottomMargin=2.5 * cm,
+        title="BTÜ Randevu Raporu",
+    )
+    # Çerçevenin üst/alt iç boşlukları (6 pt) düşülür
+    sayfa_yuksekligi = belge.height - 12
+    ilk_sayfa = sayfa_yuksekligi - ust.wrap(belge.width, belge.height)[1] - kart.wrap(belge.width, belge.height)[1] - 55
+    tablolar = ana_tablolar(baglam.get("randevular") or [], font, belge.width, [ilk_sayfa, sayfa_yuksekligi])
+
+    dogrulama = f"BTÜ-{(_deger(kullanici, 'username') or '').upper()}-{tarih_bicimle(simdi, 'is')}"
+
+    def alt_bilgi(canvas, doc):
+        canvas.saveState()
+        genislik = A4[0]
+        canvas.setStrokeColor(colors.HexColor("#e2e8f0"))
+        canvas.line(1.5 * cm, 2 * cm, genislik - 1.5 * cm, 2 * cm)
+        canvas.setFont(font, 8)
+        canvas.setFillColor(ACIK_GRI)
+        canvas.drawCentredString(genislik / 2, 1.6 * cm,
+                                 "Bu belge BTÜ Okul LabSistemi tarafindan dijital ortamda olusturulmustur.")
+        canvas.drawCentredString(genislik / 2, 1.2 * cm, f"Dogrulama Kodu: {dogrulama} | Sayfa: {doc.page}")
+        canvas.restoreState()
+
+    belge.build([ust, Spacer(1, 25), kart, Spacer(1, 30), *tablolar], onFirstPage=alt_bilgi, onLaterPages=alt_bilgi)
+    return True
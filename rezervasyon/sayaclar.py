@@ -0,0 +1,58 @@
+"""Admin menüsündeki bildirim rozetlerinin sayaçları.
+
+Her sayaç, ilgili olduğu kapsamın (bkz. onbellek) sürümünü içeren anahtarla
+önbellekte tutulur. Sinyaller kapsamın sürümünü yenilediğinde yalnızca o
+kapsamın sayacı bir sonraki istekte yeniden sayılır; örneğin yeni bir randevu
+kullanıcı ve arıza sayaçlarını etkilemez. Değişiklik olmadığı sürece uç nokta
+veritabanına hiç gitmez, tek `get_many` ile yanıt verir.
+
+Admin kenar çubuğu süslemeleri (ör. açık arıza uyarısı) da aynı sayaçları
+`istek_sayilari()` ile okur; bir istek içinde önbelleğe yalnızca bir kez gidilir.
+
+Önbellek süreçler arasında paylaşılmıyorsa (varsayılan locmem) sürüm yenilemesi
+yalnızca değişikliği yapan worker'da görülür; diğerleri eski sayıyı gün boyu
+sunardı. Bu durumda sayaçlar önbelleğe alınmadan her istekte sayılır.
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from .models import Ariza, Randevu
+from .onbellek import paylasimli, surumler
+
+# Eski sürümlü anahtarlar bu süre sonunda kendiliğinden düşer
+ONBELLEK_SURESI = 24 * 60 * 60
+
+# Sayaç adı -> (kapsam, sayım)
+SAYACLAR = {
+    "pasif_ogrenci": ("kullanici", lambda: User.objects.filter(is_active=False).count()),
+    "bekleyen_randevu": ("randevu", lambda: Randevu.objects.filter(durum=Randevu.ONAY_BEKLENIYOR).count()),
+    "acik_ariza": ("ariza", lambda: Ariza.objects.filter(cozuldu_mu=False).count()),
+}
+KAPSAMLAR = tuple(dict.fromkeys(kapsam for kapsam, _ in SAYACLAR.values()))
+
+
+def rozet_sayilari(kapsam_surumleri=None):
+    """`{sayac_adi: deger}`; yalnızca sürümü değişmiş sayaçlar yeniden sayılır."""
+    if not paylasimli():
+        return {ad: sayim() for ad, (_, sayim) in SAYACLAR.items()}
+    kapsam_surumleri = kapsam_surumleri or surumler(*KAPSAMLAR)
+    anahtarlar = {ad: f"sayac:{ad}:{kapsam_surumleri[kapsam]}" for ad, (kapsam, _) in SAYACLAR.items()}
+    bulunan = cache.get_many(anahtarlar.values())
+
+    sonuc, yeni = {}, {}
+    for ad, anahtar in anahtarlar.items():
+        if anahtar in bulunan:
+            sonuc[ad] = bulunan[anahtar]
+        else:
+            sonuc[ad] = yeni[anahtar] = SAYACLAR[ad][1]()
+    if yeni:
+        cache.set_many(yeni, ONBELLEK_SURESI)
+    return sonuc
+
+
+def istek_sayilari(request):
+    """`rozet_sayilari()`'nın istek başına bir kez hesaplanan hâli."""
+    if not hasattr(request, "_rozet_sayilari"):
+        request._rozet_sayilari = rozet_sayilari()
+    return request._rozet_sayilari
@@ -0,0 +1,130 @@
+"""Model sinyalleri: veri değiştiğinde önbellek sürümlerini yeniler.
+
+Randevu değişikliği ayrıca kullanıcının önbellekteki PDF raporlarını commit'ten
+sonra siler.
+Takvim olaylarında görünen adlar (cihaz, lab, kullanıcı adı) değiştiğinde ya da
+randevu / cihaz başka bir lab'a taşındığında eski ve yeni lab takvimi birlikte
+geçersiz kılınır. Değişiklikler commit'ten sonra canlı akışa (bkz. canli) da
+yayınlanır.
+
+Bu modül `RezervasyonConfig.ready()` içinde içe aktarılarak bağlanır.
+Not: `QuerySet.update()` sinyal üretmez; toplu güncelleme yapan yerler
+`surumleri_yenile()` / `takvimi_gecersiz_kil()` fonksiyonlarını kendisi çağırır.
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Cihaz, Laboratuvar, Randevu, Ariza, OnayBekleyenler, AktifOgrenciler
+from . import canli, pdf_onbellek
+from .onbellek import surumleri_yenile
+from .takvim import takvimi_gecersiz_kil
+
+
+def randevu_lab_id(randevu):
+    """Randevunun bağlı olduğu lab id'si (cihaz zaten yüklüyse sorgu atmaz)."""
+    if Randevu.cihaz.is_cached(randevu):
+        return randevu.cihaz.lab_id
+    return Cihaz.objects.filter(pk=randevu.cihaz_id).values_list("lab_id", flat=True).first()
+
+
+def _olay(kwargs):
+    if "created" not in kwargs:
+        return "silindi"
+    return "olusturuldu" if kwargs["created"] else "guncellendi"
+
+
+def canli_yayinla(tur, **veri):
+    # Geri alınan işlem yayınlanmasın: dinleyiciler veriyi commit'ten sonra okur
+    transaction.on_commit(lambda: canli.yayinla(tur, **veri))
+
+
+@receiver(post_init, sender=Randevu, dispatch_uid="randevu_ilk_cihaz")
+def randevu_yuklendi(sender, instance, **kwargs):
+    # Cihaz (dolayısıyla lab) değişimini kayıtta fark edebilmek için ilk değer
+    instance._ilk_cihaz_id = instance.__dict__.get("cihaz_id")
+
+
+@receiver(post_save, sender=Randevu, dispatch_uid="randevu_takvim_kaydet")
+@receiver(post_delete, sender=Randevu, dispatch_uid="randevu_takvim_sil")
+def randevu_degisti(sender, instance, **kwargs):
+    # Oluşturma, onay, iptal, geldi/gelmedi: hepsi save() üzerinden geçer
+    lab_id = randevu_lab_id(instance)
+    lab_idler = [lab_id]
+    ilk_cihaz_id = getattr(instance, "_ilk_cihaz_id", None)
+    if ilk_cihaz_id and ilk_cihaz_id != instance.cihaz_id:
+        # Başka cihaza (belki başka lab'a) taşındı: eski lab'ın takviminde de görünüyordu
+        lab_idler += Cihaz.objects.filter(pk=ilk_cihaz_id).values_list("lab_id", flat=True)
+        instance._ilk_cihaz_id = instance.cihaz_id
+    surumleri_yenile("randevu")
+    takvimi_gecersiz_kil(*set(lab_idler))
+    # Dosya silme işlemin dışında: geri alınan değişiklik önbelleği boşuna silmez
+    kullanici_id = instance.kullanici_id
+    transaction.on_commit(lambda: pdf_onbellek.kullaniciyi_gecersiz_kil(kullanici_id))
+    canli_yayinla(canli.RANDEVU, olay=_olay(kwargs), id=instance.pk, lab_id=lab_id, durum=instance.durum)
+
+
+@receiver(post_save, sender=Ariza, dispatch_uid="ariza_kaydet")
+@receiver(post_delete, sender=Ariza, dispatch_uid="ariza_sil")
+def ariza_degisti(sender, instance, **kwargs):
+    surumleri_yenile("ariza")
+    canli_yayinla(canli.ARIZA, olay=_olay(kwargs), id=instance.pk, cihaz_id=instance.cihaz_id)
+
+
+@receiver(post_init, sender=Cihaz, dispatch_uid="cihaz_ilk_lab")
+def cihaz_yuklendi(sender, instance, **kwargs):
+    instance._ilk_lab_id = instance.__dict__.get("lab_id")
+    instance._ilk_isim = instance.__dict__.get("isim")
+
+
+@receiver(post_save, sender=Cihaz, dispatch_uid="cihaz_takvim_kaydet")
+def cihaz_kaydedildi(sender, instance, created, **kwargs):
+    # Cihaz adı takvim olaylarında görünür; başka lab'a taşınınca randevuları da taşınır
+    ilk = (getattr(instance, "_ilk_lab_id", None), getattr(instance, "_ilk_isim", None))
+    simdi = (instance.__dict__.get("lab_id"), instance.__dict__.get("isim"))
+    if not created and ilk != simdi:
+        takvimi_gecersiz_kil(ilk[0], simdi[0])
+    instance._ilk_lab_id, instance._ilk_isim = simdi
+
+
+@receiver(post_save, sender=Laboratuvar, dispatch_uid="lab_takvim_kaydet")
+def lab_kaydedildi(sender, instance, created, **kwargs):
+    # Lab adı genel takvimdeki olay başlıklarında görünür
+    if not created:
+        takvimi_gecersiz_kil(instance.pk)
+
+
+def kullanici_yuklendi(sender, instance, **kwargs):
+    # is_active / username değişimini kayıtta fark edebilmek için ilk değerleri sakla
+    # (alan ertelenmişse __dict__ üzerinden okunur, ek sorgu atılmaz)
+    instance._ilk_is_active = instance.__dict__.get("is_active")
+    instance._ilk_username = instance.__dict__.get("username")
+
+
+def kullanici_kaydedildi(sender, instance, created, **kwargs):
+    if created or instance.__dict__.get("is_active") != getattr(instance, "_ilk_is_active", None):
+        surumleri_yenile("kullanici")
+        canli_yayinla(canli.KULLANICI, olay=_olay({"created": created}), id=instance.pk)
+    ilk_username = getattr(instance, "_ilk_username", None)
+    if not created and ilk_username is not None and instance.__dict__.get("username") not in (None, ilk_username):
+        # Kullanıcı adı takvim olaylarında görünür: randevusu olan lab'lar geçersiz
+        lab_idler = set(Randevu.objects.filter(kullanici=instance).values_list("cihaz__lab_id", flat=True))
+        if lab_idler:
+            takvimi_gecersiz_kil(*lab_idler)
+    instance._ilk_is_active = instance.__dict__.get("is_active")
+    instance._ilk_username = instance.__dict__.get("username")
+
+
+def kullanici_silindi(sender, instance, **kwargs):
+    surumleri_yenile("kullanici")
+    canli_yayinla(canli.KULLANICI, olay="silindi", id=instance.pk)
+
+
+# Proxy modeller (admin'deki Onay Bekleyenler / Aktif Öğrenciler) kendi
+# sınıflarıyla sinyal gönderdiği için her biri ayrıca bağlanır.
+for _model in (User, OnayBekleyenler, AktifOgrenciler):
+    post_init.connect(kullanici_yuklendi, sender=_model, dispatch_uid=f"kullanici_ilk_durum_{_model.__name__}")
+    post_save.connect(kullanici_kaydedildi, sender=_model, dispatch_uid=f"kullanici_kaydet_{_model.__name__}")
+    post_delete.connect(kullanici_silindi, sender=_model, dispatch_uid=f"kullanici_sil_{_model.__name__}")
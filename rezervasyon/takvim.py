@@ -0,0 +1,113 @@
+"""Takvim (FullCalendar) olay akışları için ortak sorgu ve serileştirme katmanı.
+
+`tum_events_api` ve `lab_events_api` aynı görünürlük kurallarını ve aynı olay
+biçimini kullanır. Olaylar model nesnesi üretilmeden, tek bir JOIN'li
+`values()` sorgusundan sözlük olarak oluşturulur.
+
+Üretilen JSON gövdesi lab ve tarih penceresi bazında önbelleğe alınır; bir
+randevu değiştiğinde ilgili lab'ın ve genel takvimin sürümü yenilenir.
+"""
+
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .models import Randevu
+from .onbellek import surum, surumleri_yenile
+
+TAKVIM_ONBELLEK_SURESI = getattr(settings, "TAKVIM_ONBELLEK_SURESI", 300)
+
+# Genel takvim renkleri (durum -> renk)
+GENEL_RENKLER = {
+    Randevu.ONAYLANDI: "#28a745", Randevu.ONAY_BEKLENIYOR: "#ffc107",
+    Randevu.GELDI: "#0d6efd", Randevu.GELMEDI: "#6c757d", Randevu.REDDEDILDI: "#dc3545",
+}
+
+# Lab takvimi yalnızca onaylı/bekleyen ayrımını renklendirir
+LAB_RENKLERI = {Randevu.ONAYLANDI: "#28a745"}
+
+# Olay üretmek için gereken sütunlar (cihaz, lab ve kullanıcı JOIN ile gelir)
+OLAY_ALANLARI = (
+    "tarih", "baslangic_saati", "bitis_saati", "durum",
+    "cihaz__isim", "cihaz__lab__isim", "kullanici__username",
+)
+
+DURUM_ETIKETLERI = dict(Randevu.DURUM_SECENEKLERI)
+
+
+def takvim_araligi(request):
+    """FullCalendar'ın gönderdiği `start`/`end` parametrelerini tarihe çevirir.
+
+    FullCalendar değerleri `2026-09-28T00:00:00+03:00` biçiminde yollar; takvim
+    gün bazında çalıştığı için yalnızca tarih kısmı kullanılır. `end` hariçtir.
+    Parametre yoksa ilgili sınır None döner, hatalıysa ValueError fırlatılır.
+    """
+    sinirlar = []
+    for anahtar in ("start", "end"):
+        deger = request.GET.get(anahtar)
+        sinirlar.append(datetime.strptime(deger[:10], "%Y-%m-%d").date() if deger else None)
+    return tuple(sinirlar)
+
+
+def gorunur_randevular(qs, bugun, baslangic=None, bitis=None):
+    """Takvimde gösterilecek randevuları SQL tarafında süzer.
+
+    Bugün ve sonrası için bekleyen/onaylı, geçmiş için geldi/gelmedi kayıtları
+    görünür. `baslangic`/`bitis` verilirse sorgu o tarih penceresiyle sınırlanır.
+    """
+    qs = qs.filter(
+        Q(tarih__gte=bugun, durum__in=[Randevu.ONAY_BEKLENIYOR, Randevu.ONAYLANDI])
+        | Q(tarih__lt=bugun, durum__in=[Randevu.GELDI, Randevu.GELMEDI])
+    )
+    if baslangic:
+        qs = qs.filter(tarih__gte=baslangic)
+    if bitis:
+        qs = qs.filter(tarih__lt=bitis)
+    return qs
+
+
+def takvim_olaylari(qs, renkler, varsayilan_renk="#3788d8", lab_adi=True):
+    """Randevu sorgusunu tek sorguda FullCalendar olay listesine çevirir."""
+    events = []
+    for r in qs.values(*OLAY_ALANLARI).order_by("tarih", "baslangic_saati"):
+        gun = r["tarih"].isoformat()
+        bas, bit = r["baslangic_saati"], r["bitis_saati"]
+        ek = {"kullanici": r["kullanici__username"], "durum": DURUM_ETIKETLERI.get(r["durum"], r["durum"])}
+        if lab_adi:
+            ek = {"lab_adi": r["cihaz__lab__isim"], **ek}
+        events.append({
+            "title": f"{r['cihaz__isim']} • {bas:%H:%M}-{bit:%H:%M}",
+            "start": f"{gun}T{bas:%H:%M:%S}",
+            "end": f"{gun}T{bit:%H:%M:%S}",
+            "color": renkler.get(r["durum"], varsayilan_renk),
+            "extendedProps": ek,
+        })
+    return events
+
+
+def takvim_kapsami(lab_id=None):
+    """Genel takvim veya tek bir lab takvimi için sürüm kapsamı."""
+    return f"takvim:lab:{lab_id}" if lab_id else "takvim:tum"
+
+
+def onbellekli_olaylar(lab_id, bugun, baslangic, bitis, uret):
+    """Olay listesinin JSON gövdesini önbellekten döndürür, yoksa `uret()` ile üretir.
+
+    Görünürlük kuralları güne bağlı olduğu için `bugun` da anahtara dahildir.
+    """
+    kapsam = takvim_kapsami(lab_id)
+    anahtar = f"{kapsam}:{bugun}:{baslangic}:{bitis}:{surum(kapsam)}"
+    icerik = cache.get(anahtar)
+    if icerik is None:
+        icerik = json.dumps(uret(), cls=DjangoJSONEncoder).encode("utf-8")
+        cache.set(anahtar, icerik, TAKVIM_ONBELLEK_SURESI)
+    return icerik
+
+
+def takvimi_gecersiz_kil(*lab_idler):
+    """Genel takvimi ve verilen lab takvimlerini geçersiz kılar."""
+    surumleri_yenile(takvim_kapsami(), *(takvim_kapsami(i) for i in lab_idler if i))
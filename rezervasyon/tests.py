@@ -1,9 +1,1471 @@
-"""Basit test iskeleti.
+"""Rezervasyon uygulaması testleri.
 
-Not: Bu dosya şu an placeholder testler içerir. İleride view/logic/unit testleri
-buraya eklenmelidir (ör. randevu çakışma kontrolü, PDF üretimi, API endpoint'leri).
+Not: View/logic/unit testleri bu dosyada tutulur (ör. randevu çakışma kontrolü,
+PDF üretimi, API endpoint'leri).
 """
 
-from django.test import TestCase
+import io
+import shutil
+import smtplib
+import tempfile
+import threading
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Laboratuvar, Cihaz, Randevu, Ariza, PdfIsi, GidenEposta, EpostaKampanyasi, KampanyaAlicisi
+from .onbellek import surumleri_yenile
+
+
+class TakvimApiTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kullanici = User.objects.create_user("ogrenci", "ogrenci@ogr.btu.edu.tr", "sifre12345")
+        cls.lab = Laboratuvar.objects.create(isim="Fizik Lab")
+        cls.cihaz = Cihaz.objects.create(lab=cls.lab, isim="Mikroskop")
+        cls.bugun = timezone.now().date()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.kullanici)
+
+    def randevu(self, gun_farki, durum=Randevu.ONAYLANDI, saat=10):
+        return Randevu.objects.create(
+            kullanici=self.kullanici, cihaz=self.cihaz,
+            tarih=self.bugun + timedelta(days=gun_farki),
+            baslangic_saati=time(saat), bitis_saati=time(saat + 1), durum=durum,
+        )
+
+    def test_sadece_istenen_aralik_doner(self):
+        self.randevu(1)
+        self.randevu(40)
+        self.randevu(-40, durum=Randevu.GELDI)
+        bas = self.bugun.isoformat()
+        bit = (self.bugun + timedelta(days=7)).isoformat()
+        yanit = self.client.get(reverse("tum_events_api"), {"start": f"{bas}T00:00:00+03:00", "end": f"{bit}T00:00:00+03:00"})
+        self.assertEqual(yanit.status_code, 200)
+        self.assertEqual(len(yanit.json()), 1)
+
+    def test_gorunurluk_kurallari_sql_tarafinda(self):
+        self.randevu(1, durum=Randevu.ONAY_BEKLENIYOR)
+        self.randevu(2, durum=Randevu.REDDEDILDI)
+        self.randevu(-1, durum=Randevu.GELMEDI)
+        self.randevu(-2, durum=Randevu.ONAYLANDI)
+        yanit = self.client.get(reverse("tum_events_api"))
+        self.assertEqual(len(yanit.json()), 2)
+
+    def test_gecersiz_aralik_400(self):
+        yanit = self.client.get(reverse("tum_events_api"), {"start": "dun"})
+        self.assertEqual(yanit.status_code, 400)
+
+    def test_sorgu_sayisi_olay_sayisindan_bagimsiz(self):
+        url = reverse("lab_events_api", args=[self.lab.id])
+        self.randevu(1)
+        with self.assertNumQueries(3):  # oturum + kullanıcı + olaylar
+            self.assertEqual(len(self.client.get(url).json()), 1)
+        for gun in range(2, 30):
+            self.randevu(gun)
+        with self.assertNumQueries(3):
+            self.assertEqual(len(self.client.get(url).json()), 29)
+        with self.assertNumQueries(3):
+            self.assertEqual(len(self.client.get(reverse("tum_events_api")).json()), 29)
+
+
+class TakvimOnbellekTestleri(TakvimApiTestleri):
+    """Takvim testlerini tekrar kullanır; önbellek davranışını ayrıca doğrular."""
+
+    def test_tekrar_okuma_olay_sorgusu_atmaz(self):
+        url = reverse("lab_events_api", args=[self.lab.id])
+        self.randevu(1)
+        self.client.get(url)
+        with self.assertNumQueries(2):  # yalnızca oturum + kullanıcı
+            self.assertEqual(len(self.client.get(url).json()), 1)
+
+    def test_randevu_kaydi_onbellegi_gecersiz_kilar(self):
+        url = reverse("tum_events_api")
+        self.assertEqual(self.client.get(url).json(), [])
+        self.randevu(1)
+        self.assertEqual(len(self.client.get(url).json()), 1)
+
+    def test_admin_onayi_onbellegi_gecersiz_kilar(self):
+        yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        r = self.randevu(1, durum=Randevu.ONAY_BEKLENIYOR)
+        url = reverse("lab_events_api", args=[self.lab.id])
+        self.assertEqual(self.client.get(url).json()[0]["color"], "#ffc107")
+
+        self.client.force_login(yonetici)
+        self.client.get(f"/admin/rezervasyon/randevu/onayla/{r.pk}/")
+        self.assertEqual(self.client.get(url).json()[0]["color"], "#28a745")
+
+    def test_surum_commit_sonrasi_bir_kez_daha_yenilenir(self):
+        from .onbellek import surum
+
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            self.randevu(1)
+            # Eşzamanlı istek bu sürümle commit edilmemiş eski satırları önbelleğe yazabilir
+            commit_oncesi = surum("takvim:tum")
+        for geri_cagri in geri_cagrilar:
+            geri_cagri()
+        self.assertNotEqual(surum("takvim:tum"), commit_oncesi)
+
+    def test_ad_degisimi_ve_lab_tasima_takvimi_gecersiz_kilar(self):
+        r = self.randevu(1)
+        url = reverse("lab_events_api", args=[self.lab.id])
+        self.assertTrue(self.client.get(url).json()[0]["title"].startswith("Mikroskop"))
+
+        self.cihaz.isim = "Elektron Mikroskobu"
+        self.cihaz.save()
+        self.assertTrue(self.client.get(url).json()[0]["title"].startswith("Elektron"))
+
+        self.kullanici.username = "ogrenci2"
+        self.kullanici.save()
+        self.assertEqual(self.client.get(url).json()[0]["extendedProps"]["kullanici"], "ogrenci2")
+
+        # Randevu başka lab'daki cihaza taşındı: eski lab takviminden düşer
+        diger = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Kimya Lab"), isim="Ocak")
+        r.cihaz = diger
+        r.save()
+        self.assertEqual(self.client.get(url).json(), [])
+        self.assertEqual(len(self.client.get(reverse("lab_events_api", args=[diger.lab_id])).json()), 1)
+
+
+def isci_onbellegi(yerel):
+    """Sürüm ve sayaç önbelleğini `yerel`e yönlendirir: ayrı bir worker'ın locmem'i gibi."""
+    from contextlib import ExitStack
+    from unittest import mock
+    from . import onbellek, sayaclar
+
+    yigin = ExitStack()
+    yigin.enter_context(mock.patch.object(onbellek, "cache", yerel))
+    yigin.enter_context(mock.patch.object(sayaclar, "cache", yerel))
+    return yigin
+
+
+@override_settings(SURUM_ONBELLEGI_PAYLASIMLI=True)  # test tek süreçte: locmem tutarlı
+class KosulluYanitTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        cls.lab = Laboratuvar.objects.create(isim="Kimya Lab")
+        cls.cihaz = Cihaz.objects.create(lab=cls.lab, isim="Santrifüj")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.yonetici)
+
+    def tekrar_iste(self, url, **params):
+        ilk = self.client.get(url, params)
+        self.assertEqual(ilk.status_code, 200)
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=ilk["ETag"])
+
+    def test_takvim_degismediyse_304(self):
+        url = reverse("lab_events_api", args=[self.lab.id])
+        self.assertEqual(self.tekrar_iste(url, start="2026-10-01").status_code, 304)
+
+    def test_randevu_degisince_etag_yenilenir(self):
+        url = reverse("tum_events_api")
+        etag = self.client.get(url)["ETag"]
+        Randevu.objects.create(
+            kullanici=self.yonetici, cihaz=self.cihaz, tarih=timezone.now().date() + timedelta(days=1),
+            baslangic_saati=time(9), bitis_saati=time(10),
+        )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_sayaclar_304_ve_degisiklikte_200(self):
+        url = reverse("onay_bekleyen_sayisi")
+        self.assertEqual(self.tekrar_iste(url).status_code, 304)
+
+        etag = self.client.get(url)["ETag"]
+        Ariza.objects.create(kullanici=self.yonetici, cihaz=self.cihaz, aciklama="Ekran yok")
+        yanit = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(yanit.status_code, 200)
+        self.assertEqual(yanit.json()["acik_ariza"], 1)
+
+        ogrenci = User.objects.create_user("pasif", "pasif@ogr.btu.edu.tr", "sifre12345")
+        etag = self.client.get(url)["ETag"]
+        ogrenci.is_active = False
+        ogrenci.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(SURUM_ONBELLEGI_PAYLASIMLI=None, DEBUG=False)
+    def test_paylasilmayan_onbellekte_dogrulayici_uretilmez(self):
+        from .onbellek import onbellek_kontrolu
+
+        for url in (reverse("tum_events_api"), reverse("onay_bekleyen_sayisi")):
+            with self.subTest(url=url):
+                yanit = self.client.get(url)
+                self.assertNotIn("ETag", yanit)
+                self.assertNotIn("Last-Modified", yanit)
+        self.assertEqual([u.id for u in onbellek_kontrolu(None)], ["rezervasyon.W001"])
+
+    def test_sayaclar_yalnizca_degisen_kapsami_sayar(self):
+        from .sayaclar import rozet_sayilari
+
+        with self.assertNumQueries(3):
+            self.assertEqual(rozet_sayilari(), {"pasif_ogrenci": 0, "bekleyen_randevu": 0, "acik_ariza": 0})
+        with self.assertNumQueries(0):
+            rozet_sayilari()
+
+        Randevu.objects.create(
+            kullanici=self.yonetici, cihaz=self.cihaz, tarih=timezone.now().date() + timedelta(days=1),
+            baslangic_saati=time(9), bitis_saati=time(10),
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(rozet_sayilari()["bekleyen_randevu"], 1)
+
+        # update() sinyal üretmez; toplu işlem sürümü kendisi yeniler
+        User.objects.filter(pk=self.yonetici.pk).update(is_active=False)
+        surumleri_yenile("kullanici")
+        with self.assertNumQueries(1):
+            self.assertEqual(rozet_sayilari()["pasif_ogrenci"], 1)
+
+    @override_settings(SURUM_ONBELLEGI_PAYLASIMLI=None)
+    def test_paylasilmayan_onbellekte_sayaclar_bayatlamaz(self):
+        from django.core.cache.backends.locmem import LocMemCache
+        from .sayaclar import rozet_sayilari
+
+        birinci, ikinci = LocMemCache("isci-1", {}), LocMemCache("isci-2", {})
+        with isci_onbellegi(birinci):
+            self.assertEqual(rozet_sayilari()["acik_ariza"], 0)
+        # Değişiklik başka bir worker'da: sürüm yalnızca onun önbelleğinde yenilenir
+        with isci_onbellegi(ikinci):
+            Ariza.objects.create(kullanici=self.yonetici, cihaz=self.cihaz, aciklama="Ekran yok")
+        with isci_onbellegi(birinci):
+            self.assertEqual(rozet_sayilari()["acik_ariza"], 1)
+
+
+class TakvimDosyaOnbellekTestleri(TakvimOnbellekTestleri):
+    @classmethod
+    def setUpClass(cls):
+        klasor = tempfile.mkdtemp(prefix="lab-cache-")
+        cls.addClassCleanup(shutil.rmtree, klasor, ignore_errors=True)
+        ayar = override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": klasor,
+        }})
+        ayar.enable()
+        cls.addClassCleanup(ayar.disable)
+        super().setUpClass()
+
+
+class CakismaMotoruTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kullanici = User.objects.create_user("ogrenci", "ogrenci@ogr.btu.edu.tr", "sifre12345")
+        cls.cihaz = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Fizik Lab"), isim="Osiloskop")
+        cls.gun = timezone.now().date() + timedelta(days=3)
+        for bas, bit, durum in [(9, 11, Randevu.ONAYLANDI), (13, 14, Randevu.ONAY_BEKLENIYOR), (15, 16, Randevu.IPTAL)]:
+            Randevu.objects.create(
+                kullanici=cls.kullanici, cihaz=cls.cihaz, tarih=cls.gun,
+                baslangic_saati=time(bas), bitis_saati=time(bit), durum=durum,
+            )
+
+    def test_toplu_musaitlik_tek_sorgu(self):
+        adaylar = [(self.gun, time(h), time(h + 1)) for h in range(8, 17)]
+        with self.assertNumQueries(1):
+            bos = Randevu.objects.musait_slotlar(self.cihaz, adaylar)
+        self.assertEqual([s[1].hour for s in bos], [8, 11, 12, 14, 15, 16])
+
+    def test_clean_ve_check_overlap_ayni_kurali_kullanir(self):
+        from .views import check_overlap
+
+        self.assertTrue(check_overlap(self.cihaz, self.gun, time(10, 30), time(12)))
+        self.assertFalse(check_overlap(self.cihaz, self.gun, time(11), time(13)))
+        yeni = Randevu(kullanici=self.kullanici, cihaz=self.cihaz, tarih=self.gun,
+                       baslangic_saati=time(13, 30), bitis_saati=time(14, 30))
+        with self.assertRaises(ValidationError):
+            yeni.clean()
+
+
+    def test_bos_araliklar_tek_gecisli_tarama(self):
+        with self.assertNumQueries(1):
+            bos = Randevu.objects.bos_araliklar(self.cihaz, self.gun, time(8), time(18))
+        self.assertEqual(bos, [(time(8), time(9)), (time(11), time(13)), (time(14), time(18))])
+
+    def test_bos_saatler_api(self):
+        self.client.force_login(self.kullanici)
+        yanit = self.client.get(reverse("cihaz_bos_saatler_api", args=[self.cihaz.id]), {"tarih": self.gun.isoformat()})
+        veri = yanit.json()
+        self.assertEqual(veri["bos_araliklar"][0], {"baslangic": "08:00", "bitis": "09:00", "en_gec_bitis": "09:00"})
+        # 14:00-18:00 boşluğu, MAX_RANDEVU_SAATI (3) nedeniyle en geç 17:00'de biter
+        self.assertEqual(veri["bos_araliklar"][-1]["en_gec_bitis"], "17:00")
+
+
+    def test_lab_genelinde_musaitlik_aramasi(self):
+        from .views import lab_musaitlik_ara
+
+        diger = Cihaz.objects.create(lab=self.cihaz.lab, isim="Mikroskop")
+        with self.assertNumQueries(2):  # cihazlar + tüm randevular
+            adaylar = lab_musaitlik_ara(self.cihaz.lab, self.gun, self.gun, timedelta(hours=1), time(10), time(12))
+        # Osiloskop 09-11 dolu: önce Mikroskop 10:00, sonra Osiloskop 11:00
+        self.assertEqual(
+            [(a["cihaz_id"], a["baslangic"]) for a in adaylar],
+            [(diger.id, time(10)), (self.cihaz.id, time(11))],
+        )
+
+        self.client.force_login(self.kullanici)
+        yanit = self.client.get(
+            reverse("musait_cihaz_ara_api", args=[self.cihaz.lab.id]),
+            {"baslangic": self.gun.isoformat(), "sure": "90"},
+        )
+        ilk = yanit.json()[0]
+        self.assertEqual((ilk["baslangic"], ilk["bitis"]), ("08:00", "09:30"))
+        self.assertEqual(ilk["cihaz"], "Mikroskop")  # 08:00-09:00 boşluğu 90 dk'ya yetmez
+
+
+class EszamanliRezervasyonTestleri(TransactionTestCase):
+    """Aynı slota paralel istekler: yalnızca biri başarılı olmalı."""
+
+    IS_PARCACIGI = 8
+
+    def test_ayni_slota_paralel_istekte_tek_kayit(self):
+        cihaz = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Fizik Lab"), isim="Lazer")
+        ogrenciler = [
+            User.objects.create_user(f"ogr{i}", f"ogr{i}@ogr.btu.edu.tr", "sifre12345")
+            for i in range(self.IS_PARCACIGI)
+        ]
+        gun = timezone.now().date() + timedelta(days=1)
+        baslat = threading.Barrier(self.IS_PARCACIGI)
+        sonuclar = []
+
+        def rezerve_et(kullanici):
+            try:
+                baslat.wait()
+                Randevu.objects.guvenli_olustur(kullanici, cihaz, gun, time(10), time(12))
+                sonuclar.append("basarili")
+            except ValidationError:
+                sonuclar.append("dolu")
+            finally:
+                connection.close()
+
+        is_parcaciklari = [threading.Thread(target=rezerve_et, args=(k,)) for k in ogrenciler]
+        for t in is_parcaciklari:
+            t.start()
+        for t in is_parcaciklari:
+            t.join()
+
+        self.assertEqual(sonuclar.count("basarili"), 1)
+        self.assertEqual(sonuclar.count("dolu"), self.IS_PARCACIGI - 1)
+        self.assertEqual(Randevu.objects.filter(cihaz=cihaz, tarih=gun).count(), 1)
+
+
+class AdminDisaAktarmaTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        cihaz = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Fizik Lab"), isim="Lazer")
+        gun = timezone.now().date()
+        for i in range(20):
+            ogrenci = User.objects.create_user(f"ogr{i}", f"ogr{i}@ogr.btu.edu.tr", "sifre12345", first_name="Ad")
+            Randevu.objects.create(kullanici=ogrenci, cihaz=cihaz, tarih=gun + timedelta(days=i),
+                                   baslangic_saati=time(9), bitis_saati=time(10))
+
+    def test_csv_akisi_sabit_sorgu(self):
+        from .admin import csv_satirlari
+
+        with self.assertNumQueries(1):
+            satirlar = list(csv_satirlari(Randevu.objects.all()))
+        self.assertEqual(len(satirlar), 22)  # BOM + başlık + 20 kayıt
+        self.assertIn("Lazer (Fizik Lab)", satirlar[2])
+
+    def test_admin_aksiyonu_akis_yaniti_doner(self):
+        self.client.force_login(self.yonetici)
+        yanit = self.client.post(reverse("admin:rezervasyon_randevu_changelist"), {
+            "action": "excel_indir",
+            "_selected_action": list(Randevu.objects.values_list("pk", flat=True)),
+        })
+        self.assertTrue(yanit.streaming)
+        icerik = b"".join(yanit.streaming_content).decode("utf-8")
+        self.assertTrue(icerik.startswith("\ufeffKullanıcı;Cihaz"))
+        self.assertEqual(icerik.count("Lazer (Fizik Lab)"), 20)
+
+    def test_xlsx_sutun_secimi_ve_tipli_hucreler(self):
+        from io import BytesIO
+        from openpyxl import load_workbook
+
+        self.client.force_login(self.yonetici)
+        url = reverse("admin:rezervasyon_randevu_changelist")
+        secim = {"action": "xlsx_indir", "_selected_action": list(Randevu.objects.values_list("pk", flat=True))}
+        sayfa = self.client.post(url, secim)
+        self.assertContains(sayfa, 'name="sutunlar" value="tarih"')
+
+        yanit = self.client.post(url, {**secim, "xlsx_onay": "1", "sutunlar": ["kullanici", "tarih", "baslangic", "durum"]})
+        ws = load_workbook(BytesIO(b"".join(yanit.streaming_content))).active
+        satirlar = list(ws.iter_rows(values_only=True))
+        self.assertEqual(satirlar[0], ("Kullanıcı", "Tarih", "Başlangıç", "Durum"))
+        self.assertEqual(len(satirlar), 21)
+        self.assertEqual(ws["B2"].number_format, "dd.mm.yyyy")
+        self.assertEqual({r[2] for r in satirlar[1:]}, {time(9)})
+        self.assertEqual(len({r[1] for r in satirlar[1:]}), 20)  # her satır kendi tarihini taşır
+        self.assertEqual(satirlar[1][3], "Onay Bekleniyor")
+
+
+class TopluRaporTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        fizik = Laboratuvar.objects.create(isim="Fizik Lab")
+        cls.lazer = Cihaz.objects.create(lab=fizik, isim="Lazer")
+        kimya = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Kimya Lab"), isim="Spektrometre")
+        gun = timezone.now().date()
+        for i in range(3):
+            ogrenci = User.objects.create_user(f"ogr{i}", f"ogr{i}@ogr.btu.edu.tr", "sifre12345")
+            for j, cihaz in enumerate((cls.lazer, kimya)):
+                Randevu.objects.create(kullanici=ogrenci, cihaz=cihaz, tarih=gun + timedelta(days=i),
+                                       baslangic_saati=time(9 + j), bitis_saati=time(10 + j))
+
+    def test_rapor_verisi_kullanici_basina_gruplanir(self):
+        from .toplu_rapor import rapor_verisi
+
+        with self.assertNumQueries(1):
+            veriler = rapor_verisi(Randevu.objects.filter(cihaz=self.lazer))
+        self.assertEqual([v["user"]["username"] for v in veriler], ["ogr0", "ogr1", "ogr2"])
+        self.assertEqual(veriler[0]["randevular"][0]["cihaz"]["lab"]["isim"], "Fizik Lab")
+
+    def test_komut_surec_havuzuyla_zip_uretir(self):
+        import os
+        import zipfile
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as klasor:
+            cikti = os.path.join(klasor, "rapor.zip")
+            call_command("toplu_rapor", "--lab", str(self.lazer.lab_id), "--isci", "2", "--cikti", cikti,
+                         stdout=io.StringIO())
+            with zipfile.ZipFile(cikti) as arsiv:
+                self.assertEqual(arsiv.namelist(), [f"randevular_ogr{i}.pdf" for i in range(3)])
+                self.assertTrue(arsiv.read("randevular_ogr1.pdf").startswith(b"%PDF"))
+
+    def test_admin_aksiyonu_birlesik_pdf_doner(self):
+        from pypdf import PdfReader
+
+        self.client.force_login(self.yonetici)
+        yanit = self.client.post(reverse("admin:rezervasyon_randevu_changelist"), {
+            "action": "toplu_pdf_birlesik",
+            "_selected_action": list(Randevu.objects.filter(cihaz=self.lazer).values_list("pk", flat=True)),
+        })
+        self.assertEqual(yanit["Content-Type"], "application/pdf")
+        pdf = PdfReader(io.BytesIO(b"".join(yanit.streaming_content)))
+        self.assertEqual([o.title for o in pdf.outline], ["ogr0", "ogr1", "ogr2"])
+
+
+class PdfTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kullanici = User.objects.create_user("ogrenci", "ogrenci@ogr.btu.edu.tr", "sifre12345")
+        cihaz = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Fizik Lab"), isim="Lazer")
+        Randevu.objects.create(kullanici=cls.kullanici, cihaz=cihaz, tarih=timezone.now().date(),
+                               baslangic_saati=time(9), bitis_saati=time(10))
+
+    def setUp(self):
+        self.client.force_login(self.kullanici)
+        medya = tempfile.TemporaryDirectory()
+        self.addCleanup(medya.cleanup)
+        ayar = override_settings(MEDIA_ROOT=medya.name)
+        ayar.enable()
+        self.addCleanup(ayar.disable)
+
+    def test_font_acilista_bir_kez_kaydedilir(self):
+        from unittest import mock
+        from . import utils
+
+        self.assertTrue(utils.KAYITLI_FONTLAR.get("DejaVuSans"))
+        with mock.patch.object(utils, "TTFont") as ttfont:
+            yanit = utils.render_to_pdf("randevu_pdf.html", {"user": self.kullanici, "randevular": []})
+        ttfont.assert_not_called()
+        self.assertEqual(yanit["Content-Type"], "application/pdf")
+
+    def test_pdf_kuyrukta_uretilir_ve_indirilir(self):
+        from . import pdf_kuyrugu
+
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            yanit = self.client.get(reverse("randevu_pdf_indir"))
+        is_ = PdfIsi.objects.get()
+        self.assertRedirects(yanit, reverse("pdf_durum", args=[is_.id]))
+        self.assertEqual(len(geri_cagrilar), 1)  # havuza yalnızca commit sonrası verilir
+
+        # İş bitmeden: durum sayfası ve API "bekliyor" der, ikinci tıklama yeni iş açmaz
+        self.assertContains(self.client.get(reverse("pdf_durum", args=[is_.id])), "Hazırlanıyor")
+        self.assertEqual(self.client.get(reverse("pdf_durum_api", args=[is_.id])).json()["durum"], "bekliyor")
+        self.client.get(reverse("randevu_pdf_indir"))
+        self.assertEqual(PdfIsi.objects.count(), 1)
+
+        pdf_kuyrugu.pdf_isini_calistir(is_.id)
+        pdf_kuyrugu.pdf_isini_calistir(is_.id)  # ikinci çağrı işi yeniden üstlenmez
+        is_.refresh_from_db()
+        self.assertEqual(is_.durum, PdfIsi.HAZIR)
+
+        veri = self.client.get(reverse("pdf_durum_api", args=[is_.id])).json()
+        self.assertEqual(veri["indir_url"], reverse("pdf_dosya", args=[is_.id]))
+        self.assertRedirects(self.client.get(reverse("pdf_durum", args=[is_.id])), veri["indir_url"],
+                             fetch_redirect_response=False)
+        yanit = self.client.get(veri["indir_url"])
+        self.assertEqual(yanit["Content-Type"], "application/pdf")
+        self.assertTrue(b"".join(yanit.streaming_content).startswith(b"%PDF"))
+
+        # Başka kullanıcı dosyaya erişemez
+        User.objects.create_user("baska", "baska@ogr.btu.edu.tr", "sifre12345")
+        self.client.login(username="baska", password="sifre12345")
+        self.assertEqual(self.client.get(veri["indir_url"]).status_code, 404)
+
+    def test_sahipsiz_is_zaman_asiminda_kapanir_ve_yeniden_acilir(self):
+        from . import pdf_kuyrugu
+
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.get(reverse("randevu_pdf_indir"))
+        eski = PdfIsi.objects.get()
+        # Süreç yeniden başladı: iş "çalışıyor" durumunda kaldı
+        PdfIsi.objects.filter(pk=eski.pk).update(
+            durum=PdfIsi.CALISIYOR, olusturulma_zamani=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(self.client.get(reverse("pdf_durum_api", args=[eski.id])).json()["durum"], PdfIsi.HATA)
+
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            yanit = self.client.get(reverse("randevu_pdf_indir"))
+        yeni = PdfIsi.objects.exclude(pk=eski.pk).get()
+        self.assertRedirects(yanit, reverse("pdf_durum", args=[yeni.id]), fetch_redirect_response=False)
+        self.assertEqual(len(geri_cagrilar), 1)
+
+        # Komut sıradaki işi bu süreçte çalıştırır
+        call_command("pdf_kuyrugu", stdout=io.StringIO())
+        yeni.refresh_from_db()
+        self.assertEqual(yeni.durum, PdfIsi.HAZIR)
+
+    def test_kontrol_ile_acma_arasinda_silinen_dosya_yeniden_uretilir(self):
+        import os
+        from unittest import mock
+        from . import pdf_kuyrugu, pdf_onbellek
+
+        # bul() dosyayı buldu ama açılmadan önce silindi
+        with mock.patch.object(pdf_onbellek, "bul", return_value=os.path.join(settings.MEDIA_ROOT, "yok.pdf")), \
+                self.captureOnCommitCallbacks(execute=False):
+            yanit = self.client.get(reverse("randevu_pdf_indir") + "?motor=reportlab")
+        is_ = PdfIsi.objects.get()
+        self.assertRedirects(yanit, reverse("pdf_durum", args=[is_.id]), fetch_redirect_response=False)
+
+        pdf_kuyrugu.pdf_isini_calistir(is_.id)
+        pdf_onbellek.kullaniciyi_gecersiz_kil(self.kullanici.id)
+        yanit = self.client.get(reverse("pdf_dosya", args=[is_.id]))
+        self.assertRedirects(yanit, reverse("randevu_pdf_indir") + "?motor=reportlab", fetch_redirect_response=False)
+
+    def test_degismeyen_rapor_onbellekten_gonderilir(self):
+        from . import pdf_kuyrugu
+
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.get(reverse("randevu_pdf_indir"))
+        pdf_kuyrugu.pdf_isini_calistir(PdfIsi.objects.get().id)
+
+        # Veri aynı: PDF yeniden üretilmez, yeni iş açılmaz, dosya doğrudan gelir
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            yanit = self.client.get(reverse("randevu_pdf_indir"))
+        self.assertEqual(yanit.status_code, 200)
+        self.assertEqual(yanit["Content-Type"], "application/pdf")
+        self.assertEqual(geri_cagrilar, [])
+        self.assertTrue(b"".join(yanit.streaming_content).startswith(b"%PDF"))
+
+        # Randevu değişince kullanıcının önbelleği silinir, rapor yeniden kuyruğa girer
+        randevu = Randevu.objects.get()
+        randevu.durum = Randevu.IPTAL
+        randevu.save()
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            yanit = self.client.get(reverse("randevu_pdf_indir"))
+        self.assertEqual(yanit.status_code, 302)
+        self.assertEqual(len(geri_cagrilar), 1)
+
+    def test_pdf_onbellegi_commit_sonrasi_silinir(self):
+        import os
+        from django.db import transaction
+        from . import pdf_onbellek
+
+        yol = pdf_onbellek.kaydet(self.kullanici.id, "anahtar", b"%PDF-1.4", motor="reportlab")
+        randevu = Randevu.objects.get()
+
+        # Geri alınan değişiklik önbelleğe dokunmaz
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                randevu.durum = Randevu.IPTAL
+                randevu.save()
+                self.assertTrue(os.path.exists(yol))
+                raise ValueError
+        self.assertTrue(os.path.exists(yol))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            randevu.save()
+            self.assertTrue(os.path.exists(yol))  # işlem sürerken dosya yerinde
+        self.assertFalse(os.path.exists(yol))
+
+    def test_reportlab_motoru_secilebilir(self):
+        from pypdf import PdfReader
+        from . import pdf_kuyrugu
+
+        with self.captureOnCommitCallbacks(execute=False):
+            yanit = self.client.get(reverse("randevu_pdf_indir") + "?motor=reportlab")
+        is_ = PdfIsi.objects.get()
+        self.assertEqual(is_.motor, "reportlab")
+        pdf_kuyrugu.pdf_isini_calistir(is_.id)
+
+        yanit = self.client.get(reverse("pdf_dosya", args=[is_.id]))
+        metin = PdfReader(io.BytesIO(b"".join(yanit.streaming_content))).pages[0].extract_text()
+        self.assertIn("RANDEVU RAPORU", metin)
+        self.assertIn("09:00 - 10:00", metin)
+        self.assertIn("Lazer", metin)
+
+        # Motorlar ayrı önbellek anahtarı kullanır
+        from . import pdf_onbellek
+        self.assertNotEqual(pdf_onbellek.rapor_anahtari(self.kullanici, motor="reportlab"),
+                            pdf_onbellek.rapor_anahtari(self.kullanici, motor="xhtml2pdf"))
+
+    def test_motorlar_birbirinin_isini_ve_dosyasini_silmez(self):
+        import os
+        from . import pdf_kuyrugu, pdf_onbellek
+
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.get(reverse("randevu_pdf_indir") + "?motor=reportlab")
+            self.client.get(reverse("randevu_pdf_indir") + "?motor=xhtml2pdf")
+        self.assertEqual(set(PdfIsi.objects.values_list("motor", flat=True)), {"reportlab", "xhtml2pdf"})
+
+        for is_ in PdfIsi.objects.all():
+            pdf_kuyrugu.pdf_isini_calistir(is_.id)
+        dosyalar = [os.path.join(settings.MEDIA_ROOT, d) for d in PdfIsi.objects.values_list("dosya", flat=True)]
+        self.assertTrue(all(os.path.exists(d) for d in dosyalar))
+        self.assertEqual(len(set(dosyalar)), 2)
+
+        # Randevu değişince iki motorun dosyası da geçersiz olur
+        pdf_onbellek.kullaniciyi_gecersiz_kil(self.kullanici.id)
+        self.assertFalse(any(os.path.exists(d) for d in dosyalar))
+
+    def test_reportlab_sayfalama_satir_kaybetmez(self):
+        from pypdf import PdfReader
+        from .management.commands.pdf_benchmark import sentetik_baglam
+        from .utils import pdf_yaz
+
+        tampon = io.BytesIO()
+        self.assertTrue(pdf_yaz("randevu_pdf.html", sentetik_baglam(120), tampon, "reportlab"))
+        metin = "".join(s.extract_text() for s in PdfReader(tampon).pages)
+        self.assertEqual(metin.count("Fizik Lab"), 120)
+        self.assertEqual(metin.count("ISLEM TARIHI"), len(PdfReader(tampon).pages))
+
+    def test_onbellek_boyut_siniri_en_eskiyi_atar(self):
+        import os
+        from . import pdf_onbellek
+
+        yollar = [pdf_onbellek.kaydet(i, "a" * 32, b"x" * 100) for i in (1, 2, 3)]
+        for sira, yol in enumerate(yollar):
+            os.utime(yol, ns=(sira * 10**9, sira * 10**9))
+        pdf_onbellek.bul(1, "a" * 32)  # isabet: en eski dosya tazelenir
+
+        pdf_onbellek.buda(maks_bayt=250)
+        self.assertEqual([os.path.exists(y) for y in yollar], [True, False, True])
+
+
+class PdfStatikYolTestleri(TestCase):
+    def setUp(self):
+        import os
+
+        klasor = tempfile.TemporaryDirectory()
+        self.addCleanup(klasor.cleanup)
+        self.kok = klasor.name
+        os.makedirs(os.path.join(self.kok, "img"))
+        with open(os.path.join(self.kok, "img", "logo.3f2a.png"), "wb") as f:
+            f.write(b"png")
+        self.manifest({"img/logo.png": "img/logo.3f2a.png"})
+        ayar = override_settings(STATIC_ROOT=self.kok)
+        ayar.enable()
+        self.addCleanup(ayar.disable)
+
+    def manifest(self, yollar):
+        import json
+        import os
+
+        with open(os.path.join(self.kok, "staticfiles.json"), "w") as f:
+            json.dump({"paths": yollar, "version": "1.1"}, f)
+
+    def test_manifest_ve_negatif_hafiza(self):
+        import os
+        from unittest import mock
+        from . import utils
+
+        utils.statik_hafizayi_dogrula()
+        beklenen = os.path.join(self.kok, "img", "logo.3f2a.png")
+        self.assertEqual(utils.link_callback("/static/img/logo.png", None), beklenen)
+        self.assertIsNone(utils.link_callback("/static/img/yok.png", None))
+
+        # İkinci çözümleme dosya sistemine inmez (bulunamayan dosya dahil)
+        with mock.patch("rezervasyon.utils.os.path.isfile") as isfile:
+            self.assertEqual(utils.link_callback("/static/img/logo.png", None), beklenen)
+            self.assertIsNone(utils.link_callback("/static/img/yok.png", None))
+        isfile.assert_not_called()
+
+        # collectstatic manifest'i yeniden yazınca hafıza boşaltılır
+        with open(os.path.join(self.kok, "img", "logo.9c1d.png"), "wb") as f:
+            f.write(b"png")
+        self.manifest({"img/logo.png": "img/logo.9c1d.png"})
+        os.utime(os.path.join(self.kok, "staticfiles.json"), ns=(1, 1))
+        utils.statik_hafizayi_dogrula()
+        self.assertEqual(utils.link_callback("/static/img/logo.png", None),
+                         os.path.join(self.kok, "img", "logo.9c1d.png"))
+
+
+class HataliAdresBackend(locmem.EmailBackend):
+    """`hatali@` ile başlayan alıcıları reddeden test backend'i."""
+
+    def send_messages(self, messages):
+        for m in messages:
+            if m.to[0].startswith("hatali@"):
+                raise smtplib.SMTPRecipientsRefused({m.to[0]: (550, b"reddedildi")})
+        return super().send_messages(messages)
+
+
+class KopanBackend(locmem.EmailBackend):
+    """İlk mesajda bağlantıyı kaybeden ve yeniden bağlanamayan test backend'i."""
+
+    acilis = 0
+
+    def open(self):
+        self.acilis += 1
+        if self.acilis > 1:
+            raise ConnectionRefusedError("sunucu yanıt vermiyor")
+
+    def send_messages(self, messages):
+        raise smtplib.SMTPServerDisconnected("bağlantı kapandı")
+
+
+class EpostaKuyruguTestleri(TestCase):
+    def test_parti_tek_baglantidan_gonderilir(self):
+        from unittest import mock
+        from django.core.mail import get_connection
+        from . import eposta_kuyrugu
+
+        eposta_kuyrugu.kuyruga_ekle([f"ogr{i}@ogr.btu.edu.tr" for i in range(5)], "Konu", "Metin", "<b>Metin</b>")
+        with mock.patch.object(eposta_kuyrugu, "get_connection", side_effect=get_connection) as baglanti:
+            self.assertEqual(eposta_kuyrugu.kuyrugu_isle(parti_boyutu=2), 5)
+        self.assertEqual(baglanti.call_count, 3)  # 2 + 2 + 1
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertFalse(GidenEposta.objects.exclude(durum=GidenEposta.GONDERILDI).exists())
+
+    @override_settings(EMAIL_BACKEND="rezervasyon.tests.HataliAdresBackend", EPOSTA_MAKS_DENEME=2)
+    def test_hatali_mesaj_geri_cekilmeyle_yeniden_denenir(self):
+        from . import eposta_kuyrugu
+
+        eposta_kuyrugu.kuyruga_ekle(["iyi@btu.edu.tr", "hatali@btu.edu.tr"], "Konu", "Metin")
+        self.assertEqual(eposta_kuyrugu.kuyrugu_isle(), 1)
+        hatali = GidenEposta.objects.get(alici="hatali@btu.edu.tr")
+        self.assertEqual((hatali.durum, hatali.deneme_sayisi), (GidenEposta.BEKLIYOR, 1))
+        self.assertGreater(hatali.sonraki_deneme, timezone.now())
+        self.assertIn("reddedildi", hatali.son_hata)
+
+        # Bekleme süresi dolmadan tekrar denenmez; dolunca son deneme de başarısızsa kalıcı hata
+        self.assertEqual(eposta_kuyrugu.kuyrugu_isle(), 0)
+        GidenEposta.objects.filter(pk=hatali.pk).update(sonraki_deneme=timezone.now())
+        eposta_kuyrugu.kuyrugu_isle()
+        hatali.refresh_from_db()
+        self.assertEqual((hatali.durum, hatali.deneme_sayisi), (GidenEposta.HATA, 2))
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND="rezervasyon.tests.KopanBackend")
+    def test_yeniden_baglanilamazsa_parti_geri_birakilir(self):
+        from . import eposta_kuyrugu
+
+        eposta_kuyrugu.kuyruga_ekle([f"ogr{i}@ogr.btu.edu.tr" for i in range(3)], "Konu", "Metin")
+        self.assertEqual(eposta_kuyrugu.kuyrugu_isle(), 0)
+        # Hiçbiri GONDERILIYOR'da takılı kalmaz; hepsi geri çekilmeyle yeniden denenecek
+        kayitlar = GidenEposta.objects.order_by("id")
+        self.assertEqual([k.durum for k in kayitlar], [GidenEposta.BEKLIYOR] * 3)
+        self.assertTrue(all(k.deneme_sayisi == 1 and k.sonraki_deneme > timezone.now() for k in kayitlar))
+        self.assertIn("kapandı", kayitlar[0].son_hata)
+        self.assertIn("yanıt vermiyor", kayitlar[2].son_hata)
+
+    def test_ayni_partiyi_okuyan_ikinci_isci_bos_doner(self):
+        import uuid
+        from unittest import mock
+
+        from . import eposta_kuyrugu
+
+        eposta_kuyrugu.kuyruga_ekle([f"ogr{i}@ogr.btu.edu.tr" for i in range(3)], "Konu", "Metin")
+        rakip = []
+        anahtarlar = iter(range(1, 10))
+
+        def araya_gir():
+            # İkinci işçi idleri okuduktan sonra, UPDATE'inden önce ilk işçi partiyi üstlenir
+            if rakip == []:
+                rakip.append(None)
+                rakip[0] = eposta_kuyrugu.parti_ustlen()
+            return uuid.UUID(int=next(anahtarlar))
+
+        with mock.patch.object(eposta_kuyrugu.uuid, "uuid4", side_effect=araya_gir):
+            self.assertEqual(eposta_kuyrugu.parti_ustlen(), [])
+        self.assertEqual(len(rakip[0]), 3)
+
+    def test_dosya_backend_ile_tek_baglanti(self):
+        import os
+
+        with tempfile.TemporaryDirectory() as klasor, override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.filebased.EmailBackend", EMAIL_FILE_PATH=klasor
+        ):
+            from . import eposta_kuyrugu
+
+            eposta_kuyrugu.kuyruga_ekle([f"ogr{i}@ogr.btu.edu.tr" for i in range(4)], "Konu", "Metin")
+            call_command("eposta_gonder", stdout=io.StringIO())
+            # Dosya backend'i her bağlantı için tek dosya yazar
+            dosyalar = os.listdir(klasor)
+            self.assertEqual(len(dosyalar), 1)
+            with open(os.path.join(klasor, dosyalar[0])) as f:
+                self.assertEqual(f.read().count("Subject: Konu"), 4)
+
+
+class KampanyaTestleri(TestCase):
+    def setUp(self):
+        from . import kampanya
+        self.kampanya = kampanya
+
+    def _kampanya(self, adet=5, **kw):
+        k = self.kampanya.kampanya_olustur(
+            [f"ogr{i}@ogr.btu.edu.tr" for i in range(adet)], konu="Duyuru", metin="Merhaba", **kw
+        )
+        with self.captureOnCommitCallbacks(execute=False):
+            self.kampanya.baslat(k)
+        return k
+
+    def test_jeton_kovasi_hizi_sinirlar(self):
+        saat = [0.0]
+        uykular = []
+
+        def uyu(sure):
+            uykular.append(sure)
+            saat[0] += sure
+
+        kova = self.kampanya.JetonKovasi(hiz=2, kapasite=2, saat=lambda: saat[0], uyu=uyu)
+        for _ in range(4):
+            kova.al()
+        # İlk iki mesaj kovadaki jetonla hemen, sonrakiler 0.5 sn arayla
+        self.assertEqual(uykular, [0.5, 0.5])
+
+    def test_kampanya_tek_baglantida_tamamlanir(self):
+        from unittest import mock
+        from django.core.mail import get_connection
+
+        k = self.kampanya.kampanya_olustur(
+            ["a@btu.edu.tr", "b@btu.edu.tr", "a@btu.edu.tr"], konu="Duyuru", metin="<b>Merhaba</b>", html=True
+        )
+        self.assertEqual(k.alicilar.count(), 2)  # tekrar eden adres bir kez
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            self.kampanya.baslat(k)
+        self.assertEqual(len(geri_cagrilar), 1)
+
+        with mock.patch.object(self.kampanya, "get_connection", side_effect=get_connection) as baglanti:
+            self.assertEqual(self.kampanya.kampanyayi_gonder(k.pk), 2)
+        self.assertEqual(baglanti.call_count, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        k.refresh_from_db()
+        self.assertEqual(k.durum, EpostaKampanyasi.TAMAMLANDI)
+        self.assertIsNone(k.isci_zamani)
+        self.assertEqual(k.ilerleme(), {"toplam": 2, "gonderilen": 2, "hatali": 0, "bekleyen": 0})
+
+    def test_kesilen_kampanya_tekrar_gondermeden_surer(self):
+        k = self._kampanya(5)
+        alicilar = list(k.alicilar.order_by("id"))
+        # Önceki işçi iki mesaj gönderip üçüncüyü gönderirken öldü
+        KampanyaAlicisi.objects.filter(pk__in=[alicilar[0].pk, alicilar[1].pk]).update(durum=KampanyaAlicisi.GONDERILDI)
+        KampanyaAlicisi.objects.filter(pk=alicilar[2].pk).update(durum=KampanyaAlicisi.GONDERILIYOR)
+        EpostaKampanyasi.objects.filter(pk=k.pk).update(isci_zamani=timezone.now())
+
+        # Canlı işçi varken ikinci işçi kampanyayı alamaz
+        self.assertEqual(self.kampanya.kampanyayi_gonder(k.pk), 0)
+
+        EpostaKampanyasi.objects.filter(pk=k.pk).update(isci_zamani=timezone.now() - timedelta(hours=1))
+        call_command("kampanya_gonder", stdout=io.StringIO())
+        self.assertEqual([m.to[0] for m in mail.outbox], [alicilar[3].eposta, alicilar[4].eposta])
+        belirsiz = KampanyaAlicisi.objects.get(pk=alicilar[2].pk)
+        self.assertEqual(belirsiz.durum, KampanyaAlicisi.HATA)
+
+    def test_duraklatilan_kampanya_partide_durur(self):
+        from unittest import mock
+
+        k = self._kampanya(5)
+        kampanya = self.kampanya
+
+        class DuraklatanKova:
+            alinan = 0
+
+            def al(self):
+                self.alinan += 1
+                if self.alinan == 2:
+                    kampanya.duraklat(k)
+
+        with mock.patch.object(kampanya, "PARTI_BOYUTU", 2):
+            self.assertEqual(kampanya.kampanyayi_gonder(k.pk, kova=DuraklatanKova()), 1)
+        k.refresh_from_db()
+        self.assertEqual(k.durum, EpostaKampanyasi.DURAKLATILDI)
+        self.assertEqual(k.ilerleme()["bekleyen"], 4)
+
+    def test_kampanyasi_devralinan_isci_durur_ve_alinan_aliciyi_atlar(self):
+        k = self._kampanya(5)
+        alicilar = list(k.alicilar.order_by("id"))
+
+        class DevralanKova:
+            alinan = 0
+
+            def al(self):
+                self.alinan += 1
+                if self.alinan == 1:
+                    # Başka işçi ilk alıcıyı çoktan göndermiş
+                    KampanyaAlicisi.objects.filter(pk=alicilar[0].pk).update(durum=KampanyaAlicisi.GONDERILDI)
+                if self.alinan == 3:
+                    # Yavaş kampanyada kilit süresi doldu, başka işçi kampanyayı üstlendi
+                    EpostaKampanyasi.objects.filter(pk=k.pk).update(isci_zamani=timezone.now() + timedelta(seconds=1))
+
+        self.assertEqual(self.kampanya.kampanyayi_gonder(k.pk, kova=DevralanKova()), 1)
+        self.assertEqual([m.to[0] for m in mail.outbox], [alicilar[1].eposta])
+        k.refresh_from_db()
+        self.assertIsNotNone(k.isci_zamani)  # yeni sahibin kilidi bırakılmaz
+        self.assertEqual(k.ilerleme()["bekleyen"], 3)
+
+    def test_icerigi_bos_taslak_baslatilamaz_ve_terk_edilen_silinir(self):
+        yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        taslak = self.kampanya.kampanya_olustur(["a@btu.edu.tr"], olusturan=yonetici)
+        self.client.force_login(yonetici)
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            self.client.post(reverse("admin:rezervasyon_epostakampanyasi_changelist"), {
+                "action": "kampanyayi_baslat", "_selected_action": [taslak.pk],
+            })
+        self.assertEqual(geri_cagrilar, [])
+        taslak.refresh_from_db()
+        self.assertEqual(taslak.durum, EpostaKampanyasi.TASLAK)
+        self.assertEqual(self.kampanya.baslat(taslak), 0)  # içerik yoksa doğrudan da başlamaz
+
+        EpostaKampanyasi.objects.filter(pk=taslak.pk).update(olusturulma_zamani=timezone.now() - timedelta(days=2))
+        self.assertEqual(self.kampanya.taslaklari_temizle(), 1)
+        self.assertFalse(KampanyaAlicisi.objects.exists())
+
+    def test_hatalari_dene_yalnizca_hatali_kampanyayi_baslatir(self):
+        from django.contrib.messages import get_messages
+
+        yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        duraklatilan, biten = self._kampanya(2), self._kampanya(2)
+        taslak = self.kampanya.kampanya_olustur(["a@btu.edu.tr"], olusturan=yonetici)
+        EpostaKampanyasi.objects.filter(pk=duraklatilan.pk).update(durum=EpostaKampanyasi.DURAKLATILDI)
+        EpostaKampanyasi.objects.filter(pk=biten.pk).update(durum=EpostaKampanyasi.TAMAMLANDI)
+        biten.alicilar.update(durum=KampanyaAlicisi.GONDERILDI)
+        biten.alicilar.filter(pk=biten.alicilar.first().pk).update(durum=KampanyaAlicisi.HATA)
+
+        self.client.force_login(yonetici)
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            yanit = self.client.post(reverse("admin:rezervasyon_epostakampanyasi_changelist"), {
+                "action": "kampanya_hatalarini_dene",
+                "_selected_action": [duraklatilan.pk, biten.pk, taslak.pk],
+            })
+        self.assertEqual(len(geri_cagrilar), 1)
+        durumlar = dict(EpostaKampanyasi.objects.values_list("pk", "durum"))
+        self.assertEqual(durumlar[duraklatilan.pk], EpostaKampanyasi.DURAKLATILDI)
+        self.assertEqual(durumlar[taslak.pk], EpostaKampanyasi.TASLAK)
+        self.assertEqual(durumlar[biten.pk], EpostaKampanyasi.GONDERILIYOR)
+        self.assertEqual(biten.ilerleme()["bekleyen"], 1)
+        mesaj = str(list(get_messages(yanit.wsgi_request))[0])
+        self.assertIn("1 alıcı yeniden sıraya alındı", mesaj)
+        self.assertIn("2 kampanya atlandı", mesaj)
+
+    def test_ozel_mail_kampanya_olusturur(self):
+        yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        ogrenciler = [User.objects.create_user(f"ogr{i}", f"ogr{i}@ogr.btu.edu.tr", "x") for i in range(3)]
+        self.client.force_login(yonetici)
+        yanit = self.client.post(reverse("admin:auth_user_changelist"), {
+            "action": "ozel_mail_action", "_selected_action": [u.pk for u in ogrenciler],
+        })
+        k = EpostaKampanyasi.objects.get()
+        self.assertEqual(k.durum, EpostaKampanyasi.TASLAK)
+        self.assertRedirects(yanit, reverse("admin:auth_user_ozel_mail", args=[k.pk]), fetch_redirect_response=False)
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            yanit = self.client.post(yanit.url, {
+                "subject": "Duyuru", "message": "Merhaba", "dakikada_mesaj": 30,
+            })
+        k.refresh_from_db()
+        self.assertRedirects(yanit, reverse("admin:rezervasyon_epostakampanyasi_ilerleme", args=[k.pk]))
+        self.assertEqual((k.durum, k.dakikada_mesaj, k.olusturan), (EpostaKampanyasi.GONDERILIYOR, 30, yonetici))
+        self.assertEqual(len(geri_cagrilar), 1)
+        self.assertEqual(len(mail.outbox), 0)  # istek içinde gönderim yok
+
+        self.kampanya.kampanyayi_gonder(k.pk)
+        veri = self.client.get(reverse("admin:rezervasyon_epostakampanyasi_durum", args=[k.pk])).json()
+        self.assertEqual((veri["durum"], veri["gonderilen"], veri["yuzde"]), (EpostaKampanyasi.TAMAMLANDI, 3, 100))
+        self.assertContains(self.client.get(reverse("admin:rezervasyon_epostakampanyasi_ilerleme", args=[k.pk])), "Gönderilen")
+
+
+class AliciCozumlemeTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        cihaz = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Fizik Lab"), isim="Mikroskop")
+        cls.ogrenciler = [
+            User.objects.create_user(f"ogr{i}", f"Ogr{i}@ogr.btu.edu.tr", is_active=False) for i in range(40)
+        ]
+        cls.adressiz = User.objects.create_user("adressiz", "")
+        cls.gecersiz = User.objects.create_user("gecersiz", "gecersiz-adres")
+        bugun = timezone.now().date()
+        for i, ogr in enumerate(cls.ogrenciler[:10]):
+            # Aynı öğrencinin iki randevusu: adres bir kez sayılmalı
+            for saat in (9, 11):
+                Randevu.objects.create(kullanici=ogr, cihaz=cihaz, tarih=bugun + timedelta(days=i),
+                                       baslangic_saati=time(saat, 0), bitis_saati=time(saat + 1, 0))
+
+    def test_model_basina_tek_sorgu(self):
+        from .kampanya import alici_epostalari
+        from .models import Profil, OnayBekleyenler
+
+        with self.assertNumQueries(1):
+            adresler, eksik = alici_epostalari(Randevu.objects.all())
+        self.assertEqual((len(adresler), eksik), (10, 0))
+
+        with self.assertNumQueries(1):
+            adresler, eksik = alici_epostalari(Profil.objects.exclude(user=self.yonetici))
+        self.assertEqual((len(adresler), eksik), (40, 2))
+
+        with self.assertNumQueries(1):
+            adresler, eksik = alici_epostalari(OnayBekleyenler.objects.filter(is_active=False))
+        self.assertEqual(len(adresler), 40)
+
+        # Büyük/küçük harf farkı tekrar sayılmaz, ilk yazım korunur
+        User.objects.create_user("ikiz", "ogr0@OGR.btu.edu.tr")
+        adresler, _ = alici_epostalari(User.objects.filter(username__in=["ogr0", "ikiz"]).order_by("id"))
+        self.assertEqual(adresler, ["Ogr0@ogr.btu.edu.tr"])
+
+    def _ozel_mail_sorgulari(self, kullanicilar):
+        with CaptureQueriesContext(connection) as sorgular:
+            yanit = self.client.post(reverse("admin:auth_user_changelist"), {
+                "action": "ozel_mail_action", "_selected_action": [u.pk for u in kullanicilar],
+            })
+        self.assertEqual(yanit.status_code, 302)
+        return len(sorgular)
+
+    def test_secim_boyutundan_bagimsiz_sorgu_sayisi(self):
+        self.client.force_login(self.yonetici)
+        az = self._ozel_mail_sorgulari(self.ogrenciler[:3])
+        cok = self._ozel_mail_sorgulari(self.ogrenciler + [self.adressiz, self.gecersiz])
+        self.assertEqual(az, cok)
+
+        kampanya = EpostaKampanyasi.objects.latest("id")
+        self.assertEqual(kampanya.alicilar.count(), 40)
+        self.assertNotIn("ozel_mail_data", self.client.session)
+        yanit = self.client.get(reverse("admin:auth_user_ozel_mail", args=[kampanya.pk]))
+        self.assertContains(yanit, "<strong>40</strong>", html=False)
+
+    def test_form_basligi_kampanyanin_kaynagini_gosterir(self):
+        self.client.force_login(self.yonetici)
+        yanit = self.client.post(reverse("admin:rezervasyon_randevu_changelist"), {
+            "action": "ozel_mail_action", "_selected_action": list(Randevu.objects.values_list("pk", flat=True)),
+        })
+        kampanya = EpostaKampanyasi.objects.get()
+        self.assertEqual(kampanya.kaynak, "rezervasyon.randevu")
+        self.assertRedirects(
+            yanit, reverse("admin:rezervasyon_randevu_ozel_mail", args=[kampanya.pk]), fetch_redirect_response=False
+        )
+        # Başka bir admin'in URL'siyle açılsa da başlık alıcıların modelini gösterir
+        for ad in ("rezervasyon_randevu", "auth_user", "rezervasyon_profil"):
+            with self.subTest(ad=ad):
+                icerik = self.client.get(reverse(f"admin:{ad}_ozel_mail", args=[kampanya.pk])).content.decode()
+                self.assertIn("Özel Mail Gönder — Randevular", icerik)
+
+
+class EpostaSablonuTestleri(TestCase):
+    def test_sifre_sifirlama_duz_metni_baglantiyi_korur(self):
+        kullanici = User.objects.create_user("ogrenci", "ogrenci@ogr.btu.edu.tr")
+        self.client.post(reverse("password_reset"), {"email": kullanici.email})
+        mesaj = mail.outbox[0]
+        self.assertEqual(mesaj.subject, "BTÜ Lab Sistemi | Şifre Sıfırlama")
+        self.assertIn("Şifremi Sıfırla: http://testserver/sifre-sifirla/confirm/", mesaj.body)
+        self.assertNotIn("<", mesaj.body)
+        self.assertIn("© 2026", mesaj.body)
+        self.assertIn('<a href="http://testserver/sifre-sifirla/confirm/', mesaj.alternatives[0][0])
+
+    def test_sablon_bir_kez_derlenir_ve_alici_basina_islenir(self):
+        from .eposta_sablonu import EpostaSablonu, _derle
+
+        _derle.cache_clear()
+        kaynak = "<p>Sayın {{ ad }},</p><p>{{ tarih }} {{ saat }} - <a href=\"https://lab.btu.edu.tr\">{{ cihaz }}</a></p>"
+        baglamlar = [{"ad": f"<b>Öğrenci {i}</b>", "tarih": "18.10.2026", "saat": "10:00", "cihaz": "Mikroskop"}
+                     for i in range(1000)]
+        sablon = EpostaSablonu(kaynak, "Hatırlatma: {{ cihaz }}")
+        sonuclar = [sablon.isle(baglam) for baglam in baglamlar]
+        EpostaSablonu(kaynak, "Hatırlatma: {{ cihaz }}")
+        self.assertEqual(_derle.cache_info().misses, 2)  # konu ve html gövde
+
+        konu, metin, html = sonuclar[7]
+        self.assertEqual(konu, "Hatırlatma: Mikroskop")
+        self.assertEqual(metin, "Sayın <b>Öğrenci 7</b>,\n18.10.2026 10:00 - Mikroskop: https://lab.btu.edu.tr")
+        self.assertIn("&lt;b&gt;Öğrenci 7&lt;/b&gt;", html)  # HTML gövdede kaçış yapılır
+
+    def test_duz_metin_islenmis_htmlden_turetilir(self):
+        from .eposta_sablonu import EpostaSablonu
+
+        kaynak = (
+            "<p>Merhaba {{ ad }},</p>{% if link %}<p><a href=\"{{ link }}\">Takvim</a>"
+            "{% else %}<p>Bağlantı yok{% endif %}</p>Satır 1<br>Satır&nbsp;2 &amp; 3"
+        )
+        sablon = EpostaSablonu(kaynak)
+        _, metin, _ = sablon.isle({"ad": "Ayşe", "link": "https://lab.btu.edu.tr"})
+        self.assertEqual(metin, "Merhaba Ayşe,\nTakvim: https://lab.btu.edu.tr\nSatır 1\nSatır 2 & 3")
+        _, metin, _ = sablon.isle({"ad": "Ayşe"})
+        self.assertEqual(metin, "Merhaba Ayşe,\nBağlantı yok\nSatır 1\nSatır 2 & 3")
+
+    def test_kampanya_randevu_bilgisiyle_kisisellesir(self):
+        from .kampanya import alici_baglamlari, kampanya_olustur, kampanyayi_gonder
+
+        ogrenci = User.objects.create_user("ogrenci", "ogrenci@ogr.btu.edu.tr", first_name="Ayşe")
+        cihaz = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Fizik Lab"), isim="Mikroskop")
+        Randevu.objects.create(kullanici=ogrenci, cihaz=cihaz, tarih=date(2026, 10, 20),
+                               baslangic_saati=time(9, 0), bitis_saati=time(10, 0))
+        alicilar, _ = alici_baglamlari(Randevu.objects.all())
+        k = kampanya_olustur(alicilar, konu="{{ cihaz }} hatırlatması",
+                             metin="Merhaba {{ ad }}, {{ tarih }} {{ saat }} - {{ lab }} / {{ cihaz }}")
+        with self.captureOnCommitCallbacks(execute=False):
+            from .kampanya import baslat
+            baslat(k)
+        kampanyayi_gonder(k.pk)
+        self.assertEqual(mail.outbox[0].subject, "Mikroskop hatırlatması")
+        self.assertEqual(mail.outbox[0].body, "Merhaba Ayşe, 20.10.2026 09:00 - Fizik Lab / Mikroskop")
+        self.assertEqual(mail.outbox[0].alternatives, [])
+
+    def test_hatali_sablon_formda_reddedilir(self):
+        from .forms import AdminMassEmailForm
+
+        form = AdminMassEmailForm({"subject": "Konu", "message": "{% if %}", "dakikada_mesaj": 60})
+        self.assertFalse(form.is_valid())
+        self.assertIn("Şablon hatası", str(form.errors["message"]))
+
+
+@override_settings(CANLI_AKIS_SURESI=0.1, CANLI_NABIZ_ARALIGI=0.05)
+class CanliAkisTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        cls.ogrenci = User.objects.create_user("ogrenci", "ogrenci@ogr.btu.edu.tr")
+        cls.lab = Laboratuvar.objects.create(isim="Fizik Lab")
+        cls.cihaz = Cihaz.objects.create(lab=cls.lab, isim="Mikroskop")
+
+    def akis(self, kullanici, **baslik):
+        self.client.force_login(kullanici)
+        yanit = self.client.get(reverse("canli_akis"), **baslik)
+        self.assertEqual(yanit["Content-Type"], "text/event-stream")
+        return b"".join(yanit.streaming_content).decode()
+
+    def test_bekleyen_abone_yayinla_uyanir(self):
+        from .canli import Yayinci
+
+        yayinci = Yayinci()
+        son = yayinci.son_id
+        threading.Timer(0.05, yayinci.yayinla, ("randevu", {"id": 1})).start()
+        baslangic = timezone.now()
+        self.assertEqual(yayinci.bekle(son, 5), [(son + 1, "randevu", {"id": 1})])
+        self.assertLess((timezone.now() - baslangic).total_seconds(), 2)
+
+    def test_tampondan_dusen_olaylar_yenile_olur(self):
+        from .canli import YENILE, Yayinci
+
+        yayinci = Yayinci(tampon_boyutu=2)
+        son = yayinci.son_id
+        for i in range(3):
+            yayinci.yayinla("randevu", {"id": i})
+        self.assertEqual(yayinci.bekle(son, 0), [(son + 3, YENILE, {})])
+        self.assertEqual([v["id"] for _, _, v in yayinci.bekle(son + 1, 0)], [1, 2])
+
+    def test_eski_kimlik_bos_tamponda_yenile_alir(self):
+        from unittest import mock
+
+        from . import canli
+        from .canli import YENILE, Yayinci, akis
+
+        # Yeniden başlamış süreç: tampon boş, istemcinin kimliği daha eski
+        bos = Yayinci()
+        self.assertEqual(bos.bekle(bos.son_id - 5, 0), [(bos.son_id, YENILE, {})])
+        self.assertEqual(bos.bekle(bos.son_id, 0), [])
+
+        with mock.patch.object(canli, "yayinci", bos):
+            satirlar = list(akis(bos.son_id - 5, None, sure=0.2, nabiz=0.05))
+        self.assertLess(len(satirlar), 10)  # boş döngüde nabız seli yok
+        self.assertIn(f"event: {YENILE}", "".join(satirlar))
+
+    def test_sinyal_commit_sonrasi_yayinlar_ve_akis_iletir(self):
+        from .canli import yayinci
+
+        son = yayinci.son_id
+        with self.captureOnCommitCallbacks(execute=False) as geri_cagrilar:
+            randevu = Randevu.objects.create(
+                kullanici=self.ogrenci, cihaz=self.cihaz, tarih=timezone.now().date() + timedelta(days=1),
+                baslangic_saati=time(9), bitis_saati=time(10),
+            )
+            Ariza.objects.create(kullanici=self.ogrenci, cihaz=self.cihaz, aciklama="Lens kırık")
+        self.assertEqual(yayinci.son_id, son)  # commit'ten önce yayın yok
+        for geri_cagri in geri_cagrilar:
+            geri_cagri()
+
+        icerik = self.akis(self.yonetici, HTTP_LAST_EVENT_ID=str(son))
+        self.assertIn("event: randevu", icerik)
+        self.assertIn(f'"id": {randevu.pk}, "lab_id": {self.lab.id}, "durum": "onay_bekleniyor"', icerik)
+        self.assertIn("event: ariza", icerik)
+
+        # Personel olmayan kullanıcı arıza olaylarını almaz; son kimlik yine ilerler
+        icerik = self.akis(self.ogrenci, HTTP_LAST_EVENT_ID=str(son))
+        self.assertIn("event: randevu", icerik)
+        self.assertNotIn("event: ariza", icerik)
+        self.assertIn(f"id: {son + 2}\n", icerik)
+
+    def test_bos_akis_nabiz_gonderir_ve_kapanir(self):
+        icerik = self.akis(self.yonetici)
+        self.assertTrue(icerik.startswith("retry: 3000\n"))
+        self.assertIn(": nabiz", icerik)
+
+    @override_settings(CANLI_AKIS_SINIRI=1)
+    def test_akis_siniri_dolunca_204_doner(self):
+        from .canli import sinir, sinirli_akis
+
+        acik = sinirli_akis()
+        self.assertEqual(sinir.acik, 1)
+        self.client.force_login(self.ogrenci)
+        self.assertEqual(self.client.get(reverse("canli_akis")).status_code, 204)
+
+        # Hiç okunmadan kapanan bağlantı da yuvasını bırakır
+        acik.close()
+        self.assertEqual(sinir.acik, 0)
+        self.assertIn(": nabiz", self.akis(self.ogrenci))
+        self.assertEqual(sinir.acik, 0)
+
+
+class AdminListeSorguTestleri(TestCase):
+    """Changelist sorgu sayısı satır sayısından bağımsız olmalı (N+1 yok)."""
+
+    LISTELER = ("laboratuvar", "cihaz", "randevu", "ariza", "profil")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        cls.gun = timezone.now().date()
+
+    def veri_ekle(self, adet):
+        for i in range(adet):
+            lab = Laboratuvar.objects.create(isim=f"Lab {Laboratuvar.objects.count()}")
+            ogrenci = User.objects.create_user(f"ogr{User.objects.count()}", "ogr@ogr.btu.edu.tr")
+            for j in range(2):
+                cihaz = Cihaz.objects.create(lab=lab, isim=f"Cihaz {j}")
+                Randevu.objects.create(kullanici=ogrenci, cihaz=cihaz, tarih=self.gun + timedelta(days=i),
+                                       baslangic_saati=time(9 + j), bitis_saati=time(10 + j))
+            Ariza.objects.create(kullanici=ogrenci, cihaz=cihaz, aciklama="Çalışmıyor", cozuldu_mu=bool(i % 2))
+
+    def sorgu_sayilari(self):
+        sayilar = {}
+        for model in self.LISTELER:
+            with CaptureQueriesContext(connection) as sorgular:
+                yanit = self.client.get(reverse(f"admin:rezervasyon_{model}_changelist"))
+            self.assertEqual(yanit.status_code, 200)
+            sayilar[model] = len(sorgular)
+        return sayilar
+
+    def test_changelist_sorgulari_sabit(self):
+        self.client.force_login(self.yonetici)
+        self.veri_ekle(2)
+        az = self.sorgu_sayilari()
+        self.veri_ekle(25)
+        cok = self.sorgu_sayilari()
+        for model in self.LISTELER:
+            with self.subTest(model=model):
+                self.assertEqual(az[model], cok[model])
+
+    def test_annotasyonlar_dogru(self):
+        self.client.force_login(self.yonetici)
+        self.veri_ekle(2)
+        Laboratuvar.objects.create(isim="Boş Lab")
+        icerik = self.client.get(reverse("admin:rezervasyon_laboratuvar_changelist")).content.decode()
+        self.assertEqual(icerik.count("2 cihaz"), 2)
+        self.assertIn("0 cihaz", icerik)
+        icerik = self.client.get(reverse("admin:rezervasyon_cihaz_changelist")).content.decode()
+        self.assertEqual(icerik.count("ARIZALI"), 1)  # yalnızca ilk lab'ın arızası açık
+        self.assertEqual(icerik.count("ÇALIŞIYOR"), 3)
+
+
+@override_settings(SURUM_ONBELLEGI_PAYLASIMLI=True)  # önbellekten okuma tek süreçte sınanır
+class AdminKenarCubuguTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        cls.cihaz = Cihaz.objects.create(lab=Laboratuvar.objects.create(isim="Fizik Lab"), isim="Lazer")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.yonetici)
+
+    def ariza_sorgulari(self, url):
+        with CaptureQueriesContext(connection) as sorgular:
+            yanit = self.client.get(url)
+        self.assertEqual(yanit.status_code, 200)
+        return [q["sql"] for q in sorgular if "rezervasyon_ariza" in q["sql"]], yanit
+
+    def test_acik_ariza_uyarisi_onbellekten_gelir(self):
+        from .admin import CihazAdmin
+        from django.contrib import admin as django_admin
+
+        url = reverse("admin:index")
+        ilk, _ = self.ariza_sorgulari(url)
+        self.assertEqual(len(ilk), 1)  # soğuk önbellek: tek sayım
+        sonraki, _ = self.ariza_sorgulari(url)
+        self.assertEqual(sonraki, [])
+
+        # Yeni arıza "ariza" sürümünü yeniler: bir kez yeniden sayılır, uyarı görünür
+        Ariza.objects.create(kullanici=self.yonetici, cihaz=self.cihaz, aciklama="Lazer yanmıyor")
+        sorgular, yanit = self.ariza_sorgulari(url)
+        self.assertEqual(len(sorgular), 1)
+        istek = yanit.wsgi_request
+        model_admin = django_admin.site._registry[Cihaz]
+        self.assertIsInstance(model_admin, CihazAdmin)
+        self.assertTrue(model_admin.get_model_perms(istek)["has_warning"])
+
+    @override_settings(SURUM_ONBELLEGI_PAYLASIMLI=None)
+    def test_baska_iscideki_degisiklik_panelde_gorunur(self):
+        from django.core.cache.backends.locmem import LocMemCache
+        from .toplu_durum import durum_degistir
+
+        def cihaz_uyarisi():
+            app_list = self.client.get(reverse("admin:index")).context["app_list"]
+            modeller = {m["object_name"]: m for app in app_list for m in app["models"]}
+            return modeller["Cihaz"]["perms"].get("has_warning", False)
+
+        ariza = Ariza.objects.create(kullanici=self.yonetici, cihaz=self.cihaz, aciklama="Lazer yanmıyor")
+        randevu = Randevu.objects.create(
+            kullanici=self.yonetici, cihaz=self.cihaz, tarih=timezone.localdate() + timedelta(days=1),
+            baslangic_saati=time(9), bitis_saati=time(10),
+        )
+        birinci, ikinci = LocMemCache("panel-1", {}), LocMemCache("panel-2", {})
+        with isci_onbellegi(birinci):
+            self.assertTrue(cihaz_uyarisi())
+            self.assertEqual(self.client.get(reverse("onay_bekleyen_sayisi")).json()["bekleyen_randevu"], 1)
+
+        # Arıza çözülür ve randevu onaylanır; ikisi de başka bir worker'da
+        with isci_onbellegi(ikinci):
+            ariza.cozuldu_mu = True
+            ariza.save()
+            durum_degistir([randevu.id], "onayla", self.yonetici, bildir=False)
+
+        with isci_onbellegi(birinci):
+            self.assertFalse(cihaz_uyarisi())
+            self.assertEqual(self.client.get(reverse("onay_bekleyen_sayisi")).json()["bekleyen_randevu"], 0)
+
+
+@override_settings(EPOSTA_KUYRUGU_OTOMATIK=False)  # kuyruk satırları incelenir, işçi çalışmasın
+class TopluDurumTestleri(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yonetici = User.objects.create_superuser("yonetici", "yonetici@btu.edu.tr", "sifre12345")
+        cls.lab = Laboratuvar.objects.create(isim="Kimya Lab")
+        cls.cihazlar = [Cihaz.objects.create(lab=cls.lab, isim=f"Ocak {i}") for i in range(6)]
+        cls.yarin = timezone.localdate() + timedelta(days=1)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.yonetici)
+
+    def oturum_olustur(self, kisi, tarih, durum=Randevu.ONAY_BEKLENIYOR):
+        # 6 cihaz x 10 saat; bulk_create sinyalsiz ve hızlı kurar
+        onek = User.objects.count()
+        ogrenciler = [
+            User.objects.create_user(f"ogr{onek + i}", f"ogr{i}@ogr.btu.edu.tr", first_name=f"Ad{i}") for i in range(kisi)
+        ]
+        return Randevu.objects.bulk_create(
+            Randevu(
+                kullanici=o, cihaz=self.cihazlar[i % 6], tarih=tarih, durum=durum,
+                baslangic_saati=time(8 + i // 6), bitis_saati=time(9 + i // 6),
+            )
+            for i, o in enumerate(ogrenciler)
+        )
+
+    def toplu(self, **veri):
+        return self.client.post(reverse("toplu_durum_api"), veri)
+
+    def test_oturum_tek_update_ile_onaylanir_ve_bildirim_toplu_yazilir(self):
+        from . import canli
+        from .onbellek import surum
+
+        self.oturum_olustur(60, self.yarin)
+        reddedilen = self.oturum_olustur(1, self.yarin, Randevu.REDDEDILDI)[0]
+        eski_surum = surum("randevu")
+
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as sorgular:
+            yanit = self.toplu(islem="onayla", tarih=self.yarin.isoformat(), lab=self.lab.id)
+        self.assertEqual(yanit.json(), {"guncellenen": 60, "atlanan": 1, "durum": Randevu.ONAYLANDI})
+
+        randevu_sorgulari = [q["sql"] for q in sorgular if q["sql"].lstrip().upper().startswith(("SELECT", "UPDATE")) and "rezervasyon_randevu" in q["sql"]]
+        self.assertEqual(len(randevu_sorgulari), 2)  # tek SELECT + tek UPDATE
+        self.assertEqual(sum('INSERT INTO "rezervasyon_gideneposta"' in q["sql"] for q in sorgular), 1)
+
+        self.assertEqual(Randevu.objects.filter(durum=Randevu.ONAYLANDI, onaylayan_admin=self.yonetici).count(), 60)
+        reddedilen.refresh_from_db()
+        self.assertEqual(reddedilen.durum, Randevu.REDDEDILDI)
+        self.assertNotEqual(surum("randevu"), eski_surum)
+
+        self.assertEqual(GidenEposta.objects.count(), 60)
+        mesaj = GidenEposta.objects.get(alici="ogr0@ogr.btu.edu.tr", metin__contains="Ad0,")
+        self.assertIn("Ocak 0", mesaj.konu)
+        self.assertIn(f"{self.yarin:%d.%m.%Y} 08:00-09:00", mesaj.metin)
+
+        tur, veri = canli.yayinci._olaylar[-1][1:]
+        self.assertEqual((tur, veri["olay"], veri["lab_idler"], len(veri["idler"])), (canli.RANDEVU, "toplu", [self.lab.id], 60))
+
+    def test_yoklama_gelecek_gune_ve_onaysiz_randevuya_islenmez(self):
+        bugun = self.oturum_olustur(2, timezone.localdate(), Randevu.ONAYLANDI)
+        gelecek = self.oturum_olustur(2, self.yarin, Randevu.ONAYLANDI)
+        bekleyen = self.oturum_olustur(1, timezone.localdate())
+        idler = ",".join(str(r.id) for r in bugun + gelecek + bekleyen)
+
+        yanit = self.toplu(islem="geldi", idler=idler)
+        self.assertEqual(yanit.json()["guncellenen"], 2)
+        self.assertEqual(yanit.json()["atlanan"], 3)
+        self.assertEqual(Randevu.objects.filter(durum=Randevu.GELDI).count(), 2)
+        self.assertFalse(GidenEposta.objects.exists())  # yoklama bildirim göndermez
+
+    def test_yoklama_onaylayan_yoneticiyi_korur(self):
+        onaylayan = User.objects.create_superuser("onaylayan", "onaylayan@btu.edu.tr")
+        randevu = self.oturum_olustur(1, timezone.localdate(), Randevu.ONAYLANDI)[0]
+        Randevu.objects.filter(pk=randevu.pk).update(onaylayan_admin=onaylayan)
+
+        self.toplu(islem="gelmedi", idler=str(randevu.id))
+        randevu.refresh_from_db()
+        self.assertEqual((randevu.durum, randevu.onaylayan_admin), (Randevu.GELMEDI, onaylayan))
+
+    def test_update_tarafindan_atlanan_satira_bildirim_gitmez(self):
+        from unittest import mock
+        from . import canli, toplu_durum
+
+        bekleyen = self.oturum_olustur(1, self.yarin)[0]
+        # Okuma ile yazma arasında reddedilmiş (ön süzgeç eski durumu gördü)
+        degisen = self.oturum_olustur(1, self.yarin, Randevu.REDDEDILDI)[0]
+        with mock.patch.object(toplu_durum, "_uygun_mu", return_value=True), \
+                self.captureOnCommitCallbacks(execute=True):
+            sonuc = toplu_durum.durum_degistir([bekleyen.id, degisen.id], "onayla", self.yonetici)
+        self.assertEqual((sonuc["guncellenen"], sonuc["atlanan"]), (1, 1))
+        self.assertEqual(GidenEposta.objects.count(), 1)
+        self.assertIn("Ad0", GidenEposta.objects.get().metin)
+        self.assertEqual(canli.yayinci._olaylar[-1][2]["idler"], [bekleyen.id])
+
+    def test_admin_aksiyonu_secimi_reddeder(self):
+        randevular = self.oturum_olustur(3, self.yarin) + self.oturum_olustur(1, self.yarin, Randevu.GELDI)
+        yanit = self.client.post(
+            reverse("admin:rezervasyon_randevu_changelist"),
+            {"action": "toplu_reddet", "_selected_action": [r.id for r in randevular]},
+            follow=True,
+        )
+        self.assertContains(yanit, "3 randevu güncellendi, 1 randevu")
+        self.assertEqual(Randevu.objects.filter(durum=Randevu.REDDEDILDI, onaylayan_admin=self.yonetici).count(), 3)
+
+    def test_gecersiz_istekler(self):
+        self.assertEqual(self.toplu(islem="sil", idler="1").status_code, 400)
+        self.assertEqual(self.toplu(islem="onayla", tarih=self.yarin.isoformat()).status_code, 400)
+        self.assertEqual(self.toplu(islem="onayla", tarih="yarın", lab=self.lab.id).status_code, 400)
+        self.assertEqual(self.client.get(reverse("toplu_durum_api")).status_code, 405)
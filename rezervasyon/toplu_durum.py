@@ -0,0 +1,144 @@
+"""Randevular için toplu durum geçişleri (onay, red, geldi / gelmedi).
+
+Seçim (id listesi, admin seçimi ya da bir günün oturumu) tek SELECT ile
+okunur, geçişe uygun olmayan satırlar ayıklanır ve kalanlar tek bir
+`UPDATE ... WHERE id IN (...) AND durum IN (...)` ile güncellenir. Onay ve
+redde işlemi yapan yönetici `onaylayan_admin` alanına yazılır; yoklama
+onaylayanı değiştirmez. 60 kişilik bir oturum için
+satır başına `save()` + sinyal yerine birkaç sorgu çalışır.
+
+`QuerySet.update()` sinyal üretmediği için sinyalin yaptığı işler burada bir
+kez yapılır: "randevu" ve ilgili lab takvim sürümleri yenilenir; commit'ten
+sonra etkilenen kullanıcıların PDF önbelleği silinir ve canlı akışa tek bir
+`toplu` olayı gönderilir. Onay / red bildirimleri derlenmiş şablonla alıcı başına
+kişiselleştirilir ve kuyruğa tek `bulk_create` ile yazılır.
+"""
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from . import canli, pdf_onbellek
+from .eposta_kuyrugu import toplu_kuyruga_ekle
+from .eposta_sablonu import EpostaSablonu
+from .models import Randevu
+from .onbellek import surumleri_yenile
+from .takvim import takvimi_gecersiz_kil
+
+# işlem -> (hedef durum, geçişe izin verilen kaynak durumlar)
+ISLEMLER = {
+    "onayla": (Randevu.ONAYLANDI, (Randevu.ONAY_BEKLENIYOR,)),
+    "reddet": (Randevu.REDDEDILDI, (Randevu.ONAY_BEKLENIYOR, Randevu.ONAYLANDI)),
+    "geldi": (Randevu.GELDI, (Randevu.ONAYLANDI,)),
+    "gelmedi": (Randevu.GELMEDI, (Randevu.ONAYLANDI,)),
+}
+
+# Yoklama henüz gelmemiş bir güne işlenemez
+YOKLAMA_ISLEMLERI = {"geldi", "gelmedi"}
+
+# Hedef durum -> (konu, düz metin gövde); yoklama geçişleri bildirim göndermez
+BILDIRIMLER = {
+    Randevu.ONAYLANDI: (
+        "Randevunuz onaylandı: {{ cihaz }} - {{ tarih }}",
+        "Merhaba {{ ad }},\n\n"
+        "{{ lab }} laboratuvarındaki {{ cihaz }} cihazı için {{ tarih }} {{ saat }} "
+        "randevunuz onaylandı.\n\nBTÜ Randevu Sistemi",
+    ),
+    Randevu.REDDEDILDI: (
+        "Randevunuz reddedildi: {{ cihaz }} - {{ tarih }}",
+        "Merhaba {{ ad }},\n\n"
+        "{{ lab }} laboratuvarındaki {{ cihaz }} cihazı için {{ tarih }} {{ saat }} "
+        "randevunuz reddedildi.\n\nBTÜ Randevu Sistemi",
+    ),
+}
+
+_ALANLAR = (
+    "id", "durum", "tarih", "baslangic_saati", "bitis_saati", "kullanici_id",
+    "kullanici__username", "kullanici__first_name", "kullanici__email",
+    "cihaz__isim", "cihaz__lab_id", "cihaz__lab__isim",
+)
+
+
+def oturum(tarih, lab_id=None, cihaz_id=None, saat=None):
+    """Bir günün oturumu: lab ya da cihazın o günkü (ve `saat`i kapsayan) randevuları."""
+    secim = Randevu.objects.filter(tarih=tarih)
+    if cihaz_id:
+        secim = secim.filter(cihaz_id=cihaz_id)
+    elif lab_id:
+        secim = secim.filter(cihaz__lab_id=lab_id)
+    else:
+        raise ValueError("Oturum için lab ya da cihaz seçilmelidir.")
+    if saat is not None:
+        secim = secim.filter(baslangic_saati__lte=saat, bitis_saati__gt=saat)
+    return secim
+
+
+def _uygun_mu(satir, kaynaklar, yoklama, bugun):
+    return satir["durum"] in kaynaklar and not (yoklama and satir["tarih"] > bugun)
+
+
+def _bildirimler(hedef, satirlar):
+    """Alıcı başına `(alici, konu, metin, html)`; e-postası olmayanlar atlanır."""
+    konu, govde = BILDIRIMLER[hedef]
+    sablon = EpostaSablonu(govde, konu, html=False)
+    for s in satirlar:
+        if not s["kullanici__email"]:
+            continue
+        baglam = {
+            "ad": s["kullanici__first_name"] or s["kullanici__username"],
+            "cihaz": s["cihaz__isim"],
+            "lab": s["cihaz__lab__isim"],
+            "tarih": s["tarih"].strftime("%d.%m.%Y"),
+            "saat": f"{s['baslangic_saati']:%H:%M}-{s['bitis_saati']:%H:%M}",
+        }
+        yield (s["kullanici__email"], *sablon.isle(baglam))
+
+
+def durum_degistir(randevular, islem, yonetici, bildir=True):
+    """Seçimi tek UPDATE ile `islem`in hedef durumuna taşır.
+
+    randevular: Randevu QuerySet'i ya da id listesi
+    Dönüş: {"guncellenen", "atlanan", "durum"}; geçersiz işlemde ValueError.
+    """
+    if islem not in ISLEMLER:
+        raise ValueError(f"Geçersiz işlem: {islem}")
+    hedef, kaynaklar = ISLEMLER[islem]
+    if not isinstance(randevular, QuerySet):
+        randevular = Randevu.objects.filter(id__in=list(randevular))
+    bugun = timezone.localdate()
+    yoklama = islem in YOKLAMA_ISLEMLERI
+
+    with transaction.atomic():
+        satirlar = list(randevular.order_by().values(*_ALANLAR))
+        uygunlar = [s for s in satirlar if _uygun_mu(s, kaynaklar, yoklama, bugun)]
+        idler = [s["id"] for s in uygunlar]
+        degisiklik = {"durum": hedef} if yoklama else {"durum": hedef, "onaylayan_admin": yonetici}
+        guncellenen = 0
+        if idler:
+            # Durum koşulu UPDATE'te de tekrarlanır: okuma ile yazma arasında değişen satır atlanır
+            guncellenen = Randevu.objects.filter(id__in=idler, durum__in=kaynaklar).update(**degisiklik)
+        if guncellenen < len(uygunlar):
+            # Bazı satırlar atlandı: bildirim ve yayın yalnızca gerçekten güncellenenlere
+            guncellenenler = set(Randevu.objects.filter(id__in=idler, **degisiklik).values_list("id", flat=True))
+            uygunlar = [s for s in uygunlar if s["id"] in guncellenenler]
+        if uygunlar:
+            _yan_etkiler(hedef, uygunlar, bildir)
+
+    return {"guncellenen": guncellenen, "atlanan": len(satirlar) - guncellenen, "durum": hedef}
+
+
+def _yan_etkiler(hedef, satirlar, bildir):
+    """update() sinyal üretmez: sinyalin işleri tüm seçim için bir kez yapılır."""
+    lab_idler = sorted({s["cihaz__lab_id"] for s in satirlar})
+    surumleri_yenile("randevu")
+    takvimi_gecersiz_kil(*lab_idler)
+    kullanici_idler = {s["kullanici_id"] for s in satirlar}
+    transaction.on_commit(lambda: pdf_onbellek.kullanicilari_gecersiz_kil(kullanici_idler))
+
+    if bildir and hedef in BILDIRIMLER:
+        toplu_kuyruga_ekle(_bildirimler(hedef, satirlar))
+
+    idler = [s["id"] for s in satirlar]
+    transaction.on_commit(
+        lambda: canli.yayinla(canli.RANDEVU, olay="toplu", idler=idler, lab_idler=lab_idler, durum=hedef)
+    )
@@ -0,0 +1,126 @@
+"""Personel için toplu randevu raporları (lab / cihaz / tarih aralığı).
+
+Seçilen randevular tek sorguda düz sözlüklere çevrilir ve kullanıcı başına
+gruplanır; PDF yerleşimi bir süreç havuzunda paralel yapılır. İşçilere model
+nesnesi değil yalnızca düz veri gönderilir, böylece işçiler veritabanına hiç
+bağlanmaz. Her işçi açılışta (initializer) Django'yu hazırlar, fontları
+kaydeder ve `randevu_pdf.html` şablonunu bir kez derler.
+
+Çıktı iki biçimde olabilir:
+    zip      -> kullanıcı başına bir PDF içeren ZIP arşivi
+    birlesik -> tüm raporların tek PDF'te birleştirilmiş hâli (kullanıcı başına yer imi)
+
+Bu modül işçi süreçlerinde de içe aktarıldığı için en üst seviyede model
+içe aktarmaz.
+"""
+
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import groupby
+
+from django.conf import settings
+from django.template.loader import get_template
+from pypdf import PdfReader, PdfWriter
+
+from .utils import pdf_motorunu_hazirla, pdf_yaz
+
+SABLON = "randevu_pdf.html"
+ZIP = "zip"
+BIRLESIK = "birlesik"
+
+KULLANICI_ALANLARI = {
+    "id": "kullanici_id",
+    "username": "kullanici__username",
+    "first_name": "kullanici__first_name",
+    "last_name": "kullanici__last_name",
+    "email": "kullanici__email",
+}
+
+# İşçi süreçte derlenmiş şablon (initializer doldurur)
+_sablon = None
+
+
+def rapor_verisi(queryset):
+    """Randevu queryset'ini kullanıcı başına `{"user": {...}, "randevular": [...]}` listesine çevirir."""
+    satirlar = queryset.order_by(
+        "kullanici__username", "kullanici_id", "tarih", "baslangic_saati"
+    ).values(
+        *KULLANICI_ALANLARI.values(),
+        "tarih", "baslangic_saati", "bitis_saati", "durum", "cihaz__isim", "cihaz__lab__isim",
+    )
+
+    veriler = []
+    for _, grup in groupby(satirlar.iterator(), key=lambda s: s["kullanici_id"]):
+        grup = list(grup)
+        veriler.append({
+            "user": {ad: grup[0][alan] for ad, alan in KULLANICI_ALANLARI.items()},
+            # Şablon randevu.cihaz.lab.isim gibi nokta erişimi kullanır; sözlükler de çalışır
+            "randevular": [
+                {
+                    "tarih": s["tarih"],
+                    "baslangic_saati": s["baslangic_saati"],
+                    "bitis_saati": s["bitis_saati"],
+                    "durum": s["durum"],
+                    "cihaz": {"isim": s["cihaz__isim"], "lab": {"isim": s["cihaz__lab__isim"]}},
+                }
+                for s in grup
+            ],
+        })
+    return veriler
+
+
+def _isci_baslat():
+    global _sablon
+    import django
+    from django.apps import apps
+
+    # spawn ile açılan süreçlerde Django henüz hazır değildir (fork'ta zaten hazırdır)
+    if not apps.ready:
+        django.setup()
+    pdf_motorunu_hazirla()
+    _sablon = get_template(SABLON)
+
+
+def kullanici_pdf(veri, motor=""):
+    """Tek kullanıcının raporunu üretir: `(kullanici_adi, pdf_baytlari)`."""
+    kullanici_adi = veri["user"]["username"]
+    tampon = io.BytesIO()
+    if not pdf_yaz(_sablon or SABLON, veri, tampon, motor):
+        raise RuntimeError(f"PDF Üretilemedi: {kullanici_adi}")
+    return kullanici_adi, tampon.getvalue()
+
+
+def pdfleri_uret(veriler, isci_sayisi=None, motor=""):
+    """Raporları sırayı koruyarak üretir; tek işçi/tek rapor için havuz açılmaz."""
+    if isci_sayisi is None:
+        isci_sayisi = getattr(settings, "TOPLU_RAPOR_ISCI_SAYISI", None) or os.cpu_count() or 1
+    isci_sayisi = min(isci_sayisi, len(veriler))
+    uret = partial(kullanici_pdf, motor=motor)
+
+    if isci_sayisi <= 1:
+        _isci_baslat()
+        yield from map(uret, veriler)
+        return
+
+    with ProcessPoolExecutor(max_workers=isci_sayisi, initializer=_isci_baslat) as havuz:
+        yield from havuz.map(uret, veriler, chunksize=max(1, len(veriler) // (isci_sayisi * 4)))
+
+
+def toplu_rapor_yaz(queryset, dest, bicim=ZIP, isci_sayisi=None, motor=""):
+    """Raporları `dest` dosyasına ZIP ya da birleşik PDF olarak yazar; rapor sayısını döndürür."""
+    veriler = rapor_verisi(queryset)
+    pdfler = pdfleri_uret(veriler, isci_sayisi, motor)
+
+    if bicim == BIRLESIK:
+        yazici = PdfWriter()
+        for kullanici_adi, icerik in pdfler:
+            yazici.append(PdfReader(io.BytesIO(icerik)), outline_item=kullanici_adi)
+        yazici.write(dest)
+    else:
+        with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as arsiv:
+            for kullanici_adi, icerik in pdfler:
+                arsiv.writestr(f"randevular_{kullanici_adi}.pdf", icerik)
+    return len(veriler)
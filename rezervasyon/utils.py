@@ -1,3 +1,4 @@
+import json
 import os
 import logging
 from django.conf import settings
@@ -9,28 +10,44 @@ from reportlab.pdfbase.ttfonts import TTFont
 
 logger = logging.getLogger(__name__)
 
-# ÖNEMLİ: Fontu sunucu başladığında bir kez kaydetmek Windows hatalarını önler
-def register_font():
+# PDF motorları: şablon -> HTML -> xhtml2pdf (varsayılan) ya da doğrudan reportlab
+XHTML2PDF = "xhtml2pdf"
+REPORTLAB = "reportlab"
+PDF_MOTORLARI = [
+    (XHTML2PDF, "HTML şablonu (xhtml2pdf)"),
+    (REPORTLAB, "Doğrudan reportlab"),
+]
+
+# PDF'lerde kullanılan fontlar: reportlab adı -> dosya adı
+PDF_FONTLARI = {
+    "DejaVuSans": "DejaVuSans.ttf",
+}
+
+# Font arama klasörleri (ilk bulunan kullanılır)
+FONT_KLASORLERI = (
+    os.path.join(settings.BASE_DIR, "rezervasyon", "static", "fonts"),
+    os.path.join(settings.BASE_DIR, "static", "fonts"),
+)
+
+# Kayıt denemesi yapılmış fontlar: ad -> dosya yolu (bulunamadıysa None).
+# Her font bir kez denenir; sonraki çağrılar dosya sistemine ve TTF
+# ayrıştırmaya hiç inmez.
+KAYITLI_FONTLAR = {}
+
+
+def register_font(ad="DejaVuSans", dosya_adi="DejaVuSans.ttf"):
+    if ad in KAYITLI_FONTLAR:
+        return KAYITLI_FONTLAR[ad] is not None
+
+    KAYITLI_FONTLAR[ad] = None
     try:
-        # Görseldeki klasör yapına göre yol: rezervasyon/static/fonts/
-        font_path = os.path.join(
-            settings.BASE_DIR,
-            "rezervasyon",
-            "static"
-            "fonts",
-            "DejaVuSans.ttf"
-        )
-
-        if not os.path.exists(font_path):
-            font_path = os.path.join(
-                settings.BASE_DIR,
-                "static\fonts",
-                "DejaVuSans.ttf"
-            )
-
-        if os.path.exists(font_path):
-            pdfmetrics.registerFont(TTFont("DejaVuSans", font_path))
-            return True
+        for klasor in FONT_KLASORLERI:
+            font_path = os.path.join(klasor, dosya_adi)
+            if os.path.exists(font_path):
+                pdfmetrics.registerFont(TTFont(ad, font_path))
+                KAYITLI_FONTLAR[ad] = font_path
+                return True
+        logger.warning(f"PDF fontu bulunamadı: {dosya_adi}")
 
     except Exception as e:
         logger.error(f"Font Kayıt Hatası: {e}")
@@ -38,52 +55,136 @@ def register_font():
     return False
 
 
-def link_callback(uri, rel):
-    sUrl = settings.STATIC_URL
-    sRoot = os.path.join(settings.BASE_DIR, "static")
-    mUrl = settings.MEDIA_URL
-    mRoot = os.path.join(settings.BASE_DIR, "media")
+def pdf_motorunu_hazirla():
+    """Uygulama açılışında (RezervasyonConfig.ready) bir kez çağrılır.
 
-    if uri.startswith(mUrl):
-        path = os.path.join(mRoot, uri.replace(mUrl, ""))
+    Modülün içe aktarılması xhtml2pdf/reportlab'i yükler; burada da fontlar
+    kaydedilir. Böylece istek başına maliyet yalnızca şablon ve yerleşim olur.
+    """
+    for ad, dosya_adi in PDF_FONTLARI.items():
+        register_font(ad, dosya_adi)
 
-    elif uri.startswith(sUrl):
-        path = os.path.join(
-            settings.BASE_DIR,
-            "rezervasyon",
-            "static",
-            uri.replace(sUrl, "")
-        )
-        if not os.path.exists(path):
-            path = os.path.join(sRoot, uri.replace(sUrl, ""))
 
-    else:
-        return uri
+# Statik URI -> mutlak dosya yolu ya da None (dosya yok: negatif kayıt).
+# Süreç içinde tutulur; collectstatic manifest'i değişince boşaltılır.
+STATIK_YOL_HAFIZASI = {}
+_manifest = {"mtime": None, "yollar": {}}
 
-    return path if os.path.isfile(path) else None
 
+def _manifest_dosyasi():
+    return os.path.join(settings.STATIC_ROOT or "", "staticfiles.json")
+
+
+def statik_hafizayi_dogrula():
+    """Manifest'in değişip değişmediğine bakar (render başına tek `stat`).
+
+    collectstatic başka bir süreçte çalıştığı için sinyalle haber alınamaz;
+    staticfiles.json'un mtime'ı değiştiyse hafıza boşaltılır ve manifest
+    yeniden okunur.
+    """
+    try:
+        mtime = os.stat(_manifest_dosyasi()).st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime == _manifest["mtime"]:
+        return
+
+    yollar = {}
+    if mtime is not None:
+        try:
+            with open(_manifest_dosyasi(), encoding="utf-8") as f:
+                yollar = json.load(f).get("paths", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"staticfiles.json okunamadı: {e}")
+    STATIK_YOL_HAFIZASI.clear()
+    _manifest.update(mtime=mtime, yollar=yollar)
+
+
+def statik_hafizayi_temizle(setting=None, **kwargs):
+    # setting_changed alıcısı olarak da kullanılır (testlerde override_settings)
+    if setting in (None, "STATIC_ROOT", "STATIC_URL", "STATICFILES_DIRS"):
+        STATIK_YOL_HAFIZASI.clear()
+        _manifest.update(mtime=None, yollar={})
+
+
+def _statik_yol_bul(goreli):
+    # 1) collectstatic çıktısı: manifest'teki özetli (hash'li) ad ya da dosyanın kendisi
+    adaylar = []
+    if settings.STATIC_ROOT:
+        ozetli = _manifest["yollar"].get(goreli)
+        if ozetli:
+            adaylar.append(os.path.join(settings.STATIC_ROOT, ozetli))
+        adaylar.append(os.path.join(settings.STATIC_ROOT, goreli))
+    # 2) Geliştirme klasörleri (collectstatic çalıştırılmamış olabilir)
+    adaylar.append(os.path.join(settings.BASE_DIR, "rezervasyon", "static", goreli))
+    adaylar.append(os.path.join(settings.BASE_DIR, "static", goreli))
+
+    for yol in adaylar:
+        if os.path.isfile(yol):
+            return yol
+    return None
 
-def render_to_pdf(template_src="randevu_pdf.html", context_dict=None, filename="btu_rapor.pdf"):
-    if context_dict is None:
-        context_dict = {}
 
-    # Her üretim öncesi fontun kayıtlı olduğundan emin ol (Windows Fix)
+def link_callback(uri, rel):
+    sUrl = settings.STATIC_URL
+    mUrl = settings.MEDIA_URL
+
+    if uri.startswith(mUrl):
+        # Medya kullanıcı yüklemesidir, her an eklenip silinebilir: hafızaya alınmaz
+        path = os.path.join(settings.MEDIA_ROOT, uri[len(mUrl):])
+        return path if os.path.isfile(path) else None
+
+    if uri.startswith(sUrl):
+        try:
+            return STATIK_YOL_HAFIZASI[uri]
+        except KeyError:
+            path = STATIK_YOL_HAFIZASI[uri] = _statik_yol_bul(uri[len(sUrl):])
+            return path
+
+    return uri
+
+
+def pdf_yaz(template_src, context_dict, dest, motor=None):
+    """Şablonu PDF olarak `dest` (dosya benzeri nesne) içine yazar; başarılıysa True.
+
+    `template_src` şablon adı ya da önceden derlenmiş bir şablon nesnesi olabilir.
+    `motor="reportlab"` verilirse randevu raporu HTML'e hiç dönüştürülmeden
+    doğrudan reportlab ile çizilir (yalnızca randevu_pdf.html için).
+    """
+    motor = motor or getattr(settings, "PDF_MOTORU", XHTML2PDF)
+    if motor == REPORTLAB:
+        from .pdf_reportlab import randevu_pdf_yaz
+
+        try:
+            return randevu_pdf_yaz(context_dict, dest)
+        except Exception as e:
+            logger.error(f"Reportlab PDF Hatası: {e}")
+            return False
+
+    # Font açılışta kaydedilir; burada yalnızca kayıt defterine bakılır (Windows Fix)
     register_font()
+    statik_hafizayi_dogrula()
 
-    template = get_template(template_src)
+    template = template_src if hasattr(template_src, "render") else get_template(template_src)
     html = template.render(context_dict)
 
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-
     pisa_status = pisa.CreatePDF(
         src=html,
-        dest=response,
+        dest=dest,
         link_callback=link_callback,
         encoding="UTF-8"
     )
+    return not pisa_status.err
+
+
+def render_to_pdf(template_src="randevu_pdf.html", context_dict=None, filename="btu_rapor.pdf", motor=None):
+    if context_dict is None:
+        context_dict = {}
+
+    response = HttpResponse(content_type="application/pdf")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
 
-    if pisa_status.err:
+    if not pdf_yaz(template_src, context_dict, response, motor):
         return HttpResponse("PDF Üretilemedi, teknik bir hata oluştu.")
 
     return response
@@ -11,24 +11,25 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.decorators import login_required
-from django.template.loader import render_to_string
 from django.contrib.admin.views.decorators import staff_member_required
 from django.core.mail import send_mail, EmailMultiAlternatives # EmailMultiAlternatives buraya taşındı
+from django.core.exceptions import ValidationError
 from django.core.serializers.json import DjangoJSONEncoder
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.db.models import Count
-from django.db import transaction
 from django.urls import reverse # 🟢 URL tersine çözümleme için eklendi
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 
 # --- ŞİFRE SIFIRLAMA İÇİN GEREKLİLER ---
 from django.contrib.auth.tokens import default_token_generator # 🟢 NameError hatasını çözen kritik satır
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
-from django.utils.html import strip_tags # 🟢 Mail gövdesindeki HTML'i temizlemek için
 
 # --- MODELS & FORMS ---
-from .models import Laboratuvar, Cihaz, Randevu, Profil, Duyuru, Ariza
+from .models import Laboratuvar, Cihaz, Randevu, Profil, Duyuru, Ariza, PdfIsi
+from .cakisma import bos_araliklar
 from .forms import (
     KullaniciGuncellemeFormu,
     ProfilGuncellemeFormu,
@@ -38,7 +39,14 @@ from .forms import (
 )
 
 # --- UTILS ---
-from .utils import render_to_pdf # 🟢 PDF çıktısı almak için eklendi
+from . import canli, pdf_kuyrugu, pdf_onbellek, sayaclar, toplu_durum
+from .eposta_sablonu import EpostaSablonu
+from .utils import PDF_MOTORLARI
+from .takvim import (
+    GENEL_RENKLER, LAB_RENKLERI, takvim_araligi, gorunur_randevular, takvim_olaylari,
+    onbellekli_olaylar, takvim_kapsami,
+)
+from .onbellek import dogrulayicilar_acik, surum, surumler, surum_etiketi, surum_zamani, son_degisiklik
 
 logger = logging.getLogger(__name__)
 
@@ -70,19 +78,130 @@ class CustomLoginView(auth_views.LoginView):
 # ============================================================
 MAX_RANDEVU_SAATI = getattr(settings, "MAX_RANDEVU_SAATI", 3)
 IPTAL_MIN_SURE_SAAT = getattr(settings, "IPTAL_MIN_SURE_SAAT", 1)
+LAB_ACILIS_SAATI = datetime.strptime(getattr(settings, "LAB_ACILIS_SAATI", "08:00"), "%H:%M").time()
+LAB_KAPANIS_SAATI = datetime.strptime(getattr(settings, "LAB_KAPANIS_SAATI", "18:00"), "%H:%M").time()
 
 def check_overlap(cihaz, tarih, baslangic, bitis, exclude_id=None):
     """Çakışma kontrolü: Aynı saatte başka randevu var mı?"""
-    qs = Randevu.objects.filter(
-        cihaz=cihaz,
-        tarih=tarih,
-        durum__in=[Randevu.ONAY_BEKLENIYOR, Randevu.ONAYLANDI, Randevu.GELDI],
-        baslangic_saati__lt=bitis,
-        bitis_saati__gt=baslangic,
-    )
-    if exclude_id:
-        qs = qs.exclude(pk=exclude_id)
-    return qs.exists()
+    return Randevu.objects.cakisanlar(cihaz, tarih, baslangic, bitis, haric_id=exclude_id).exists()
+
+def gunun_bos_araliklari(cihaz, tarih):
+    """Cihazın o günkü boş aralıkları; her aralık için MAX_RANDEVU_SAATI'ne göre en geç bitiş.
+
+    Geçmiş günler için boş liste döner; bugün için pencere şu andan başlar.
+    """
+    simdi = timezone.localtime()
+    if tarih < simdi.date():
+        return []
+    acilis = LAB_ACILIS_SAATI
+    if tarih == simdi.date():
+        acilis = max(acilis, simdi.time().replace(second=0, microsecond=0))
+
+    sonuc = []
+    for bas, bit in Randevu.objects.bos_araliklar(cihaz, tarih, acilis, LAB_KAPANIS_SAATI):
+        sinir = datetime.combine(tarih, bas) + timedelta(hours=MAX_RANDEVU_SAATI)
+        en_gec = min(bit, sinir.time()) if sinir.date() == tarih else bit
+        sonuc.append({
+            "baslangic": bas.strftime("%H:%M"),
+            "bitis": bit.strftime("%H:%M"),
+            "en_gec_bitis": en_gec.strftime("%H:%M"),
+        })
+    return sonuc
+
+MUSAIT_ARAMA_MAKS_GUN = 14
+MUSAIT_ARAMA_MAKS_SONUC = 50
+
+def lab_musaitlik_ara(lab, bas_tarih, bit_tarih, sure, saat_bas=None, saat_bit=None):
+    """Lab'daki tüm aktif cihazlarda `sure` uzunluğunda boş slot arar.
+
+    Tüm cihaz ve günlerin randevuları tek sorguda çekilir, her (cihaz, gün)
+    için bellekte boşluk taraması yapılır. Her boşluk için en erken başlangıç
+    aday olarak döner; sonuçlar en erken müsaitliğe göre sıralanır.
+    """
+    acilis = max(saat_bas or LAB_ACILIS_SAATI, LAB_ACILIS_SAATI)
+    kapanis = min(saat_bit or LAB_KAPANIS_SAATI, LAB_KAPANIS_SAATI)
+    simdi = timezone.localtime()
+    bas_tarih = max(bas_tarih, simdi.date())
+    if bas_tarih > bit_tarih or acilis >= kapanis:
+        return []
+
+    cihazlar = dict(Cihaz.objects.filter(lab=lab, aktif_mi=True).values_list("id", "isim"))
+    if not cihazlar:
+        return []
+    dolu = Randevu.objects.gunluk_dolu_araliklar(list(cihazlar), bas_tarih, bit_tarih, acilis, kapanis)
+
+    adaylar = []
+    tarih = bas_tarih
+    while tarih <= bit_tarih:
+        gun_acilis = acilis
+        if tarih == simdi.date():
+            gun_acilis = max(acilis, simdi.time().replace(second=0, microsecond=0))
+        for cihaz_id, isim in cihazlar.items():
+            for bos_bas, bos_bit in bos_araliklar(dolu.get((cihaz_id, tarih), []), gun_acilis, kapanis):
+                bitis = datetime.combine(tarih, bos_bas) + sure
+                if bitis <= datetime.combine(tarih, bos_bit):
+                    adaylar.append({
+                        "cihaz_id": cihaz_id, "cihaz": isim, "tarih": tarih,
+                        "baslangic": bos_bas, "bitis": bitis.time(), "bos_bitis": bos_bit,
+                    })
+        tarih += timedelta(days=1)
+
+    adaylar.sort(key=lambda a: (a["tarih"], a["baslangic"], a["cihaz"]))
+    return adaylar[:MUSAIT_ARAMA_MAKS_SONUC]
+
+def _musait_arama_parametreleri(params):
+    """Arama formunun GET parametrelerini doğrular; hata varsa ValueError."""
+    bugun = timezone.localdate()
+    bas_tarih = datetime.strptime(params["baslangic"], "%Y-%m-%d").date() if params.get("baslangic") else bugun
+    bit_tarih = datetime.strptime(params["bitis"], "%Y-%m-%d").date() if params.get("bitis") else bas_tarih
+    saat_bas = datetime.strptime(params["saat_bas"], "%H:%M").time() if params.get("saat_bas") else None
+    saat_bit = datetime.strptime(params["saat_bit"], "%H:%M").time() if params.get("saat_bit") else None
+    sure_dk = int(params.get("sure") or 60)
+
+    if bit_tarih < bas_tarih or (bit_tarih - bas_tarih).days >= MUSAIT_ARAMA_MAKS_GUN:
+        raise ValueError(f"Tarih aralığı en fazla {MUSAIT_ARAMA_MAKS_GUN} gün olabilir.")
+    if not 0 < sure_dk <= MAX_RANDEVU_SAATI * 60:
+        raise ValueError(f"Süre 1 ile {MAX_RANDEVU_SAATI * 60} dakika arasında olmalıdır.")
+    return bas_tarih, bit_tarih, timedelta(minutes=sure_dk), saat_bas, saat_bit
+
+# --- Koşullu yanıtlar (ETag / Last-Modified) ---
+# ETag'ler önbellekteki kapsam sürümlerinden türetilir; veri değişmediyse view
+# hiç çalışmadan 304 Not Modified döner. `no-cache` tarayıcıyı her seferinde
+# doğrulama yapmaya zorlar, böylece eski veri gösterilmez. Önbellek süreçler
+# arasında paylaşılmıyorsa doğrulayıcı üretilmez (None): her istek 200 alır.
+def _takvim_etag(request, lab_id=None):
+    if not dogrulayicilar_acik():
+        return None
+    try:
+        baslangic, bitis = takvim_araligi(request)
+    except ValueError:
+        return None
+    return surum_etiketi(surum(takvim_kapsami(lab_id)), timezone.now().date(), baslangic, bitis)
+
+def _takvim_son_degisiklik(request, lab_id=None):
+    if not dogrulayicilar_acik():
+        return None
+    # Görünürlük güne bağlı olduğundan gün başı da bir "değişiklik" sayılır
+    gun_basi = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(son_degisiklik(takvim_kapsami(lab_id)), gun_basi)
+
+SAYAC_KAPSAMLARI = sayaclar.KAPSAMLAR
+
+def _sayac_surumleri(request):
+    # ETag, Last-Modified ve görünüm aynı sürümleri kullanır: istek başına tek önbellek çağrısı
+    if not hasattr(request, "_sayac_surumleri"):
+        request._sayac_surumleri = surumler(*SAYAC_KAPSAMLARI)
+    return request._sayac_surumleri
+
+def _sayac_etag(request):
+    if not dogrulayicilar_acik():
+        return None
+    return surum_etiketi(*_sayac_surumleri(request).values())
+
+def _sayac_son_degisiklik(request):
+    if not dogrulayicilar_acik():
+        return None
+    return surum_zamani(*_sayac_surumleri(request).values())
 
 # ============================================================
 # 2️⃣ ANA SAYFA & LABORATUVAR GÖRÜNÜMLERİ
@@ -120,37 +239,25 @@ def genel_takvim(request):
     return render(request, "genel_takvim.html", {"cihazlar_json": cihazlar_json})
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_takvim_etag, last_modified_func=_takvim_son_degisiklik)
 def tum_events_api(request):
     """
     Genel Takvim API: Geçmiş sonuçlananlar ve Gelecek planlılar.
-    Çift ikon ve taşma sorununu önlemek için sadeleştirilmiştir.
+    Yalnızca FullCalendar'ın istediği `start`/`end` aralığındaki kayıtlar
+    veritabanında süzülerek döner; yanıt gövdesi önbellekten servis edilir.
     """
-    bugun = timezone.now().date()
-    randevular = Randevu.objects.all()
-    events = []
-
-    color_map = {
-        Randevu.ONAYLANDI: "#28a745", Randevu.ONAY_BEKLENIYOR: "#ffc107",
-        Randevu.GELDI: "#0d6efd", Randevu.GELMEDI: "#6c757d", Randevu.REDDEDILDI: "#dc3545",
-    }
+    try:
+        baslangic, bitis = takvim_araligi(request)
+    except ValueError:
+        return JsonResponse({"hata": "Geçersiz tarih aralığı."}, status=400)
 
-    for r in randevular:
-        goster = (r.tarih >= bugun and r.durum in [Randevu.ONAY_BEKLENIYOR, Randevu.ONAYLANDI]) or \
-                 (r.tarih < bugun and r.durum in [Randevu.GELDI, Randevu.GELMEDI])
-
-        if goster:
-            events.append({
-                'title': f"{r.cihaz.isim} • {r.baslangic_saati.strftime('%H:%M')}-{r.bitis_saati.strftime('%H:%M')}",
-                'start': f"{r.tarih.isoformat()}T{r.baslangic_saati.strftime('%H:%M:%S')}",
-                'end': f"{r.tarih.isoformat()}T{r.bitis_saati.strftime('%H:%M:%S')}",
-                'color': color_map.get(r.durum, "#3788d8"),
-                'extendedProps': {
-                    'lab_adi': r.cihaz.lab.isim,
-                    'kullanici': r.kullanici.username,
-                    'durum': r.get_durum_display()
-                }
-            })
-    return JsonResponse(events, safe=False)
+    bugun = timezone.now().date()
+    icerik = onbellekli_olaylar(
+        None, bugun, baslangic, bitis,
+        lambda: takvim_olaylari(gorunur_randevular(Randevu.objects.all(), bugun, baslangic, bitis), GENEL_RENKLER),
+    )
+    return HttpResponse(icerik, content_type="application/json")
 
 @login_required
 def lab_takvim(request, lab_id):
@@ -159,21 +266,51 @@ def lab_takvim(request, lab_id):
     return render(request, "lab_takvim.html", {"lab": lab, "cihazlar_json": json.dumps(cihazlar, cls=DjangoJSONEncoder)})
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_takvim_etag, last_modified_func=_takvim_son_degisiklik)
 def lab_events_api(request, lab_id):
+    try:
+        baslangic, bitis = takvim_araligi(request)
+    except ValueError:
+        return JsonResponse({"hata": "Geçersiz tarih aralığı."}, status=400)
+
     bugun = timezone.now().date()
-    randevular = Randevu.objects.filter(cihaz__lab_id=lab_id)
-    events = []
-    for r in randevular:
-        if (r.tarih >= bugun and r.durum in [Randevu.ONAY_BEKLENIYOR, Randevu.ONAYLANDI]) or \
-           (r.tarih < bugun and r.durum in [Randevu.GELDI, Randevu.GELMEDI]):
-            events.append({
-                'title': f"{r.cihaz.isim} • {r.baslangic_saati.strftime('%H:%M')}-{r.bitis_saati.strftime('%H:%M')}",
-                'start': f"{r.tarih.isoformat()}T{r.baslangic_saati.strftime('%H:%M:%S')}",
-                'end': f"{r.tarih.isoformat()}T{r.bitis_saati.strftime('%H:%M:%S')}",
-                'color': "#28a745" if r.durum == Randevu.ONAYLANDI else "#ffc107",
-                'extendedProps': {'kullanici': r.kullanici.username, 'durum': r.get_durum_display()}
-            })
-    return JsonResponse(events, safe=False)
+    icerik = onbellekli_olaylar(
+        lab_id, bugun, baslangic, bitis,
+        lambda: takvim_olaylari(
+            gorunur_randevular(Randevu.objects.filter(cihaz__lab_id=lab_id), bugun, baslangic, bitis),
+            LAB_RENKLERI, "#ffc107", lab_adi=False,
+        ),
+    )
+    return HttpResponse(icerik, content_type="application/json")
+
+@login_required
+def musait_cihaz_ara(request, lab_id):
+    """Lab içinde "şu tarihlerde, şu saatlerde, şu süre boş cihaz" araması."""
+    lab = get_object_or_404(Laboratuvar, id=lab_id)
+    context = {"lab": lab, "params": request.GET, "max_sure_dk": MAX_RANDEVU_SAATI * 60}
+    if "sure" in request.GET:
+        try:
+            context["adaylar"] = lab_musaitlik_ara(lab, *_musait_arama_parametreleri(request.GET))
+        except ValueError as e:
+            messages.error(request, f"⚠️ {e}")
+    return render(request, "musait_ara.html", context)
+
+@login_required
+def musait_cihaz_ara_api(request, lab_id):
+    lab = get_object_or_404(Laboratuvar, id=lab_id)
+    try:
+        adaylar = lab_musaitlik_ara(lab, *_musait_arama_parametreleri(request.GET))
+    except ValueError as e:
+        return JsonResponse({"hata": str(e)}, status=400)
+    return JsonResponse([
+        {
+            "cihaz_id": a["cihaz_id"], "cihaz": a["cihaz"], "tarih": a["tarih"].isoformat(),
+            "baslangic": a["baslangic"].strftime("%H:%M"), "bitis": a["bitis"].strftime("%H:%M"),
+            "bos_bitis": a["bos_bitis"].strftime("%H:%M"),
+        }
+        for a in adaylar
+    ], safe=False)
 
 # ============================================================
 # 4️⃣ KULLANICI İŞLEMLERİ (RANDEVU ALMA & PROFİL)
@@ -197,14 +334,14 @@ def randevu_al(request, cihaz_id):
             messages.error(request, "⚠️ Geçersiz tarih/saati formatı gönderildi.")
             return redirect("randevu_al", cihaz_id=cihaz_id)
 
-        # Transaction içinde tekrar kontrol ederek race condition riskini azalt
-        with transaction.atomic():
-            if check_overlap(secilen_cihaz, t_obj, b_obj, bit_obj):
-                messages.error(request, "⚠️ Bu saat aralığı DOLU!")
-            else:
-                Randevu.objects.create(kullanici=request.user, cihaz=secilen_cihaz, tarih=t_obj, baslangic_saati=b_obj, bitis_saati=bit_obj)
-                messages.success(request, "✅ Randevu oluşturuldu, onay bekleniyor.")
-                return redirect("randevularim")
+        # Kontrol + kayıt cihaz-gün kilidi altında yapılır (çift rezervasyon olmaz)
+        try:
+            Randevu.objects.guvenli_olustur(request.user, secilen_cihaz, t_obj, b_obj, bit_obj)
+        except ValidationError:
+            messages.error(request, "⚠️ Bu saat aralığı DOLU!")
+        else:
+            messages.success(request, "✅ Randevu oluşturuldu, onay bekleniyor.")
+            return redirect("randevularim")
 
         # Eğer POST ile gelindiyse, template'de seçilen tarihi POST verisinden göster
         secilen_tarih = t_obj
@@ -212,7 +349,31 @@ def randevu_al(request, cihaz_id):
     # Mevcut randevuları sağ tarafta listelemek için template'in beklediği
     # context anahtarını sağlayalım.
     mevcut_randevular = Randevu.objects.filter(cihaz=secilen_cihaz, tarih=secilen_tarih).order_by("baslangic_saati")
-    return render(request, "randevu_form.html", {"cihaz": secilen_cihaz, "secilen_tarih": secilen_tarih.strftime("%Y-%m-%d"), "mevcut_randevular": mevcut_randevular})
+    return render(request, "randevu_form.html", {
+        "cihaz": secilen_cihaz, "secilen_tarih": secilen_tarih.strftime("%Y-%m-%d"),
+        "mevcut_randevular": mevcut_randevular,
+        "bos_araliklar": gunun_bos_araliklari(secilen_cihaz, secilen_tarih),
+        "max_sure_saat": MAX_RANDEVU_SAATI,
+    })
+
+@login_required
+def cihaz_bos_saatler_api(request, cihaz_id):
+    """Bir cihazın seçilen gündeki boş saat aralıkları (?tarih=YYYY-MM-DD)."""
+    cihaz = get_object_or_404(Cihaz, id=cihaz_id)
+    try:
+        tarih_str = request.GET.get("tarih")
+        tarih = datetime.strptime(tarih_str, "%Y-%m-%d").date() if tarih_str else timezone.localdate()
+    except ValueError:
+        return JsonResponse({"hata": "Geçersiz tarih."}, status=400)
+
+    return JsonResponse({
+        "cihaz": cihaz.id,
+        "tarih": tarih.isoformat(),
+        "acilis": LAB_ACILIS_SAATI.strftime("%H:%M"),
+        "kapanis": LAB_KAPANIS_SAATI.strftime("%H:%M"),
+        "max_sure_saat": MAX_RANDEVU_SAATI,
+        "bos_araliklar": gunun_bos_araliklari(cihaz, tarih) if cihaz.aktif_mi else [],
+    })
 
 @login_required
 def randevularim(request):
@@ -260,25 +421,65 @@ def profil_duzenle(request):
 # 5️⃣ YÖNETİM & BİLDİRİM API 
 # ============================================================
 @staff_member_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_sayac_etag, last_modified_func=_sayac_son_degisiklik)
 def onay_bekleyen_sayisi(request):
     """
     Sol menüdeki bildirimleri (badge) ait oldukları sekmelere dağıtır.
     Pasif öğrenciler ve Bekleyen randevular artık ayrı sayılır.
     """
-    # 1. Onay Bekleyen Pasif Öğrenciler (image_1c8dc0.png'deki kırmızı balon için)
-    pasif_ogrenci = User.objects.filter(is_active=False).count()
-    
-    # 2. Onay Bekleyen Randevular (image_792300.png'de menünün yanındaki sayaç için)
-    bekleyen_randevu = Randevu.objects.filter(durum='onay_bekleniyor').count()
-    
-    # 3. Çözülmemiş Arıza Bildirimleri
-    acik_ariza = Ariza.objects.filter(cozuldu_mu=False).count()
-    
-    return JsonResponse({
-        "pasif_ogrenci": pasif_ogrenci,
-        "bekleyen_randevu": bekleyen_randevu,
-        "acik_ariza": acik_ariza
-    })
+    # Pasif öğrenciler / bekleyen randevular / açık arızalar: sürümü değişmeyen
+    # sayaç önbellekten gelir, yalnızca değişen kapsam yeniden sayılır.
+    return JsonResponse(sayaclar.rozet_sayilari(_sayac_surumleri(request)))
+
+@staff_member_required
+@require_POST
+def toplu_durum_api(request):
+    """Randevuları tek UPDATE ile onaylar / reddeder / geldi-gelmedi işaretler.
+
+    POST: islem=onayla|reddet|geldi|gelmedi ve
+      - idler=1,2,3 (ya da tekrarlanan idler alanı) veya
+      - tarih=YYYY-MM-DD + lab ya da cihaz (+ isteğe bağlı saat=HH:MM): o günün oturumu
+    """
+    veri = request.POST
+    try:
+        if veri.get("idler"):
+            secim = [int(i) for parca in veri.getlist("idler") for i in parca.split(",") if i.strip()]
+        else:
+            saat = veri.get("saat")
+            secim = toplu_durum.oturum(
+                datetime.strptime(veri.get("tarih", ""), "%Y-%m-%d").date(),
+                lab_id=int(veri.get("lab") or 0), cihaz_id=int(veri.get("cihaz") or 0),
+                saat=datetime.strptime(saat, "%H:%M").time() if saat else None,
+            )
+        sonuc = toplu_durum.durum_degistir(secim, veri.get("islem", ""), request.user)
+    except ValueError as e:
+        return JsonResponse({"hata": str(e)}, status=400)
+    return JsonResponse(sonuc)
+
+@login_required
+def canli_akis(request):
+    """Server-Sent Events: randevu / arıza / kullanıcı değişikliklerini anlık iletir.
+
+    `?tur=randevu,ariza` ile olaylar süzülür. Arıza ve kullanıcı olayları
+    (admin rozetleri) yalnızca personele gönderilir. Süreçteki akış sınırı
+    doluysa 204 döner; EventSource yeniden bağlanmaz, sayfa yoklamaya geçer.
+    """
+    turler = {t for t in request.GET.get("tur", "").split(",") if t} or {canli.RANDEVU, canli.ARIZA, canli.KULLANICI}
+    if not request.user.is_staff:
+        turler &= {canli.RANDEVU}
+    try:
+        son_id = int(request.headers.get("Last-Event-ID") or request.GET.get("son") or "")
+    except ValueError:
+        son_id = None
+
+    satirlar = canli.sinirli_akis(son_id, turler)
+    if satirlar is None:
+        return HttpResponse(status=204)
+    yanit = StreamingHttpResponse(satirlar, content_type="text/event-stream")
+    yanit["Cache-Control"] = "no-cache"
+    yanit["X-Accel-Buffering"] = "no"  # nginx yanıtı tamponlamasın
+    return yanit
 
 @staff_member_required
 def egitmen_paneli(request):
@@ -369,24 +570,58 @@ def email_dogrulama(request):
     return render(request, "email_dogrulama.html")
 @login_required
 def randevu_pdf_indir(request):
-    randevular = (
-        Randevu.objects
-        .filter(kullanici=request.user)
-        .order_by("tarih", "baslangic_saati")
-    )
+    # ?motor=reportlab ile rapor HTML'e dönüştürülmeden doğrudan çizilir
+    motor = request.GET.get("motor", "")
+    if motor not in dict(PDF_MOTORLARI):
+        motor = ""
+
+    # Randevuları değişmediyse önceki PDF doğrudan diskten gönderilir
+    anahtar = pdf_onbellek.rapor_anahtari(request.user, motor=motor)
+    yol = pdf_onbellek.bul(request.user.id, anahtar, motor)
+    if yol:
+        try:
+            return FileResponse(open(yol, "rb"), as_attachment=True, content_type="application/pdf",
+                                filename=f"randevular_{request.user.username}.pdf")
+        except FileNotFoundError:
+            pass  # bul() ile open() arasında geçersiz kılındı / budandı: yeniden üretilir
 
-    context = {
-        "user": request.user,
-        "randevular": randevular,
-    }
+    # PDF istek içinde üretilmez: iş kuyruğa alınır, kullanıcı durum sayfasına gider
+    is_ = pdf_kuyrugu.is_ekle(request.user, motor)
+    return redirect("pdf_durum", is_id=is_.id)
+
+
+@login_required
+def pdf_durum(request, is_id):
+    pdf_kuyrugu.bayat_isleri_kapat(pk=is_id)  # sahipsiz iş sonsuza dek yoklanmasın
+    is_ = get_object_or_404(PdfIsi, id=is_id, kullanici=request.user)
+    if is_.durum == PdfIsi.HAZIR:
+        return redirect("pdf_dosya", is_id=is_.id)
+    return render(request, "pdf_durum.html", {"is": is_})
+
+
+@login_required
+def pdf_durum_api(request, is_id):
+    pdf_kuyrugu.bayat_isleri_kapat(pk=is_id)  # sahipsiz iş sonsuza dek yoklanmasın
+    is_ = get_object_or_404(PdfIsi, id=is_id, kullanici=request.user)
+    veri = {"durum": is_.durum, "etiket": is_.get_durum_display(), "hata": is_.hata}
+    if is_.durum == PdfIsi.HAZIR:
+        veri["indir_url"] = reverse("pdf_dosya", args=[is_.id])
+    return JsonResponse(veri)
+
+
+@login_required
+def pdf_dosya(request, is_id):
+    # Raporlar kişisel veri içerir: MEDIA_URL yerine sahiplik kontrolüyle sunulur
+    is_ = get_object_or_404(PdfIsi, id=is_id, kullanici=request.user, durum=PdfIsi.HAZIR)
+    try:
+        dosya = is_.dosya.open("rb")
+    except FileNotFoundError:
+        # Randevular değişti ya da dosya önbellekten atıldı: yeniden üret
+        url = reverse("randevu_pdf_indir")
+        return redirect(f"{url}?motor={is_.motor}" if is_.motor else url)
+    return FileResponse(dosya, as_attachment=True, filename=is_.dosya_adi, content_type="application/pdf")
 
-    filename = f"randevular_{request.user.username}.pdf"
 
-    return render_to_pdf(
-        "randevu_pdf.html", 
-        context, 
-        filename
-    )
 @staff_member_required
 def ogrenci_listesi(request): return render(request, "yonetim_ogrenciler.html", {"ogrenciler": Profil.objects.all()})
 @staff_member_required
@@ -442,31 +677,27 @@ def sifre_sifirla_talep(request):
             domain = request.get_host()
             
             
-            # 1. HTML İçeriği Hazırla
+            # 1. HTML ve Düz Metin İçeriği Hazırla
+            # Şablon ve ondan türetilen düz metin sürümü bir kez derlenip önbellekte tutulur.
             # Şablonun içindeki {% url %} etiketinin hata vermemesi için uid ve token'ı AYRI gönderiyoruz.
-            html_content = render_to_string(
-                "password_reset_email.html", 
-                {
-                    'user': user,
-                    'protocol': protocol,
-                    'domain': domain,
-                    'uid': uid,    # Şablon bunu 'uid' olarak bekliyor
-                    'token': token # Şablon bunu 'token' olarak bekliyor
-                }
-            )
-
-            # 2. Düz Metin Halini Oluştur
-            text_content = strip_tags(html_content)
+            sablon = EpostaSablonu.dosyadan("password_reset_email.html", "BTÜ Lab Sistemi | Şifre Sıfırlama")
+            subject, text_content, html_content = sablon.isle({
+                'user': user,
+                'protocol': protocol,
+                'domain': domain,
+                'uid': uid,    # Şablon bunu 'uid' olarak bekliyor
+                'token': token # Şablon bunu 'token' olarak bekliyor
+            })
 
-            # 3. E-posta Nesnesini Oluştur
+            # 2. E-posta Nesnesini Oluştur
             email_obj = EmailMultiAlternatives(
-                subject="BTÜ Lab Sistemi | Şifre Sıfırlama",
+                subject=subject,
                 body=text_content,
                 from_email=settings.DEFAULT_FROM_EMAIL,
                 to=[user.email],
             )
 
-            # 4. HTML Versiyonunu Ekle ve Gönder
+            # 3. HTML Versiyonunu Ekle ve Gönder
             email_obj.attach_alternative(html_content, "text/html")
             email_obj.send()
             
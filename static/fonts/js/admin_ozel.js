@@ -1,6 +1,9 @@
 /* admin_ozel.js
    - Amaç: Menüdeki her sekmenin (Öğrenci, Randevu, Arıza) yanına kendi bağımsız sayısını ekler.
    - API: views.py içindeki ayrıştırılmış verileri kullanır.
+   - Canlı: /api/canli/ (Server-Sent Events) yeni randevu, arıza ya da onay bekleyen
+     kullanıcı bildirdiğinde sayılar sayfa yenilenmeden güncellenir. Sunucu akışa
+     yer vermezse (204) 30 sn'de bir yoklanır.
 */
 document.addEventListener("DOMContentLoaded", function () {
     const checkMenu = setInterval(() => {
@@ -13,25 +16,42 @@ document.addEventListener("DOMContentLoaded", function () {
         if (ogrenciLink || randevuLink || arizaLink) {
             clearInterval(checkMenu);
 
-            fetch('/api/onay-bekleyen-sayisi/')
+            const guncelle = () => fetch('/api/onay-bekleyen-sayisi/')
                 .then(res => res.json())
                 .then(data => {
                     // 1. Onay Bekleyen Pasif Öğrenciler (image_1c8dc0.png'deki kırmızı balon)
-                    if (ogrenciLink && data.pasif_ogrenci > 0) {
+                    if (ogrenciLink) {
                         addBadge(ogrenciLink, data.pasif_ogrenci, "#ff0000"); // Kırmızı
                     }
 
                     // 2. Bekleyen Randevular (image_792300.png'deki bağımsız sayaç)
-                    if (randevuLink && data.bekleyen_randevu > 0) {
+                    if (randevuLink) {
                         addBadge(randevuLink, data.bekleyen_randevu, "#ffc107", "#000"); // Sarı
                     }
 
                     // 3. Açık Arıza Bildirimleri
-                    if (arizaLink && data.acik_ariza > 0) {
+                    if (arizaLink) {
                         addBadge(arizaLink, data.acik_ariza, "#dc3545"); // Kırmızı/Bordo
                     }
                 })
                 .catch(err => console.warn('Bildirim verileri alınamadı:', err));
+
+            guncelle();
+
+            // Değişiklik olunca sunucu haber verir; art arda gelen olaylar tek istekte toplanır
+            if (window.EventSource) {
+                let bekleyen = null;
+                const kaynak = new EventSource('/api/canli/?tur=randevu,ariza,kullanici');
+                const olayGeldi = () => {
+                    clearTimeout(bekleyen);
+                    bekleyen = setTimeout(guncelle, 300);
+                };
+                ["randevu", "ariza", "kullanici", "yenile"].forEach(tur => kaynak.addEventListener(tur, olayGeldi));
+                // Sunucu akışa yer vermezse (204) EventSource kapanır: periyodik yoklamaya geç
+                kaynak.addEventListener("error", () => {
+                    if (kaynak.readyState === EventSource.CLOSED) setInterval(guncelle, 30000);
+                });
+            }
         }
     }, 500);
 
@@ -43,6 +63,7 @@ document.addEventListener("DOMContentLoaded", function () {
         // Varsa eski badge'i temizle (çift ikon hatasını önlemek için)
         const oldBadge = targetEl.querySelector('.custom-menu-badge');
         if (oldBadge) oldBadge.remove();
+        if (!count) return; // Sayı sıfıra indiyse badge gösterilmez
 
         const badgeHTML = `
             <span class="badge custom-menu-badge" 